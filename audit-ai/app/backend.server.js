@@ -0,0 +1,27 @@
+// Server-to-server calls to the AuditAI backend's /v1 service routes.
+const BACKEND_URL = process.env.AUDITAI_BACKEND_URL || "https://auditai-insight-engine-1.onrender.com";
+
+async function callBackend(method, path, body) {
+  const res = await fetch(`${BACKEND_URL}${path}`, {
+    method,
+    headers: {
+      "Content-Type": "application/json",
+      Authorization: `Bearer ${process.env.SERVICE_BEARER}`,
+    },
+    body: body ? JSON.stringify(body) : undefined,
+  });
+  if (!res.ok) {
+    console.error(`❌ Backend ${method} ${path} failed [${res.status}]:`, await res.text());
+  }
+  return res.ok;
+}
+
+// Lets the backend read the token from its own database (SHOP_TOKEN_SOURCE=postgres).
+export function pushShopToken(shop, accessToken) {
+  return callBackend("PUT", `/v1/shops/${encodeURIComponent(shop)}/token`, { accessToken });
+}
+
+// Drops the backend's stored and cached token once the app is uninstalled.
+export function revokeShopToken(shop) {
+  return callBackend("DELETE", `/v1/shops/${encodeURIComponent(shop)}/token`);
+}
@@ -1,6 +1,7 @@
 import { redirect } from "@remix-run/node";
 import { authenticate } from "~/shopify.server";
 import { saveShop } from "~/db.server";
+import { pushShopToken } from "~/backend.server";
 
 export const loader = async ({ request }) => {
   const session = await authenticate.admin(request);
@@ -8,6 +9,7 @@ export const loader = async ({ request }) => {
   const { shop, accessToken } = session;
 
   await saveShop(shop, accessToken);
+  await pushShopToken(shop, accessToken).catch((error) => console.error("💥 Token push failed:", error));
 
   return redirect("/app"); // Or wherever you want to send the user post-login
 };
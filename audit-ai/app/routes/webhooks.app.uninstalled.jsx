@@ -1,5 +1,6 @@
 import { authenticate } from "../shopify.server";
 import db from "../db.server";
+import { revokeShopToken } from "../backend.server";
 
 export const action = async ({ request }) => {
   const { shop, session, topic } = await authenticate.webhook(request);
@@ -12,5 +13,8 @@ export const action = async ({ request }) => {
     await db.session.deleteMany({ where: { shop } });
   }
 
+  // Always, even on a repeat delivery: the backend may still cache the token.
+  await revokeShopToken(shop).catch((error) => console.error("💥 Token revoke failed:", error));
+
   return new Response();
 };
@@ -4,6 +4,7 @@ from sqlalchemy import engine_from_config, pool
 import os, sys
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add backend_app/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))  # repo root, for backend_app.* imports
 from db import DATABASE_URL
 from db_models import Base  # our SQLAlchemy Base
 
@@ -8,8 +8,9 @@ branch_labels = None
 depends_on = None
 
 def upgrade():
-    suggestion_state = sa.Enum("NEW","ACCEPTED","REJECTED","SNOOZED","RESOLVED", name="suggestion_state")
-    job_status = sa.Enum("ACK","DONE","FAIL", name="job_status")
+    # create_type=False: the types are created once below, not again by create_table
+    suggestion_state = postgresql.ENUM("NEW","ACCEPTED","REJECTED","SNOOZED","RESOLVED", name="suggestion_state", create_type=False)
+    job_status = postgresql.ENUM("ACK","DONE","FAIL", name="job_status", create_type=False)
     suggestion_state.create(op.get_bind(), checkfirst=True)
     job_status.create(op.get_bind(), checkfirst=True)
 
@@ -0,0 +1,95 @@
+"""Range-partition campaign_metrics by month, BRIN on ts
+
+Rebuilds campaign_metrics as a table partitioned by RANGE (ts) with one
+partition per month (campaign_metrics_pYYYYMM), covering the existing data
+through PARTITIONS_AHEAD months from now, and copies the rows across. The
+B-tree on ts becomes a BRIN index; the separate workspace_id index is dropped
+because the unique constraint already leads with workspace_id.
+
+On large tables run this in a maintenance window: the copy holds an
+exclusive lock on the old table.
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+
+revision = "20261018_0002"
+down_revision = "20251108_0001"
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD = 3
+
+COLUMNS = "id, workspace_id, source, ts, metric, value, metadata, created_at, updated_at"
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    op.execute("ALTER TABLE campaign_metrics RENAME TO campaign_metrics_unpartitioned")
+    op.execute("ALTER TABLE campaign_metrics_unpartitioned DROP CONSTRAINT uq_campaign_metrics_unique")
+    op.execute("ALTER TABLE campaign_metrics_unpartitioned DROP CONSTRAINT campaign_metrics_pkey")
+    op.drop_index("ix_campaign_metrics_workspace_id", table_name="campaign_metrics_unpartitioned")
+    op.drop_index("ix_campaign_metrics_ts", table_name="campaign_metrics_unpartitioned")
+
+    op.execute("""
+        CREATE TABLE campaign_metrics (
+            id uuid NOT NULL,
+            workspace_id uuid NOT NULL,
+            source varchar(64) NOT NULL,
+            ts timestamptz NOT NULL,
+            metric varchar(128) NOT NULL,
+            value double precision NOT NULL,
+            metadata jsonb,
+            created_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+            updated_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT campaign_metrics_pkey PRIMARY KEY (id, ts),
+            CONSTRAINT uq_campaign_metrics_unique UNIQUE (workspace_id, source, ts, metric)
+        ) PARTITION BY RANGE (ts)
+    """)
+    op.execute("CREATE INDEX ix_campaign_metrics_ts_brin ON campaign_metrics USING brin (ts)")
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    oldest = bind.exec_driver_sql("SELECT min(ts) FROM campaign_metrics_unpartitioned").scalar()
+    month = oldest.astimezone(timezone.utc).date().replace(day=1) if isinstance(oldest, datetime) else current
+    last = _add_months(current, PARTITIONS_AHEAD)
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE campaign_metrics_p{month:%Y%m} PARTITION OF campaign_metrics "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{following.isoformat()} 00:00+00')"
+        )
+        month = following
+
+    op.execute(f"INSERT INTO campaign_metrics ({COLUMNS}) SELECT {COLUMNS} FROM campaign_metrics_unpartitioned")
+    op.execute("DROP TABLE campaign_metrics_unpartitioned")
+
+
+def downgrade():
+    op.execute("ALTER TABLE campaign_metrics RENAME TO campaign_metrics_partitioned")
+    op.execute("ALTER TABLE campaign_metrics_partitioned DROP CONSTRAINT uq_campaign_metrics_unique")
+    op.execute("ALTER TABLE campaign_metrics_partitioned DROP CONSTRAINT campaign_metrics_pkey")
+    op.execute("DROP INDEX ix_campaign_metrics_ts_brin")
+    op.execute("""
+        CREATE TABLE campaign_metrics (
+            id uuid PRIMARY KEY,
+            workspace_id uuid NOT NULL,
+            source varchar(64) NOT NULL,
+            ts timestamptz NOT NULL,
+            metric varchar(128) NOT NULL,
+            value double precision NOT NULL,
+            metadata jsonb,
+            created_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+            updated_at timestamptz DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute(f"INSERT INTO campaign_metrics ({COLUMNS}) SELECT {COLUMNS} FROM campaign_metrics_partitioned")
+    op.execute("DROP TABLE campaign_metrics_partitioned")  # drops the monthly partitions with it
+    op.create_index("ix_campaign_metrics_workspace_id", "campaign_metrics", ["workspace_id"])
+    op.create_index("ix_campaign_metrics_ts", "campaign_metrics", ["ts"])
+    op.create_unique_constraint("uq_campaign_metrics_unique", "campaign_metrics", ["workspace_id","source","ts","metric"])
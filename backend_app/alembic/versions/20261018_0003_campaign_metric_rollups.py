@@ -0,0 +1,54 @@
+"""Hourly and daily campaign metric rollups
+
+Adds campaign_metrics_hourly and campaign_metrics_daily, kept current by the
+ingest path (backend_app/common/rollups.py), and backfills them from the
+existing raw rows.
+"""
+from alembic import op
+
+revision = "20261018_0003"
+down_revision = "20261018_0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = """
+    workspace_id uuid NOT NULL,
+    source varchar(64) NOT NULL,
+    metric varchar(128) NOT NULL,
+    bucket timestamptz NOT NULL,
+    value_sum double precision NOT NULL,
+    value_count bigint NOT NULL,
+    value_min double precision NOT NULL,
+    value_max double precision NOT NULL,
+    last_value double precision NOT NULL,
+    last_ts timestamptz NOT NULL,
+    updated_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (workspace_id, source, metric, bucket)
+"""
+
+
+def upgrade():
+    op.execute(f"CREATE TABLE campaign_metrics_hourly ({COLUMNS})")
+    op.execute(f"CREATE TABLE campaign_metrics_daily ({COLUMNS})")
+    op.execute("""
+        INSERT INTO campaign_metrics_hourly
+            (workspace_id, source, metric, bucket, value_sum, value_count, value_min, value_max, last_value, last_ts)
+        SELECT workspace_id, source, metric, date_trunc('hour', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+               sum(value), count(*), min(value), max(value), (array_agg(value ORDER BY ts DESC))[1], max(ts)
+        FROM campaign_metrics
+        GROUP BY 1, 2, 3, 4
+    """)
+    op.execute("""
+        INSERT INTO campaign_metrics_daily
+            (workspace_id, source, metric, bucket, value_sum, value_count, value_min, value_max, last_value, last_ts)
+        SELECT workspace_id, source, metric, date_trunc('day', bucket AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+               sum(value_sum), sum(value_count), min(value_min), max(value_max),
+               (array_agg(last_value ORDER BY last_ts DESC))[1], max(last_ts)
+        FROM campaign_metrics_hourly
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE campaign_metrics_daily")
+    op.execute("DROP TABLE campaign_metrics_hourly")
@@ -0,0 +1,40 @@
+"""Indexes for keyset-paginated suggestion queries
+
+Adds (workspace_id, created_at, id) for the unfiltered listing, the same
+key behind state, source, payload->>'priority' and payload->>'category'
+for filtered listings, and a jsonb_path_ops GIN index on payload for
+containment filters. ix_suggestions_workspace_id is dropped: the new
+composite index serves every query it did.
+
+The indexes are built CONCURRENTLY, outside the migration transaction, so
+suggestion imports keep running while they build.
+"""
+from alembic import op
+
+revision = "20261018_0004"
+down_revision = "20261018_0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_suggestions_workspace_created": "(workspace_id, created_at, id)",
+    "ix_suggestions_workspace_state_created": "(workspace_id, state, created_at, id)",
+    "ix_suggestions_workspace_source_created": "(workspace_id, source, created_at, id)",
+    "ix_suggestions_workspace_priority_created": "(workspace_id, (payload ->> 'priority'), created_at, id)",
+    "ix_suggestions_workspace_category_created": "(workspace_id, (payload ->> 'category'), created_at, id)",
+    "ix_suggestions_payload": "USING gin (payload jsonb_path_ops)",
+}
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON suggestions {definition}")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_suggestions_workspace_id")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_suggestions_workspace_id ON suggestions (workspace_id)")
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,37 @@
+"""job_status_current: latest event per job
+
+One row per (workspace_id, job_id), upserted with every job_logs insert, so
+status reads are primary-key lookups. Backfilled from job_logs.
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "20261018_0005"
+down_revision = "20261018_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job_status_current",
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("job_id", sa.String(length=128), primary_key=True),
+        sa.Column("status", postgresql.ENUM("ACK", "DONE", "FAIL", name="job_status", create_type=False), nullable=False),
+        sa.Column("message", sa.String(length=2000), nullable=True),
+        sa.Column("meta", postgresql.JSONB(), nullable=True),
+        sa.Column("log_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+    op.execute("""
+        INSERT INTO job_status_current (workspace_id, job_id, status, message, meta, log_id, event_at)
+        SELECT DISTINCT ON (workspace_id, job_id) workspace_id, job_id, status, message, meta, id, created_at
+        FROM job_logs
+        ORDER BY workspace_id, job_id, created_at DESC
+    """)
+
+
+def downgrade():
+    op.drop_table("job_status_current")
@@ -0,0 +1,50 @@
+"""audit_jobs: Postgres-backed audit queue
+
+Adds QUEUED to job_status and the audit_jobs table, with a partial index on
+visible_at over the claimable (QUEUED or ACK) rows that workers scan with
+FOR UPDATE SKIP LOCKED.
+
+The enum value is added outside the migration transaction: the partial
+index predicate cannot use it before it is committed. Postgres cannot drop
+an enum value, so downgrade leaves QUEUED in job_status.
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "20261018_0006"
+down_revision = "20261018_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE job_status ADD VALUE IF NOT EXISTS 'QUEUED'")
+    op.create_table(
+        "audit_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("shop", sa.String(length=255), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("status", postgresql.ENUM("QUEUED", "ACK", "DONE", "FAIL", name="job_status", create_type=False), nullable=False),
+        sa.Column("stage", sa.String(length=32), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("visible_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("worker", sa.String(length=128), nullable=True),
+        sa.Column("result", postgresql.JSONB(), nullable=True),
+        sa.Column("error", sa.String(length=2000), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("finished_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_audit_jobs_claimable", "audit_jobs", ["visible_at"],
+        postgresql_where=sa.text("status IN ('QUEUED', 'ACK')"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_audit_jobs_claimable", table_name="audit_jobs")
+    op.drop_table("audit_jobs")
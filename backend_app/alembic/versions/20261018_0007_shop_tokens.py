@@ -0,0 +1,26 @@
+"""shop_tokens: shop access tokens pushed by the Remix app
+
+Lets the backend read tokens from its own database when the Remix app (and
+its sqlite Shop table) runs on another host.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261018_0007"
+down_revision = "20261018_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "shop_tokens",
+        sa.Column("shop_domain", sa.String(length=255), primary_key=True),
+        sa.Column("access_token", sa.String(length=512), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+
+
+def downgrade():
+    op.drop_table("shop_tokens")
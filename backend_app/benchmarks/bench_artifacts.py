@@ -0,0 +1,90 @@
+"""
+Crawl -> suggest hand-off: the page HTML inlined in the /crawl response and
+posted back to /suggest, vs an artifact handle resolved server-side.
+
+    python -m backend_app.benchmarks.bench_artifacts --page-mb 3 --shops 10
+
+Builds a --page-mb product-page-like HTML document. "inline" serializes
+PageData with the HTML and parses the /suggest body that carries it back;
+"handle" stores the page (zstd, content-addressed), serializes the slim
+PageData and loads the HTML back from the store. Also reports the store
+size after --shops shops crawl the same page, and a 4 KiB range read.
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from backend_app.common.artifacts import ArtifactStore, LocalDiskStorage, encode
+from backend_app.common.models import PageData
+
+
+def make_page(megabytes: float) -> str:
+    card = (
+        '<div class="product-card" data-id="{n}"><img src="/cdn/shop/products/{n}.jpg" alt="Product {n}" loading="lazy">'
+        '<h3 class="title">Merino wool beanie {n}</h3><span class="price">$ {p}.00</span>'
+        '<button class="btn add-to-cart" data-variant="{n}">Add to cart</button></div>\n'
+    )
+    parts, size, n = ["<html><head><title>Shop</title></head><body>"], 0, 0
+    while size < megabytes * 1024 * 1024:
+        part = card.format(n=n, p=10 + n % 90)
+        parts.append(part)
+        size += len(part)
+        n += 1
+    return "".join(parts) + "</body></html>"
+
+
+def timed(fn, runs: int) -> tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return (time.perf_counter() - start) / runs * 1000, result
+
+
+def main(page_mb: float, shops: int, runs: int) -> None:
+    html = make_page(page_mb)
+    page = {"url": "https://shop.example/collections/all", "html": html, "title": "Shop"}
+
+    def inline():
+        response = PageData(**page).model_dump_json()
+        body = json.dumps({"html": json.loads(response)["html"], "goal": "increase add to cart"})
+        return len(response) + len(body), json.loads(body)["html"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(LocalDiskStorage(tmp))
+
+        def handle():
+            ref = store.put_bytes(html.encode())
+            response = PageData(**{**page, "html": None, "artifact": ref}).model_dump_json()
+            body = json.dumps({"artifact": ref.id, "goal": "increase add to cart"})
+            return len(response) + len(body), store.read_bytes(json.loads(body)["artifact"]).decode()
+
+        inline_ms, (inline_bytes, inline_html) = timed(inline, runs)
+        store.put_bytes(html.encode())  # first crawl writes; timed runs are the dedup path
+        handle_ms, (handle_bytes, handle_html) = timed(handle, runs)
+        assert inline_html == handle_html == html
+
+        for _ in range(shops):
+            store.put_bytes(html.encode())
+        stored = sum(size for _, size, _ in store.storage.scan())
+        ref = store.put_bytes(html.encode())
+        range_ms, _ = timed(lambda: store.read_bytes(ref.id, ref.size // 2, 4096), runs * 10)
+        full_ms, _ = timed(lambda: store.read_bytes(ref.id), runs)
+        write_ms, _ = timed(lambda: encode(html.encode()), runs)
+
+    mb = len(html.encode()) / 1024 / 1024
+    print(f"{mb:.1f} MB page, mean of {runs} runs")
+    print(f"  {'':22} {'wire bytes':>12} {'server ms':>10}")
+    print(f"  {'inline html (x2)':22} {inline_bytes:12d} {inline_ms:10.1f}")
+    print(f"  {'artifact handle':22} {handle_bytes:12d} {handle_ms:10.1f}")
+    print(f"  first write (zstd)     {write_ms:.1f} ms; {shops + 1} shops stored {stored} bytes ({stored / len(html.encode()):.1%} of one page)")
+    print(f"  4 KiB range read       {range_ms:.2f} ms vs full read {full_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-mb", type=float, default=3)
+    parser.add_argument("--shops", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.page_mb, args.shops, args.runs)
@@ -0,0 +1,94 @@
+"""
+Audit queue throughput: --jobs audits drained by 1..N async workers, each
+audit a fake runner that waits --work-ms (standing in for the crawl and LLM
+round trips), so the numbers are the queue's claim/lease/complete overhead
+and how it scales with workers.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.bench_audit_queue --jobs 400 --workers 1,2,4,8,16
+
+Runs in a scratch schema (dropped afterwards). All jobs are enqueued up front;
+latency is created_at to finished_at as recorded on the job.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend_app.common.audit_queue import AuditWorkerPool, enqueue_audit
+from backend_app.db import DATABASE_URL
+from backend_app.db_models import Base, DBAuditJob, DBJobLog, DBJobStatusCurrent
+
+SCHEMA = "bench_audit_queue"
+WORKSPACE = uuid.UUID("00000000-0000-0000-0000-000000000001")
+TABLES = [DBAuditJob.__table__, DBJobLog.__table__, DBJobStatusCurrent.__table__]
+
+
+def _enqueue_all(session, jobs: int) -> None:
+    for n in range(jobs):
+        enqueue_audit(session, WORKSPACE, "bench.example", {"url": f"https://bench.example/p/{n}", "goal": "conversion"})
+
+
+async def drain(sessions, jobs: int, workers: int, work_ms: float) -> dict:
+    async with sessions() as session:
+        await session.execute(text("TRUNCATE audit_jobs, job_logs, job_status_current"))
+        await session.run_sync(_enqueue_all, jobs)
+        await session.commit()
+
+    async def runner(payload, stage):
+        await stage("crawl")
+        await asyncio.sleep(work_ms / 2000)
+        await stage("suggest")
+        await asyncio.sleep(work_ms / 2000)
+        return {"url": payload["url"], "suggestions": []}
+
+    pool = AuditWorkerPool(runner, workers=workers, session_factory=sessions, poll_interval=0.05)
+    start = time.perf_counter()
+    await pool.start()
+    while pool.completed < jobs:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    await pool.stop()
+
+    async with sessions() as session:
+        p50, p95 = (await session.execute(text("""
+            SELECT percentile_cont(0.5) WITHIN GROUP (ORDER BY extract(epoch FROM finished_at - created_at)),
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY extract(epoch FROM finished_at - created_at))
+            FROM audit_jobs
+        """))).one()
+    return {"rate": jobs / elapsed, "p50": p50, "p95": p95}
+
+
+async def main(jobs: int, worker_counts: list[int], work_ms: float) -> None:
+    engine = create_async_engine(
+        DATABASE_URL, pool_size=max(worker_counts) + 2, connect_args={"options": f"-csearch_path={SCHEMA},public"},
+    )
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+
+        results = {n: await drain(sessions, jobs, n, work_ms) for n in worker_counts}
+
+        ideal = 1000 / work_ms
+        print(f"{jobs} audits of {work_ms:.0f} ms each (one worker could do at most {ideal:.0f}/s without the queue)")
+        print(f"  {'workers':>7} {'audits/s':>9} {'vs ideal':>9} {'p50 s':>8} {'p95 s':>8}")
+        for n, r in results.items():
+            print(f"  {n:7d} {r['rate']:9.1f} {r['rate'] / (ideal * n):8.0%} {r['p50']:8.2f} {r['p95']:8.2f}")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--workers", default="1,2,4,8,16")
+    parser.add_argument("--work-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.jobs, [int(n) for n in args.workers.split(",")], args.work_ms))
@@ -0,0 +1,130 @@
+"""
+campaign_metrics export: a naive JSON list (whole result set in memory) vs
+the streamed Arrow IPC and Parquet exports.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.bench_export --rows 1000000
+
+Loads --rows rows for one workspace into a scratch schema (dropped
+afterwards), then for each format measures server time to produce the whole
+body, body size, how far producing it raised the peak RSS (in a forked child
+per format, so runs do not share a high-water mark), and client time to
+parse it back into columns.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend_app.common.export import CAMPAIGN_METRICS_SCHEMA, campaign_metrics_query, export_stream
+from backend_app.common.partitions import add_months, ensure_partitions
+from backend_app.db import DATABASE_URL
+from backend_app.db_models import Base, DBCampaignMetric
+
+SCHEMA = "bench_export"
+WORKSPACE = uuid.UUID("00000000-0000-0000-0000-000000000001")
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def setup(conn, rows: int) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    Base.metadata.create_all(conn, tables=[DBCampaignMetric.__table__])
+    ensure_partitions(conn, [add_months(date(2025, 1, 1), i) for i in range(rows // 12 // 40_000 + 2)])
+    conn.execute(text("""
+        INSERT INTO campaign_metrics (id, workspace_id, source, ts, metric, value)
+        SELECT gen_random_uuid(), :ws, s, :start + make_interval(mins => g), m, random() * 100
+        FROM generate_series(0, :minutes - 1) AS g,
+             unnest(ARRAY['meta', 'google', 'tiktok']) AS s,
+             unnest(ARRAY['spend', 'clicks', 'impressions', 'conversions']) AS m
+    """), {"ws": WORKSPACE, "start": START, "minutes": rows // 12})
+    conn.execute(text("ANALYZE campaign_metrics"))
+
+
+def naive_json(session_factory) -> list[bytes]:
+    names = CAMPAIGN_METRICS_SCHEMA.names
+    with session_factory() as session:
+        rows = session.execute(campaign_metrics_query(WORKSPACE)).all()
+        return [json.dumps([dict(zip(names, row)) for row in rows], default=str).encode()]
+
+
+def parse_json(body: bytes) -> int:
+    return len(json.loads(body))
+
+
+def parse_arrow(body: bytes) -> int:
+    return pa.ipc.open_stream(body).read_all().num_rows
+
+
+def parse_parquet(body: bytes) -> int:
+    return pq.read_table(io.BytesIO(body)).num_rows
+
+
+def produce(engine, case: str, batch: int, path: str, results) -> None:
+    """Child process: write the body to path, report (seconds, bytes, peak RSS growth)."""
+    engine.dispose(close=False)  # don't share the parent's pooled connections
+
+    @contextmanager
+    def session_factory():
+        with Session(engine) as session:
+            yield session
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if case == "json":
+        pieces = naive_json(session_factory)
+    else:
+        pieces = export_stream(session_factory, campaign_metrics_query(WORKSPACE), CAMPAIGN_METRICS_SCHEMA, case, batch)
+    size = 0
+    with open(path, "wb") as body:
+        for piece in pieces:
+            size += len(piece)
+            body.write(piece)
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, size, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024))
+
+
+def main(rows: int, batch: int) -> None:
+    engine = create_engine(DATABASE_URL, future=True, connect_args={"options": f"-csearch_path={SCHEMA},public"})
+    cases = {"JSON list": ("json", parse_json), "Arrow IPC stream": ("arrow", parse_arrow), "Parquet": ("parquet", parse_parquet)}
+    try:
+        with engine.begin() as conn:
+            setup(conn, rows)
+        print(f"{rows} rows, export batches of {batch}")
+        print(f"  {'format':18} {'produce s':>9} {'size MB':>8} {'peak RSS +MB':>13} {'parse s':>8}")
+        context = multiprocessing.get_context("fork")
+        for label, (case, parse) in cases.items():
+            with tempfile.NamedTemporaryFile() as body:
+                results = context.Queue()
+                child = context.Process(target=produce, args=(engine, case, batch, body.name, results))
+                child.start()
+                produce_s, size, rss_mb = results.get()
+                child.join()
+                data = body.read()
+            start = time.perf_counter()
+            parsed = parse(data)
+            parse_s = time.perf_counter() - start
+            assert parsed == rows // 12 * 12
+            print(f"  {label:18} {produce_s:9.2f} {size / 1048576:8.1f} {rss_mb:13.1f} {parse_s:8.2f}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.rows, args.batch)
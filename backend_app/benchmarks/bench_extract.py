@@ -0,0 +1,69 @@
+"""
+DOM extraction benchmark: per-element Playwright calls vs one page.evaluate.
+
+    python -m backend_app.benchmarks.bench_extract --links 2000 --runs 5
+
+Needs a local Chromium (`python -m playwright install chromium`). The page
+is generated in-process with set_content, so network time is excluded.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from playwright.async_api import async_playwright
+
+from backend_app.common.extract import EXTRACT_FEATURES_JS
+
+
+def synthetic_category_page(links: int) -> str:
+    cards = "".join(
+        f'<div class="card"><h3>Product {i}</h3><a href="/products/p{i}">View</a>'
+        f'<span class="price">${i}.00</span><button>Quick add</button></div>'
+        for i in range(links)
+    )
+    return (
+        "<html><head><title>Collection</title><meta name='description' content='All products'></head>"
+        f"<body><h1>All products</h1><form action='/search'><input name='q'></form>{cards}</body></html>"
+    )
+
+
+async def legacy_extract(page) -> dict:
+    """The extraction scrape_page used before the single-evaluate engine."""
+    headings = [await el.inner_text() for el in await page.query_selector_all("h1, h2, h3")]
+    ctas = [await el.get_attribute("href") for el in await page.query_selector_all("a, button") if await el.get_attribute("href")]
+    forms = [await el.get_attribute("action") for el in await page.query_selector_all("form") if await el.get_attribute("action")]
+    return {"headings": headings, "ctas": ctas, "forms": forms}
+
+
+async def timed(fn, page, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn(page)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(links: int, runs: int) -> None:
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(synthetic_category_page(links))
+
+        legacy = await timed(legacy_extract, page, runs)
+        bundle = await timed(lambda pg: pg.evaluate(EXTRACT_FEATURES_JS), page, runs)
+        await browser.close()
+
+    print(f"page with {links} product cards, {runs} runs")
+    print(f"  per-element : median {statistics.median(legacy):8.1f} ms")
+    print(f"  evaluate    : median {statistics.median(bundle):8.1f} ms")
+    print(f"  speedup     : {statistics.median(legacy) / statistics.median(bundle):8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.links, args.runs))
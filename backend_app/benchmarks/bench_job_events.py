@@ -0,0 +1,100 @@
+"""
+Job log events: one transaction per event (the /v1/jobs routes today) vs the
+write-behind buffer, and job status lookups from job_logs vs
+job_status_current.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.bench_job_events --events 20000
+
+Runs in a scratch schema (dropped afterwards). --concurrency tasks emit
+--events events for --jobs jobs (ack then done, in a loop); then the
+latest status of random jobs is read both ways.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend_app.common.job_events import JobEventBuffer, job_event
+from backend_app.db import DATABASE_URL
+from backend_app.db_models import Base, DBJobLog, DBJobStatusCurrent, JobStatus
+
+SCHEMA = "bench_job_events"
+WORKSPACE = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+async def emit(buffer: JobEventBuffer, events: int, jobs: int, concurrency: int) -> float:
+    async def worker(offset: int):
+        for n in range(offset, events, concurrency):
+            status = (JobStatus.ACK, JobStatus.DONE)[n // jobs % 2]
+            await buffer.record(job_event(WORKSPACE, {"jobId": f"job-{n % jobs}", "message": "bench"}, status))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    await buffer.stop()
+    return time.perf_counter() - start
+
+
+async def lookup_ms(sessions, jobs: int, runs: int) -> dict:
+    old = (
+        select(DBJobLog.status)
+        .where(DBJobLog.workspace_id == WORKSPACE, DBJobLog.job_id == text(":job_id"))
+        .order_by(DBJobLog.created_at.desc())
+        .limit(1)
+    )
+    samples = {"job_logs (sort)": [], "job_status_current": []}
+    async with sessions() as session:
+        for _ in range(runs):
+            job_id = f"job-{random.randrange(jobs)}"
+            start = time.perf_counter()
+            await session.scalar(old, {"job_id": job_id})
+            samples["job_logs (sort)"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            await session.get(DBJobStatusCurrent, (WORKSPACE, job_id))
+            samples["job_status_current"].append((time.perf_counter() - start) * 1000)
+            session.expunge_all()
+    return {label: statistics.median(values) for label, values in samples.items()}
+
+
+async def main(events: int, jobs: int, concurrency: int, runs: int) -> None:
+    engine = create_async_engine(DATABASE_URL, pool_size=concurrency, connect_args={"options": f"-csearch_path={SCHEMA},public"})
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all, tables=[DBJobLog.__table__, DBJobStatusCurrent.__table__])
+
+        direct = await emit(JobEventBuffer(session_factory=sessions), events, jobs, concurrency)
+        buffered = JobEventBuffer(session_factory=sessions)
+        await buffered.start()
+        behind = await emit(buffered, events, jobs, concurrency)
+
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE job_logs; ANALYZE job_status_current"))
+        lookups = await lookup_ms(sessions, jobs, runs)
+
+        print(f"{events} events from {concurrency} tasks over {jobs} jobs")
+        print(f"  per-event transaction {events / direct:10.0f} events/s")
+        print(f"  write-behind buffer   {events / behind:10.0f} events/s ({buffered.flushes} flushes, including the final drain)")
+        print(f"  status lookup ({runs} runs, median), {events * 2} log rows")
+        for label, ms in lookups.items():
+            print(f"  {label:21} {ms:10.2f} ms")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.jobs, args.concurrency, args.runs))
@@ -0,0 +1,73 @@
+"""
+Instrumentation overhead benchmark.
+
+    python -m backend_app.benchmarks.bench_metrics --requests 5000
+
+Times a trivial route through the ASGI stack with and without
+MetricsMiddleware (no network: httpx.ASGITransport), and the raw cost of the
+histogram/counter calls used on the crawl, LLM and ingestion paths.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import timeit
+
+import httpx
+from fastapi import FastAPI
+
+from backend_app.common import metrics
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/ping/{n}")
+    async def ping(n: int):
+        return {"n": n}
+
+    return app
+
+
+async def per_request_us(app: FastAPI, requests: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(200):  # warm up
+            await client.get(f"/ping/{i}")
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/ping/{i}")
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def timed_block() -> None:
+    with metrics.observe(metrics.scrape_phase_duration, phase="goto"):
+        pass
+
+
+def primitive_us(stmt, number: int = 200_000) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def main(requests: int, runs: int) -> None:
+    plain = [asyncio.run(per_request_us(make_app(False), requests)) for _ in range(runs)]
+    instrumented = [asyncio.run(per_request_us(make_app(True), requests)) for _ in range(runs)]
+    base, inst = statistics.median(plain), statistics.median(instrumented)
+
+    print(f"{requests} requests x {runs} runs through the ASGI stack")
+    print(f"  without middleware : {base:8.1f} us/request")
+    print(f"  with middleware    : {inst:8.1f} us/request")
+    print(f"  overhead           : {inst - base:8.1f} us/request ({(inst - base) / base * 100:.1f}%)")
+    print("primitives")
+    print(f"  histogram.labels().observe : {primitive_us(lambda: metrics.scrape_phase_duration.labels(phase='goto').observe(0.1)):6.2f} us")
+    print(f"  observe() context manager  : {primitive_us(timed_block):6.2f} us")
+    print(f"  record_ingest()            : {primitive_us(lambda: metrics.record_ingest('bench', 500, 0.1)):6.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    main(args.requests, args.runs)
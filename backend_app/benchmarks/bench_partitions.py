@@ -0,0 +1,140 @@
+"""
+campaign_metrics layout benchmark: single heap table with B-tree indexes (the
+original schema) vs monthly range partitions with BRIN on ts.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.bench_partitions --rows 2000000
+
+Builds both layouts in a scratch schema (dropped afterwards), loads the same
+rows spread over --months months in time order, then times bulk inserts,
+a one-month range aggregate, and removing the oldest month.
+"""
+import argparse
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy import create_engine, text
+
+from backend_app.common.partitions import add_months, partition_name
+from backend_app.db import DATABASE_URL
+
+SCHEMA = "bench_partitions"
+START = date(2025, 1, 1)
+
+COLUMNS = """
+    id uuid NOT NULL DEFAULT gen_random_uuid(),
+    workspace_id uuid NOT NULL,
+    source varchar(64) NOT NULL,
+    ts timestamptz NOT NULL,
+    metric varchar(128) NOT NULL,
+    value double precision NOT NULL,
+    created_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+    updated_at timestamptz DEFAULT CURRENT_TIMESTAMP
+"""
+
+
+def create_layouts(conn, months: int) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+
+    conn.execute(text(f"CREATE TABLE heap ({COLUMNS}, PRIMARY KEY (id), UNIQUE (workspace_id, source, ts, metric))"))
+    conn.execute(text("CREATE INDEX heap_workspace ON heap (workspace_id)"))
+    conn.execute(text("CREATE INDEX heap_ts ON heap (ts)"))
+
+    conn.execute(text(f"CREATE TABLE campaign_metrics ({COLUMNS}, PRIMARY KEY (id, ts), UNIQUE (workspace_id, source, ts, metric)) PARTITION BY RANGE (ts)"))
+    conn.execute(text("CREATE INDEX campaign_metrics_ts_brin ON campaign_metrics USING brin (ts)"))
+    for i in range(months):
+        month = add_months(START, i)
+        conn.execute(text(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF campaign_metrics "
+            f"FOR VALUES FROM ('{month} 00:00+00') TO ('{add_months(month, 1)} 00:00+00')"
+        ))
+
+
+def load(conn, table: str, rows: int, months: int, batch: int) -> float:
+    """Insert rows in time order, batch at a time, with 20 workspaces x 3 sources x 4 metrics."""
+    span = f"{months} months"
+    elapsed = 0.0
+    for offset in range(0, rows, batch):
+        stmt = text(f"""
+            INSERT INTO {table} (workspace_id, source, ts, metric, value)
+            SELECT ('00000000-0000-0000-0000-0000000000' || lpad((g % 20)::text, 2, '0'))::uuid,
+                   (ARRAY['meta', 'google', 'tiktok'])[1 + (g / 20) % 3],
+                   TIMESTAMPTZ '{START} 00:00+00' + (INTERVAL '{span}') * (g::float8 / :rows),
+                   (ARRAY['spend', 'clicks', 'impressions', 'conversions'])[1 + (g / 60) % 4],
+                   random() * 100
+            FROM generate_series(:lo, :hi) AS g
+        """)
+        start = time.perf_counter()
+        conn.execute(stmt, {"rows": rows, "lo": offset, "hi": min(offset + batch, rows) - 1})
+        elapsed += time.perf_counter() - start
+    conn.execute(text(f"ANALYZE {table}"))
+    return elapsed
+
+
+def range_scan_ms(conn, table: str, runs: int) -> float:
+    month = add_months(START, 6)
+    stmt = text(f"""
+        SELECT metric, sum(value) FROM {table}
+        WHERE workspace_id = '00000000-0000-0000-0000-000000000007'
+          AND ts >= '{month} 00:00+00' AND ts < '{add_months(month, 1)} 00:00+00'
+        GROUP BY metric
+    """)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        conn.execute(stmt).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def index_mb(conn, table: str) -> float:
+    """Index size of the table, summed over its partitions if it has any."""
+    return conn.execute(text(
+        "SELECT sum(pg_indexes_size(oid)) / 1048576.0 FROM pg_class "
+        "WHERE oid = CAST(:t AS regclass) OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:t AS regclass))"
+    ), {"t": f"{SCHEMA}.{table}"}).scalar()
+
+
+def main(rows: int, months: int, batch: int, runs: int) -> None:
+    engine = create_engine(DATABASE_URL, future=True)
+    try:
+        with engine.begin() as conn:
+            create_layouts(conn, months)
+        results = {}
+        for label, table in (("heap + B-tree", "heap"), ("partitioned + BRIN", "campaign_metrics")):
+            with engine.begin() as conn:
+                conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+                insert_s = load(conn, table, rows, months, batch)
+            with engine.begin() as conn:
+                conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+                scan = range_scan_ms(conn, table, runs)
+                size = index_mb(conn, table)
+                start = time.perf_counter()
+                if table == "heap":
+                    conn.execute(text(f"DELETE FROM heap WHERE ts < '{add_months(START, 1)} 00:00+00'"))
+                else:
+                    conn.execute(text(f"ALTER TABLE campaign_metrics DETACH PARTITION {partition_name(START)}"))
+                    conn.execute(text(f"DROP TABLE {partition_name(START)}"))
+                retention = (time.perf_counter() - start) * 1000
+            results[label] = (insert_s, scan, size, retention)
+
+        print(f"{rows} rows over {months} months, inserted in batches of {batch}")
+        print(f"  {'layout':20} {'insert rows/s':>14} {'1-month scan':>13} {'index MB':>9} {'drop month':>11}")
+        for label, (insert_s, scan, size, retention) in results.items():
+            print(f"  {label:20} {rows / insert_s:14.0f} {scan:10.1f} ms {size:9.1f} {retention:8.1f} ms")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.months, args.batch, args.runs)
@@ -0,0 +1,55 @@
+"""
+Cost of the /v1 admission checks: one token-bucket take per backend, and
+an uncontended ingestion gate acquire/release.
+
+    python -m backend_app.benchmarks.bench_rate_limit --checks 200000
+
+Keys cycle over --workspaces workspace ids; the sqlite backend uses a
+scratch file that is removed afterwards.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from backend_app.common.rate_limit import ConcurrencyGate, MemoryBuckets, SqliteBuckets, WorkspaceLimiter
+
+
+def per_check_us(limiter: WorkspaceLimiter, checks: int, workspaces: int) -> float:
+    keys = [f"{n:08x}-0000-0000-0000-000000000000" for n in range(workspaces)]
+    start = time.perf_counter()
+    for n in range(checks):
+        limiter.check(keys[n % workspaces], 4096)
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+async def gate_us(checks: int) -> float:
+    gate = ConcurrencyGate(limit=8)
+    start = time.perf_counter()
+    for _ in range(checks):
+        await gate.acquire()
+        gate.release()
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def main(checks: int, workspaces: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "memory bucket": per_check_us(WorkspaceLimiter(MemoryBuckets(), rate=1e9, burst=1e9), checks, workspaces),
+            "sqlite bucket": per_check_us(
+                WorkspaceLimiter(SqliteBuckets(os.path.join(tmp, "rl.sqlite")), rate=1e9, burst=1e9), checks // 10, workspaces,
+            ),
+            "ingestion gate": asyncio.run(gate_us(checks)),
+        }
+    print(f"{checks} checks over {workspaces} workspaces (sqlite: {checks // 10})")
+    for label, us in results.items():
+        print(f"  {label:15} {us:8.2f} us/check")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--workspaces", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.checks, args.workspaces)
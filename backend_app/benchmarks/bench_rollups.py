@@ -0,0 +1,123 @@
+"""
+Month-range metric queries: aggregating raw campaign_metrics vs reading the
+hourly/daily rollups, plus what keeping the rollups current costs a merge.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.bench_rollups --rows 2000000
+
+Builds campaign_metrics, its partitions and the rollup tables in a scratch
+schema (dropped afterwards), loads --rows rows at one-minute resolution for
+one workspace (3 sources x 4 metrics), builds the rollups, then times a
+one-month daily series per metric three ways and a --merge-rows merge with
+and without the rollup refresh.
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend_app.common import ingest, rollups
+from backend_app.common.models import CampaignMetricRow
+from backend_app.common.partitions import add_months, ensure_partitions
+from backend_app.db import DATABASE_URL
+from backend_app.db_models import Base, DBCampaignMetric, DBCampaignMetricDaily, DBCampaignMetricHourly
+
+SCHEMA = "bench_rollups"
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+WORKSPACE = uuid.UUID("00000000-0000-0000-0000-000000000001")
+MONTH = (datetime(2025, 3, 1, tzinfo=timezone.utc), datetime(2025, 4, 1, tzinfo=timezone.utc))
+
+QUERIES = {
+    "raw campaign_metrics": """
+        SELECT metric, date_trunc('day', ts AT TIME ZONE 'UTC') AS day, sum(value), min(value), max(value)
+        FROM campaign_metrics WHERE workspace_id = :ws AND ts >= :start AND ts < :end
+        GROUP BY 1, 2
+    """,
+    "hourly rollup": """
+        SELECT metric, date_trunc('day', bucket AT TIME ZONE 'UTC') AS day, sum(value_sum), min(value_min), max(value_max)
+        FROM campaign_metrics_hourly WHERE workspace_id = :ws AND bucket >= :start AND bucket < :end
+        GROUP BY 1, 2
+    """,
+    "daily rollup": """
+        SELECT metric, bucket, sum(value_sum), min(value_min), max(value_max)
+        FROM campaign_metrics_daily WHERE workspace_id = :ws AND bucket >= :start AND bucket < :end
+        GROUP BY 1, 2
+    """,
+}
+
+
+def setup(conn, rows: int) -> int:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    Base.metadata.create_all(conn, tables=[t.__table__ for t in (DBCampaignMetric, DBCampaignMetricHourly, DBCampaignMetricDaily)])
+    minutes = rows // 12
+    months = (minutes // (60 * 24 * 28)) + 2
+    ensure_partitions(conn, [add_months(date(2025, 1, 1), i) for i in range(months)])
+    conn.execute(text("""
+        INSERT INTO campaign_metrics (id, workspace_id, source, ts, metric, value)
+        SELECT gen_random_uuid(), :ws, s, :start + make_interval(mins => g), m, random() * 100
+        FROM generate_series(0, :minutes - 1) AS g,
+             unnest(ARRAY['meta', 'google', 'tiktok']) AS s,
+             unnest(ARRAY['spend', 'clicks', 'impressions', 'conversions']) AS m
+    """), {"ws": WORKSPACE, "start": START, "minutes": minutes})
+    return minutes * 12
+
+
+def timed_ms(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(rows: int, merge_rows: int, runs: int) -> None:
+    # search_path on the connection itself: a SET would be undone by the rollbacks below
+    engine = create_engine(DATABASE_URL, future=True, connect_args={"options": f"-csearch_path={SCHEMA},public"})
+    try:
+        with engine.begin() as conn:
+            loaded = setup(conn, rows)
+        with Session(engine) as session:
+            start = time.perf_counter()
+            rollups.rebuild_rollups(session, WORKSPACE, START, START + timedelta(days=3650))
+            rebuild_s = time.perf_counter() - start
+            session.commit()
+            session.execute(text("ANALYZE campaign_metrics; ANALYZE campaign_metrics_hourly; ANALYZE campaign_metrics_daily"))
+
+            print(f"{loaded} raw rows; rollups rebuilt in {rebuild_s:.1f} s")
+            print(f"  one-month daily series per metric ({runs} runs, median)")
+            params = {"ws": WORKSPACE, "start": MONTH[0], "end": MONTH[1]}
+            for label, sql in QUERIES.items():
+                print(f"  {label:22} {timed_ms(lambda: session.execute(text(sql), params).all(), runs):8.2f} ms")
+
+            # Re-upsert a slice of existing rows (corrections) with and without the refresh.
+            batch = [
+                CampaignMetricRow(source="meta", ts=MONTH[0] + timedelta(minutes=i), metric="spend", value=i)
+                for i in range(merge_rows)
+            ]
+            refresh = ingest.refresh_rollups
+            results = {}
+            for label, hook in (("merge only", lambda session, ws: None), ("merge + rollups", refresh)):
+                ingest.refresh_rollups = hook
+                results[label] = timed_ms(lambda: (ingest.merge_campaign_metrics(session, WORKSPACE, batch), session.rollback()), runs)
+            ingest.refresh_rollups = refresh
+            print(f"  merge of {merge_rows} corrected rows")
+            for label, ms in results.items():
+                print(f"  {label:22} {ms:8.2f} ms")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--merge-rows", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.merge_rows, args.runs)
@@ -0,0 +1,83 @@
+"""
+Rule pre-audit throughput: feature extraction and rule evaluation over
+thousands of crawled pages, one evaluate() call per page vs one per batch.
+
+    python -m backend_app.benchmarks.bench_rules --pages 5000
+
+Builds --pages synthetic PageFeatures (40 links and buttons, forms, images,
+reviews and prices varied per page) across home, collection and product
+pages, then for each goal reports pages/s and how many pages the rules
+alone answer, i.e. model calls avoided.
+"""
+import argparse
+import random
+import time
+
+from backend_app.common.rules import RULES_BY_GOAL, evaluate_table, page_columns, pre_audit
+
+CTA_TEXT = ["Add to cart", "Shop now", "Sign up", "Learn more", "Buy it now", "Our story", "Contact", "Size guide", "Free shipping over $50", "Reviews"]
+
+
+def make_page(rng: random.Random) -> dict:
+    page_type = rng.choice(["home", "collection", "product", "product"])
+    ctas = [
+        {
+            "tag": rng.choice(["a", "a", "button"]),
+            "text": rng.choice(CTA_TEXT),
+            "href": rng.choice(["/products/hat", "/collections/all", "/pages/about", None]),
+            "visible": rng.random() > 0.1,
+            "above_fold": rng.random() < 0.2,
+        }
+        for _ in range(40)
+    ]
+    forms = [{"action": "/cart/add", "has_email": False, "text": "", "above_fold": rng.random() < 0.5}] if page_type == "product" else []
+    if rng.random() < 0.7:
+        forms.append({"action": "/contact#newsletter", "has_email": True, "text": rng.choice(["Join our list", "Get 10% off"]), "above_fold": False})
+    return {
+        "url": f"https://shop{rng.randrange(1000)}.example/",
+        "page_type": page_type,
+        "features": {
+            "headings": [{"level": rng.choice([1, 2, 2, 3]), "text": "Warm merino beanies"} for _ in range(rng.randrange(1, 8))],
+            "ctas": ctas,
+            "forms": forms,
+            "meta": {"description": "Hats" if rng.random() < 0.6 else None},
+            "images": [
+                {"src": f"/i{n}.jpg", "alt": rng.choice(["", "Hat"]), "width": rng.choice([800, 4000]), "rendered_width": 400, "above_fold": n < 2}
+                for n in range(12)
+            ],
+            "prices": ["$ 20.00"] * rng.randrange(0, 3),
+            "reviews": ["judgeme"] if rng.random() < 0.4 else [],
+        },
+    }
+
+
+def main(pages: int, seed: int) -> None:
+    rng = random.Random(seed)
+    batch = [make_page(rng) for _ in range(pages)]
+    print(f"{pages} pages")
+
+    start = time.perf_counter()
+    table = page_columns(batch)
+    extract_us = (time.perf_counter() - start) / pages * 1e6
+    print(f"  feature columns: {extract_us:.1f} us/page")
+
+    print(f"  {'goal':30} {'batch pages/s':>14} {'per-page pages/s':>17} {'rules only':>11}")
+    for goal in [g for g in RULES_BY_GOAL if g != "*"]:
+        start = time.perf_counter()
+        reports = evaluate_table(table, goal)
+        batch_s = time.perf_counter() - start + extract_us * pages / 1e6
+        sample = batch[:min(pages, 500)]
+        start = time.perf_counter()
+        for page in sample:
+            pre_audit(page, goal)
+        single_s = (time.perf_counter() - start) / len(sample) * pages
+        rules_only = sum(not report.needs_llm for report in reports)
+        print(f"  {goal:30} {pages / batch_s:14.0f} {pages / single_s:17.0f} {rules_only / pages:10.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.pages, args.seed)
@@ -0,0 +1,113 @@
+"""
+Screenshots inline in the crawl vs deferred to ScreenshotService.
+
+    python -m backend_app.benchmarks.bench_screenshots --crawls 20 --goto-ms 400 --shot-ms 120
+
+The browser is simulated: page loads take --goto-ms and each screenshot
+--shot-ms (the crawl itself also loads the page once). The PNGs are real,
+page-like 1280 px renders, so downscale + WebP encode and the store are
+measured for real. "inline" loads the page a second time, captures, encodes
+and stores before answering; "deferred" answers after the crawl and reports
+how long the follow-up stage takes to drain. Also prints PNG vs WebP sizes.
+"""
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+from PIL import Image, ImageDraw
+
+from backend_app.common.artifacts import ArtifactStore, LocalDiskStorage
+from backend_app.common.screenshots import ScreenshotService, encode_webp
+
+
+def render(height: int, seed: int) -> bytes:
+    """A product-grid-like page: header, cards with image blocks and text lines."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (1280, height), (250, 250, 250))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 1280, 90), fill=(30, 30, 40))
+    for y in range(120, height - 300, 340):
+        for x in range(40, 1200, 300):
+            draw.rectangle((x, y, x + 260, y + 200), fill=tuple(rng.randrange(60, 230) for _ in range(3)))
+            for line in range(3):
+                draw.text((x, y + 215 + line * 18), f"Merino wool beanie {rng.randrange(999)}  $ {rng.randrange(10, 99)}.00", fill=(20, 20, 20))
+    out = io.BytesIO()
+    img.save(out, "PNG")
+    return out.getvalue()
+
+
+class SimulatedPool:
+    started = True
+
+    def __init__(self, goto_ms: float, shot_ms: float, above: bytes, full: bytes):
+        self.goto_ms, self.shot_ms, self.above, self.full = goto_ms, shot_ms, above, full
+
+    @asynccontextmanager
+    async def context(self, **options):
+        yield self
+
+    async def new_page(self):
+        return self
+
+    async def goto(self, url, timeout=None):
+        await asyncio.sleep(self.goto_ms / 1000)
+
+    async def screenshot(self, type="png", full_page=False, clip=None):
+        await asyncio.sleep(self.shot_ms / 1000)
+        return self.full if full_page else self.above
+
+    async def evaluate(self, script):
+        return 6000
+
+
+async def run(crawls: int, goto_ms: float, shot_ms: float, mode: str, root: str) -> tuple[list[float], float]:
+    above, full = render(800, 1), render(6000, 1)
+    pool = SimulatedPool(goto_ms, shot_ms, above, full)
+    service = ScreenshotService(pool=pool, store=ArtifactStore(LocalDiskStorage(root)), max_pending=crawls)
+
+    async def crawl(n: int) -> float:
+        start = time.perf_counter()
+        await pool.goto(f"https://shop.example/p/{n}")  # the crawl's own page load
+        if mode == "inline":
+            await service.capture(f"https://shop.example/p/{n}")
+        else:
+            service.schedule(f"https://shop.example/p/{n}", f"page-{n}")
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(crawl(n) for n in range(crawls)))
+    await asyncio.gather(*service._tasks.values())
+    drained = time.perf_counter() - start
+    await service.stop()
+    return latencies, drained
+
+
+def main(crawls: int, goto_ms: float, shot_ms: float) -> None:
+    above, full = render(800, 1), render(6000, 1)
+    start = time.perf_counter()
+    above_webp, full_webp = encode_webp(above), encode_webp(full)
+    encode_ms = (time.perf_counter() - start) * 1000
+    print(f"above the fold: PNG {len(above)} B -> WebP {len(above_webp)} B; full page: PNG {len(full)} B -> WebP {len(full_webp)} B; encode {encode_ms:.0f} ms")
+
+    print(f"{crawls} concurrent crawls, goto {goto_ms:.0f} ms, screenshot {shot_ms:.0f} ms")
+    print(f"  {'':10} {'p50 ms':>8} {'p95 ms':>8} {'all done s':>11}")
+    for mode in ("inline", "deferred"):
+        with tempfile.TemporaryDirectory() as tmp:
+            latencies, drained = asyncio.run(run(crawls, goto_ms, shot_ms, mode, tmp))
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"  {mode:10} {statistics.median(latencies):8.0f} {p95:8.0f} {drained:11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crawls", type=int, default=20)
+    parser.add_argument("--goto-ms", type=float, default=400)
+    parser.add_argument("--shot-ms", type=float, default=120)
+    args = parser.parse_args()
+    main(args.crawls, args.goto_ms, args.shot_ms)
@@ -0,0 +1,65 @@
+"""
+Shop token lookups: a fresh sqlite connection per call (the old
+get_access_token) vs ShopTokenStore over one connection, cold and cached,
+and a bulk prefetch vs one lookup per shop.
+
+    python -m backend_app.benchmarks.bench_shop_tokens --shops 2000
+
+Builds a Prisma-shaped Shop table with --shops rows in a scratch file.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from backend_app.services.shop_data import ShopTokenStore, SqliteTokenSource
+
+
+def connect_per_call(path: str, shop: str) -> str:
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT accessToken FROM Shop WHERE shopDomain = ?", (shop,))
+    result = cursor.fetchone()
+    conn.close()
+    return result[0]
+
+
+def per_call_us(fn, shops: list[str]) -> float:
+    start = time.perf_counter()
+    for shop in shops:
+        fn(shop)
+    return (time.perf_counter() - start) / len(shops) * 1e6
+
+
+def main(shops: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dev.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE Shop (id TEXT PRIMARY KEY, shopDomain TEXT UNIQUE NOT NULL, accessToken TEXT NOT NULL)")
+        conn.executemany("INSERT INTO Shop VALUES (?, ?, ?)", [(f"id{n}", f"shop{n}.myshopify.com", f"shpat_{n:032x}") for n in range(shops)])
+        conn.commit()
+        conn.close()
+        names = [f"shop{n}.myshopify.com" for n in range(shops)]
+
+        store = ShopTokenStore(SqliteTokenSource(path), ttl=300)
+        results = {
+            "connect per call": per_call_us(lambda shop: connect_per_call(path, shop), names),
+            "store, cold": per_call_us(store.get, names),
+            "store, cached": per_call_us(store.get, names),
+        }
+        store.clear()
+        start = time.perf_counter()
+        store.prefetch(names)
+        results["prefetch (bulk)"] = (time.perf_counter() - start) / shops * 1e6
+
+    print(f"{shops} shops")
+    for label, us in results.items():
+        print(f"  {label:17} {us:8.2f} us/shop")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shops", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.shops)
@@ -0,0 +1,87 @@
+"""
+/v1/suggestions/import throughput: per-row upsert loop vs multi-row chunks.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.bench_suggestions_import --rows 20000
+
+Runs against the suggestions table of DATABASE_URL (migrated) inside scratch
+workspaces that are deleted afterwards. Each strategy is timed twice: a cold
+run that inserts every row and a warm run that updates every row.
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from backend_app.common.ingest import INSERTED, suggestion_row, upsert_suggestions
+from backend_app.common.models import SuggestionIn
+from backend_app.db import SessionLocal
+from backend_app.db_models import DBSuggestion
+
+
+def make_items(n: int) -> list[SuggestionIn]:
+    return [
+        SuggestionIn(
+            title=f"Suggestion {i}",
+            uniqueKey=f"bench-{i}",
+            summary="Move the primary CTA above the fold.",
+            how=["Reorder the product template", "A/B test the change"],
+            meta={"source": "bench"},
+        )
+        for i in range(n)
+    ]
+
+
+def per_row(session, ws, items) -> dict:
+    """The loop import_suggestions used before the bulk path."""
+    created = updated = 0
+    for item in items:
+        row = suggestion_row(ws, item)
+        stmt = pg_insert(DBSuggestion).values(**row)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_suggestions_workspace_uniquekey",
+            set_={"title": stmt.excluded.title, "payload": stmt.excluded.payload},
+        ).returning(INSERTED)
+        if session.execute(stmt).scalar():
+            created += 1
+        else:
+            updated += 1
+    return {"created": created, "updated": updated}
+
+
+def timed(fn, ws, items) -> tuple[float, dict]:
+    with SessionLocal() as session:
+        start = time.perf_counter()
+        counts = fn(session, ws, items)
+        session.commit()
+        return time.perf_counter() - start, counts
+
+
+def main(rows: int, chunk_size: int) -> None:
+    items = make_items(rows)
+    strategies = {
+        "per-row": per_row,
+        f"bulk/{chunk_size}": lambda s, ws, it: upsert_suggestions(s, ws, it, chunk_size=chunk_size),
+    }
+    workspaces = []
+    print(f"{rows} suggestions")
+    try:
+        for name, fn in strategies.items():
+            ws = uuid.uuid4()
+            workspaces.append(ws)
+            for phase in ("insert", "update"):
+                seconds, counts = timed(fn, ws, items)
+                print(f"  {name:12} {phase:6}: {seconds:7.2f} s  {rows / seconds:9.0f} rows/s  {counts}")
+    finally:
+        with SessionLocal() as session:
+            session.execute(delete(DBSuggestion).where(DBSuggestion.workspace_id.in_(workspaces)))
+            session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.rows, args.chunk_size)
@@ -0,0 +1,121 @@
+"""
+/v1/suggestions page fetches: OFFSET pagination on the old schema (only a
+workspace_id index) vs keyset pagination on the new composite, expression
+and GIN indexes.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.bench_suggestions_page --rows 500000
+
+Loads --rows suggestions for one workspace (plus as many spread over other
+workspaces) into a scratch schema (dropped afterwards) and times a first
+page and a deep page (--depth rows in), unfiltered and filtered on
+priority and impact.
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from backend_app.common.suggestions import PRIORITY, list_suggestions
+from backend_app.db_models import Base, DBSuggestion
+from backend_app.db import DATABASE_URL
+
+SCHEMA = "bench_suggestions_page"
+WORKSPACE = uuid.UUID("00000000-0000-0000-0000-000000000001")
+NEW_INDEXES = [index.name for index in DBSuggestion.__table__.indexes]
+FILTERS = {"unfiltered": {}, "priority=High": {"priorities": ["High"]}, "impact=High": {"impacts": ["High"]}}
+
+
+def setup(conn, rows: int) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    Base.metadata.create_all(conn, tables=[DBSuggestion.__table__])
+    conn.execute(text("""
+        INSERT INTO suggestions (id, workspace_id, unique_key, title, payload, state, created_at)
+        SELECT gen_random_uuid(),
+               CASE WHEN g % 2 = 0 THEN CAST(:ws AS uuid) ELSE gen_random_uuid() END,
+               'k' || g, 'Suggestion ' || g,
+               jsonb_build_object(
+                   'priority', (ARRAY['High', 'Medium', 'Low'])[1 + g % 3],
+                   'category', (ARRAY['Marketing', 'Merchandising', 'Operations'])[1 + g % 5 % 3],
+                   'impact', (ARRAY['High', 'Medium', 'Low', 'Low'])[1 + g % 4 % 4],
+                   'summary', repeat('x', 200)),
+               'NEW', TIMESTAMPTZ '2025-01-01' + make_interval(secs => g / 2)
+        FROM generate_series(0, :rows * 2 - 1) AS g
+    """), {"ws": WORKSPACE, "rows": rows})
+    conn.execute(text("ANALYZE suggestions"))
+
+
+def offset_page(session, filters: dict, offset: int, limit: int):
+    stmt = select(DBSuggestion).where(DBSuggestion.workspace_id == WORKSPACE)
+    if "priorities" in filters:
+        stmt = stmt.where(PRIORITY.in_(filters["priorities"]))
+    if "impacts" in filters:
+        stmt = stmt.where(DBSuggestion.payload.contains({"impact": filters["impacts"][0]}))
+    stmt = stmt.order_by(DBSuggestion.created_at.desc(), DBSuggestion.id.desc()).offset(offset).limit(limit)
+    return session.scalars(stmt).all()
+
+
+def keyset_cursor(session, filters: dict, depth: int, limit: int) -> str | None:
+    """Walk to depth in big strides; only the page fetched from the cursor is timed."""
+    cursor = None
+    while depth > 0:
+        step = min(depth, 1000)
+        cursor = list_suggestions(session, WORKSPACE, cursor=cursor, limit=step, **filters)["nextCursor"]
+        depth -= step
+    return cursor
+
+
+def median_ms(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(rows: int, depth: int, limit: int, runs: int) -> None:
+    engine = create_engine(DATABASE_URL, future=True, connect_args={"options": f"-csearch_path={SCHEMA},public"})
+    try:
+        with engine.begin() as conn:
+            setup(conn, rows)
+        results = {}
+        with Session(engine) as session:
+            for label, filters in FILTERS.items():
+                cursor = keyset_cursor(session, filters, depth, limit)
+                results[label] = {
+                    "keyset first": median_ms(lambda: list_suggestions(session, WORKSPACE, limit=limit, **filters), runs),
+                    "keyset deep": median_ms(lambda: list_suggestions(session, WORKSPACE, cursor=cursor, limit=limit, **filters), runs),
+                }
+        with engine.begin() as conn:
+            for name in NEW_INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+            conn.execute(text("CREATE INDEX ix_suggestions_workspace_id ON suggestions (workspace_id)"))
+            conn.execute(text("ANALYZE suggestions"))
+        with Session(engine) as session:
+            for label, filters in FILTERS.items():
+                results[label]["offset first (old)"] = median_ms(lambda: offset_page(session, filters, 0, limit), runs)
+                results[label]["offset deep (old)"] = median_ms(lambda: offset_page(session, filters, depth, limit), runs)
+
+        print(f"{rows} suggestions in the workspace ({rows * 2} total), pages of {limit}, deep page at {depth} rows")
+        columns = ["offset first (old)", "offset deep (old)", "keyset first", "keyset deep"]
+        print(f"  {'filter':14} " + " ".join(f"{c:>19}" for c in columns))
+        for label, timings in results.items():
+            print(f"  {label:14} " + " ".join(f"{timings[c]:16.2f} ms" for c in columns))
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--depth", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    main(args.rows, args.depth, args.limit, args.runs)
@@ -0,0 +1,125 @@
+"""
+Load test of the /v1 write routes on the sync (threadpool) and async
+database stacks.
+
+    DATABASE_URL=postgresql+psycopg://... python -m backend_app.benchmarks.load_service --concurrency 64 --duration 20
+
+For each stack, starts uvicorn serving only the service routers (with
+SERVICE_ASYNC_DB=0 or 1), then keeps --concurrency clients busy for
+--duration seconds with a mix of job log writes, 20-item suggestion imports
+and 50-row metric upserts, and reports requests per second and latency
+percentiles. DB_POOL_SIZE / DB_MAX_OVERFLOW apply to both stacks alike.
+Writes go to random workspace ids in the configured database.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+TOKEN = "load-test"
+
+
+def create_app() -> FastAPI:
+    """uvicorn --factory entry point: the service routers alone, no browser pool or LLM client."""
+    from backend_app.routes import service
+
+    app = FastAPI()
+    if os.getenv("SERVICE_ASYNC_DB", "1") == "1":
+        app.include_router(service.async_router)
+    app.include_router(service.router)
+    return app
+
+
+def _request(workspace: str, n: int) -> tuple[str, dict]:
+    kind = n % 4
+    if kind in (0, 1):
+        return "/v1/jobs/ack", {"jobId": f"job-{n}", "message": "queued"}
+    if kind == 2:
+        items = [{"title": f"Suggestion {n}-{i}", "priority": "High"} for i in range(20)]
+        return "/v1/suggestions/import", {"workspaceId": workspace, "items": items}
+    minute = random.randrange(60 * 24 * 28)
+    rows = [
+        {"source": "meta", "ts": f"2025-11-{1 + minute // 1440:02d}T{minute // 60 % 24:02d}:{minute % 60:02d}:00Z", "metric": f"m{i}", "value": i}
+        for i in range(50)
+    ]
+    return "/v1/data/upsert/campaign_metrics", {"workspaceId": workspace, "rows": rows}
+
+
+async def _client(client: httpx.AsyncClient, deadline: float, latencies: list[float], errors: list[int]) -> None:
+    workspace = str(uuid.uuid4())
+    n = random.randrange(4)
+    while time.perf_counter() < deadline:
+        path, body = _request(workspace, n)
+        n += 1
+        start = time.perf_counter()
+        resp = await client.post(path, json=body, headers={"X-Workspace-ID": workspace})
+        latencies.append(time.perf_counter() - start)
+        if resp.status_code != 200:
+            errors.append(resp.status_code)
+
+
+async def run_load(url: str, concurrency: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors: list[int] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60, headers={"Authorization": f"Bearer {TOKEN}"}) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(_client(client, deadline, latencies, errors) for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "rps": len(latencies) / duration,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": len(errors),
+    }
+
+
+def _serve(async_db: bool, port: int) -> subprocess.Popen:
+    env = {**os.environ, "SERVICE_ASYNC_DB": "1" if async_db else "0", "SERVICE_BEARER": TOKEN}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend_app.benchmarks.load_service:create_app", "--factory",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def main(concurrency: int, duration: float, port: int) -> None:
+    results = {}
+    for label, async_db in (("sync (threadpool)", False), ("async engine", True)):
+        server = _serve(async_db, port)
+        try:
+            asyncio.run(run_load(f"http://127.0.0.1:{port}", concurrency, 2))  # warm the pools
+            results[label] = asyncio.run(run_load(f"http://127.0.0.1:{port}", concurrency, duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{concurrency} concurrent clients for {duration:.0f} s, pool {os.getenv('DB_POOL_SIZE', '10')}+{os.getenv('DB_MAX_OVERFLOW', '10')}")
+    print(f"  {'stack':18} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, r in results.items():
+        print(f"  {label:18} {r['rps']:8.0f} {r['p50']:8.1f} {r['p99']:8.1f} {r['errors']:7d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    main(args.concurrency, args.duration, args.port)
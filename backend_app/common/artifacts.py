@@ -0,0 +1,260 @@
+# filepath: backend_app/common/artifacts.py
+"""
+Content-addressed store for crawl artifacts (rendered HTML).
+
+An artifact's id is the SHA-256 of its bytes, so the same page crawled for
+two shops is stored once. /crawl returns the id and consumers (/suggest,
+audits, GET /artifacts/{id}) load the HTML server-side when they need it,
+instead of the page crossing the network twice.
+
+Blobs are zstd-compressed in independent ARTIFACT_CHUNK_SIZE chunks behind
+a small offset index, so a byte-range read decompresses only the chunks it
+touches:
+
+    b"AAZ1" | chunk_size u32 | raw_size u64 | n_chunks u32 | n_chunks x end offset u64 | frames
+
+Storage is pluggable (ArtifactStorage); LocalDiskStorage keeps one file per
+blob under ARTIFACT_DIR. GC is age based: reads refresh a blob's mtime, and
+gc() deletes blobs unread for ARTIFACT_TTL seconds, then the least recently
+used ones while the store exceeds ARTIFACT_MAX_BYTES. It runs in a thread
+every ARTIFACT_GC_EVERY puts.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import struct
+import tempfile
+import time
+from typing import Iterable, Protocol
+
+import pyarrow as pa
+
+from backend_app.common.models import ArtifactRef
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "auditai-artifacts"))
+ARTIFACT_CHUNK_SIZE = int(os.getenv("ARTIFACT_CHUNK_SIZE", str(256 * 1024)))
+ARTIFACT_ZSTD_LEVEL = int(os.getenv("ARTIFACT_ZSTD_LEVEL", "3"))
+ARTIFACT_TTL = float(os.getenv("ARTIFACT_TTL", str(7 * 86400)))
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(2 * 1024 ** 3)))
+ARTIFACT_GC_EVERY = int(os.getenv("ARTIFACT_GC_EVERY", "500"))
+
+MAGIC = b"AAZ1"
+HEADER = struct.Struct("<4sIQI")
+ARTIFACT_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ArtifactNotFound(KeyError):
+    pass
+
+
+def artifact_id(data: bytes) -> str:
+    """The handle put_bytes gives data: content-addressed, so it is known before storing."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ArtifactStorage(Protocol):
+    def write(self, key: str, data: bytes) -> None:
+        """Store data under key atomically; a no-op (bar touching it) if key exists."""
+
+    def exists(self, key: str) -> bool: ...
+
+    def read(self, key: str, offset: int = 0, length: int | None = None) -> bytes: ...
+
+    def touch(self, key: str) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def scan(self) -> Iterable[tuple[str, int, float]]:
+        """(key, stored bytes, last access) for every blob."""
+
+
+class LocalDiskStorage:
+    def __init__(self, root: str = ARTIFACT_DIR):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            self.touch(key)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def read(self, key: str, offset: int = 0, length: int | None = None) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                if length is None:
+                    f.seek(offset)
+                    return f.read()
+                return os.pread(f.fileno(), length, offset)
+        except FileNotFoundError:
+            raise ArtifactNotFound(key)
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def scan(self) -> Iterable[tuple[str, int, float]]:
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if ARTIFACT_ID.match(entry.name):
+                    stat = entry.stat()
+                    yield entry.name, stat.st_size, stat.st_mtime
+
+
+def encode(data: bytes, chunk_size: int = ARTIFACT_CHUNK_SIZE, level: int = ARTIFACT_ZSTD_LEVEL) -> bytes:
+    codec = pa.Codec("zstd", compression_level=level)
+    frames = [codec.compress(data[i:i + chunk_size], asbytes=True) for i in range(0, len(data), chunk_size)]
+    ends, end = [], 0
+    for frame in frames:
+        end += len(frame)
+        ends.append(end)
+    index = struct.pack(f"<{len(ends)}Q", *ends)
+    return HEADER.pack(MAGIC, chunk_size, len(data), len(frames)) + index + b"".join(frames)
+
+
+class ArtifactStore:
+    def __init__(
+        self,
+        storage: ArtifactStorage | None = None,
+        chunk_size: int = ARTIFACT_CHUNK_SIZE,
+        ttl: float = ARTIFACT_TTL,
+        max_bytes: int = ARTIFACT_MAX_BYTES,
+        gc_every: int = ARTIFACT_GC_EVERY,
+    ):
+        self.storage = storage or LocalDiskStorage()
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.gc_every = gc_every
+        self._codec = pa.Codec("zstd")
+        self._puts = 0
+        self.stored = 0
+        self.deduplicated = 0
+        self.collected = 0
+
+    # -- sync API (called through asyncio.to_thread by the async wrappers) --
+    def put_bytes(self, data: bytes, content_type: str = "text/html") -> ArtifactRef:
+        key = artifact_id(data)
+        if self.storage.exists(key):
+            self.storage.touch(key)
+            self.deduplicated += 1
+            stored_size = self.ref(key).stored_size
+        else:
+            blob = encode(data, self.chunk_size)
+            self.storage.write(key, blob)
+            self.stored += 1
+            stored_size = len(blob)
+        self._puts += 1
+        if self.gc_every and self._puts % self.gc_every == 0:
+            self.gc()
+        return ArtifactRef(id=key, size=len(data), stored_size=stored_size, content_type=content_type)
+
+    def touch(self, key: str) -> bool:
+        """Mark an artifact as used so GC keeps it; False if it is gone (or was never stored)."""
+        if not ARTIFACT_ID.match(key) or not self.storage.exists(key):
+            return False
+        self.storage.touch(key)
+        return True
+
+    def _header(self, key: str) -> tuple[int, int, list[int], int]:
+        """(chunk_size, raw size, frame end offsets, offset of the first frame) of a blob."""
+        magic, chunk_size, raw_size, n_chunks = HEADER.unpack(self.storage.read(key, 0, HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Artifact {key} is not an AAZ1 blob")
+        ends = list(struct.unpack(f"<{n_chunks}Q", self.storage.read(key, HEADER.size, 8 * n_chunks)))
+        return chunk_size, raw_size, ends, HEADER.size + 8 * n_chunks
+
+    def read_bytes(self, key: str, offset: int = 0, length: int | None = None) -> bytes:
+        """Uncompressed bytes [offset, offset + length) of an artifact, decompressing only the chunks involved."""
+        if not ARTIFACT_ID.match(key):
+            raise ArtifactNotFound(key)
+        chunk_size, raw_size, ends, start = self._header(key)
+        stop = raw_size if length is None else min(raw_size, offset + length)
+        if offset >= stop:
+            return b""
+        first, last = offset // chunk_size, (stop - 1) // chunk_size
+        base = ends[first - 1] if first else 0
+        frames = self.storage.read(key, start + base, ends[last] - base)
+        self.storage.touch(key)
+        out = []
+        for n in range(first, last + 1):
+            frame_start = (ends[n - 1] if n else 0) - base
+            raw = min(chunk_size, raw_size - n * chunk_size)
+            out.append(self._codec.decompress(frames[frame_start:ends[n] - base], decompressed_size=raw, asbytes=True))
+        skip = offset - first * chunk_size
+        return b"".join(out)[skip:skip + (stop - offset)]
+
+    def ref(self, key: str) -> ArtifactRef:
+        if not ARTIFACT_ID.match(key):
+            raise ArtifactNotFound(key)
+        _, raw_size, ends, start = self._header(key)
+        return ArtifactRef(id=key, size=raw_size, stored_size=start + (ends[-1] if ends else 0))
+
+    def gc(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        blobs = sorted(self.storage.scan(), key=lambda blob: blob[2])
+        keep, removed = [], 0
+        for key, size, accessed in blobs:
+            if now - accessed >= self.ttl:
+                self.storage.delete(key)
+                removed += 1
+            else:
+                keep.append((key, size))
+        total = sum(size for _, size in keep)
+        for key, size in keep:  # least recently used first
+            if total <= self.max_bytes:
+                break
+            self.storage.delete(key)
+            total -= size
+            removed += 1
+        self.collected += removed
+        if removed:
+            logger.info(f"🧹 Artifact GC removed {removed} blobs, {total} bytes kept")
+        return removed
+
+    # -- async API ----------------------------------------------------------
+    async def put_text(self, text: str, content_type: str = "text/html") -> ArtifactRef:
+        return await asyncio.to_thread(self.put_bytes, text.encode("utf-8"), content_type)
+
+    async def get_text(self, handle: str | dict) -> str:
+        """HTML for an artifact handle: its id, or an ArtifactRef dict."""
+        key = handle.get("id", "") if isinstance(handle, dict) else handle
+        data = await asyncio.to_thread(self.read_bytes, key)
+        return data.decode("utf-8")
+
+    def stats(self) -> dict:
+        return {"stored": self.stored, "deduplicated": self.deduplicated, "collected": self.collected, "ttl": self.ttl, "max_bytes": self.max_bytes}
+
+
+artifact_store = ArtifactStore()
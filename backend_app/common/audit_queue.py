@@ -0,0 +1,262 @@
+# filepath: backend_app/common/audit_queue.py
+"""
+Postgres-backed queue for audits, and the async worker pool that runs them.
+
+Workers claim jobs with UPDATE ... FOR UPDATE SKIP LOCKED, so any number of
+workers in any number of processes take distinct jobs without a broker.
+Claiming sets status ACK and leases the job for AUDIT_VISIBILITY_TIMEOUT
+seconds; a running job renews its lease, so a job whose worker died becomes
+claimable again once the lease runs out. Failures are retried with
+exponential backoff up to max_attempts. Every write after a claim is fenced
+on the attempt number, so a worker that lost its lease cannot overwrite the
+attempt that replaced it.
+
+The queue functions take a sync Session; the pool runs them on the async
+engine through run_sync.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import Session
+
+from backend_app.common.job_events import job_event, write_job_events
+from backend_app.db import AsyncSessionLocal
+from backend_app.db_models import DBAuditJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+AUDIT_WORKERS = int(os.getenv("AUDIT_WORKERS", "2"))
+AUDIT_VISIBILITY_TIMEOUT = float(os.getenv("AUDIT_VISIBILITY_TIMEOUT", "300"))
+AUDIT_MAX_ATTEMPTS = int(os.getenv("AUDIT_MAX_ATTEMPTS", "3"))
+AUDIT_POLL_INTERVAL = float(os.getenv("AUDIT_POLL_INTERVAL", "1.0"))
+AUDIT_RETRY_BACKOFF = float(os.getenv("AUDIT_RETRY_BACKOFF", "5"))
+AUDIT_RETRY_BACKOFF_MAX = float(os.getenv("AUDIT_RETRY_BACKOFF_MAX", "300"))
+
+Runner = Callable[[dict, Callable[[str], Awaitable[None]]], Awaitable[dict]]
+
+
+class AuditClaim(BaseModel):
+    id: uuid.UUID
+    workspace_id: uuid.UUID
+    payload: dict
+    attempt: int
+    max_attempts: int
+
+
+CLAIM_SQL = text("""
+UPDATE audit_jobs j
+SET status = 'ACK', attempts = j.attempts + 1, worker = :worker,
+    visible_at = now() + make_interval(secs => :timeout), updated_at = now()
+FROM (
+    SELECT id FROM audit_jobs
+    WHERE status IN ('QUEUED', 'ACK') AND visible_at <= now()
+    ORDER BY visible_at
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+) claimable
+WHERE j.id = claimable.id
+RETURNING j.id, j.workspace_id, j.payload, j.attempts, j.max_attempts
+""")
+
+
+def _log(session: Session, workspace_id: uuid.UUID, job_id: uuid.UUID, status: JobStatus, message: str) -> None:
+    write_job_events(session, [job_event(workspace_id, {"jobId": str(job_id), "message": message[:2000]}, status)])
+
+
+def enqueue_audit(session: Session, workspace_id: uuid.UUID, shop: str, payload: dict, max_attempts: int = AUDIT_MAX_ATTEMPTS) -> DBAuditJob:
+    job = DBAuditJob(id=uuid.uuid4(), workspace_id=workspace_id, shop=shop, payload=payload, status=JobStatus.QUEUED, attempts=0, max_attempts=max_attempts)
+    session.add(job)
+    session.flush()
+    _log(session, workspace_id, job.id, JobStatus.QUEUED, "queued")
+    return job
+
+
+def claim_audits(session: Session, worker: str, limit: int = 1, timeout: float = AUDIT_VISIBILITY_TIMEOUT) -> list[AuditClaim]:
+    rows = session.execute(CLAIM_SQL, {"worker": worker, "timeout": timeout, "limit": limit}).all()
+    claims = [AuditClaim(id=r.id, workspace_id=r.workspace_id, payload=r.payload, attempt=r.attempts, max_attempts=r.max_attempts) for r in rows]
+    for claim in claims:
+        _log(session, claim.workspace_id, claim.id, JobStatus.ACK, f"attempt {claim.attempt} claimed by {worker}")
+    return claims
+
+
+def _fenced(claim: AuditClaim):
+    return (
+        update(DBAuditJob)
+        .where(DBAuditJob.id == claim.id, DBAuditJob.status == JobStatus.ACK, DBAuditJob.attempts == claim.attempt)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def renew_lease(session: Session, claim: AuditClaim, timeout: float = AUDIT_VISIBILITY_TIMEOUT, stage: str | None = None) -> bool:
+    """Push the lease out by timeout (and record the stage). False if the lease was lost."""
+    values = {"visible_at": func.now() + func.make_interval(0, 0, 0, 0, 0, 0, timeout), "updated_at": func.now()}
+    if stage:
+        values["stage"] = stage
+    return session.execute(_fenced(claim).values(**values)).rowcount == 1
+
+
+def complete_audit(session: Session, claim: AuditClaim, result: dict) -> bool:
+    done = session.execute(_fenced(claim).values(
+        status=JobStatus.DONE, result=result, error=None, stage=None, finished_at=func.now(), updated_at=func.now(),
+    )).rowcount == 1
+    if done:
+        _log(session, claim.workspace_id, claim.id, JobStatus.DONE, f"done on attempt {claim.attempt}")
+    return done
+
+
+def retry_delay(attempt: int) -> float:
+    return min(AUDIT_RETRY_BACKOFF_MAX, AUDIT_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+
+def fail_audit(session: Session, claim: AuditClaim, error: str, retry: bool = True) -> JobStatus | None:
+    """Requeue with backoff while attempts remain, else FAIL. None if the lease was lost."""
+    error = error[:2000]
+    if retry and claim.attempt < claim.max_attempts:
+        delay = retry_delay(claim.attempt)
+        values = dict(status=JobStatus.QUEUED, visible_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay), worker=None, error=error)
+        status, message = JobStatus.QUEUED, f"attempt {claim.attempt} failed, retrying in {delay:.0f}s: {error}"
+    else:
+        values = dict(status=JobStatus.FAIL, error=error, stage=None, finished_at=func.now())
+        status, message = JobStatus.FAIL, f"failed after {claim.attempt} attempts: {error}"
+    if session.execute(_fenced(claim).values(updated_at=func.now(), **values)).rowcount != 1:
+        return None
+    _log(session, claim.workspace_id, claim.id, status, message)
+    return status
+
+
+def release_audit(session: Session, claim: AuditClaim) -> bool:
+    """Hand an interrupted job back (worker shutdown) without spending an attempt."""
+    released = session.execute(_fenced(claim).values(
+        status=JobStatus.QUEUED, visible_at=func.now(), attempts=claim.attempt - 1, worker=None, updated_at=func.now(),
+    )).rowcount == 1
+    if released:
+        _log(session, claim.workspace_id, claim.id, JobStatus.QUEUED, "released on worker shutdown")
+    return released
+
+
+class AuditWorkerPool:
+    """
+    Async workers claiming and running audits in this process. runner gets
+    the job payload and an async stage(name) callback, and returns the
+    result stored on the job; an exception fails the attempt.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        workers: int = AUDIT_WORKERS,
+        session_factory: Callable = AsyncSessionLocal,
+        visibility_timeout: float = AUDIT_VISIBILITY_TIMEOUT,
+        poll_interval: float = AUDIT_POLL_INTERVAL,
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.session_factory = session_factory
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.active = 0
+
+    async def _db(self, fn, *args):
+        async with self.session_factory() as session:
+            result = await session.run_sync(fn, *args)
+            await session.commit()
+            return result
+
+    async def start(self) -> None:
+        self._stopping = False
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._work(f"{self.name}/{len(self._tasks)}")))
+        logger.info(f"👷 Started {self.workers} audit workers")
+
+    async def stop(self, grace: float = 10.0) -> None:
+        """Stop claiming; give running audits grace seconds, then cancel and release them."""
+        self._stopping = True
+        self._wake.set()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=grace)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        """A job was just enqueued in this process: skip the rest of the poll interval."""
+        self._wake.set()
+
+    async def _work(self, worker: str) -> None:
+        while not self._stopping:
+            try:
+                claims = await self._db(claim_audits, worker, 1, self.visibility_timeout)
+            except Exception as e:
+                logger.error(f"❌ Audit claim failed on {worker}: {e}")
+                claims = []
+            if not claims:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            await self._process(claims[0])
+
+    async def _heartbeat(self, claim: AuditClaim) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            if not await self._db(renew_lease, claim, self.visibility_timeout):
+                logger.warning(f"⚠️ Lost the lease on audit {claim.id} (attempt {claim.attempt})")
+                return
+
+    async def _process(self, claim: AuditClaim) -> None:
+        if claim.attempt > claim.max_attempts:
+            # Its last lease ran out without the worker reporting back.
+            await self._db(fail_audit, claim, "lease expired on the final attempt", False)
+            self.failed += 1
+            return
+
+        async def stage(name: str) -> None:
+            await self._db(renew_lease, claim, self.visibility_timeout, name)
+
+        self.active += 1
+        heartbeat = asyncio.create_task(self._heartbeat(claim))
+        try:
+            result = await self.runner(claim.payload, stage)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._db(release_audit, claim))
+            raise
+        except Exception as e:
+            logger.error(f"❌ Audit {claim.id} attempt {claim.attempt} failed: {e}")
+            status = await self._db(fail_audit, claim, f"{type(e).__name__}: {e}")
+            if status == JobStatus.QUEUED:
+                self.retried += 1
+            elif status == JobStatus.FAIL:
+                self.failed += 1
+        else:
+            if await self._db(complete_audit, claim, result):
+                self.completed += 1
+        finally:
+            heartbeat.cancel()
+            self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
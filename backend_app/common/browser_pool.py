@@ -0,0 +1,188 @@
+# filepath: backend_app/common/browser_pool.py
+from __future__ import annotations
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_POOL_MAX_CONCURRENCY = int(os.getenv("BROWSER_POOL_MAX_CONCURRENCY", "8"))
+BROWSER_POOL_MAX_PAGES = int(os.getenv("BROWSER_POOL_MAX_PAGES", "200"))
+BROWSER_POOL_MAX_RSS_MB = int(os.getenv("BROWSER_POOL_MAX_RSS_MB", "1500"))
+BROWSER_POOL_RSS_CHECK_EVERY = int(os.getenv("BROWSER_POOL_RSS_CHECK_EVERY", "20"))  # checkins between /proc scans
+
+
+def _process_tree_rss_mb(root_pid: int) -> float:
+    """
+    Resident memory (MB) of every descendant of root_pid, read from /proc.
+    Chromium runs as children of the Playwright driver, so this covers all
+    browsers in the pool. Returns 0.0 where /proc is unavailable.
+    """
+    children: dict[int, list[int]] = {}
+    rss_pages: dict[int, int] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return 0.0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as fh:
+                stat = fh.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            continue
+        pid = int(entry)
+        children.setdefault(int(stat[1]), []).append(pid)
+        rss_pages[pid] = int(stat[21])
+
+    total = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class _BrowserSlot:
+    def __init__(self, index: int):
+        self.index = index
+        self.browser: Browser | None = None
+        self.pages_served = 0
+        self.active = 0
+        self.retiring = False
+
+
+class BrowserPool:
+    """
+    Long-lived pool of headless Chromium browsers.
+
+    Each crawl gets its own BrowserContext (isolated cookies/storage) on a
+    shared browser, so launch cost is paid once per browser rather than once
+    per request. A semaphore caps concurrent contexts; a browser is recycled
+    after max_pages contexts or when the pool's RSS exceeds max_rss_mb. RSS
+    is sampled every rss_check_every checkins, on a worker thread, and a
+    retired browser is closed after the pool lock is released, so neither
+    the /proc scan nor a slow close holds up checkouts.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_concurrency: int = BROWSER_POOL_MAX_CONCURRENCY,
+        max_pages: int = BROWSER_POOL_MAX_PAGES,
+        max_rss_mb: int = BROWSER_POOL_MAX_RSS_MB,
+        rss_check_every: int = BROWSER_POOL_RSS_CHECK_EVERY,
+        launch_options: dict | None = None,
+    ):
+        self.size = max(1, size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.rss_check_every = max(1, rss_check_every)
+        self._checkins = 0
+        self.launch_options = launch_options or {"headless": True}
+        self._playwright: Playwright | None = None
+        self._slots = [_BrowserSlot(i) for i in range(self.size)]
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._lock = asyncio.Lock()
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._playwright = await async_playwright().start()
+        # Warm every slot up front so the first crawl only pays page-load time.
+        for slot in self._slots:
+            await self._launch(slot)
+        self._started = True
+        logger.info(f"🧭 Browser pool started (size={self.size}, concurrency={self.max_concurrency})")
+
+    async def stop(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+        for slot in self._slots:
+            await self._close_browser(slot)
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("🧭 Browser pool stopped")
+
+    async def _launch(self, slot: _BrowserSlot) -> Browser:
+        assert self._playwright is not None
+        slot.browser = await self._playwright.chromium.launch(**self.launch_options)
+        slot.pages_served = 0
+        slot.retiring = False
+        logger.info(f"🚀 Launched browser #{slot.index}")
+        return slot.browser
+
+    async def _close_browser(self, slot: _BrowserSlot) -> None:
+        browser, slot.browser = slot.browser, None
+        await self._close(browser, slot.index)
+
+    @staticmethod
+    async def _close(browser: Browser | None, index: int) -> None:
+        if browser is None:
+            return
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to close browser #{index}: {e}")
+
+    async def _checkout(self) -> _BrowserSlot:
+        async with self._lock:
+            candidates = [s for s in self._slots if not s.retiring]
+            slot = min(candidates or self._slots, key=lambda s: s.active)
+            if slot.browser is None or not slot.browser.is_connected():
+                await self._launch(slot)
+            slot.active += 1
+            return slot
+
+    async def _checkin(self, slot: _BrowserSlot) -> None:
+        self._checkins += 1
+        over_rss = False
+        if self.max_rss_mb and self._checkins % self.rss_check_every == 0:
+            over_rss = await asyncio.to_thread(_process_tree_rss_mb, os.getpid()) > self.max_rss_mb
+        retired = None
+        async with self._lock:
+            slot.active -= 1
+            slot.pages_served += 1
+            if not slot.retiring:
+                slot.retiring = over_rss or bool(self.max_pages and slot.pages_served >= self.max_pages)
+            if slot.retiring and slot.active == 0:
+                logger.info(f"♻️ Recycling browser #{slot.index} after {slot.pages_served} pages")
+                # Detached here; the next checkout of the slot launches a new one.
+                retired, slot.browser = slot.browser, None
+                slot.retiring = False
+        await self._close(retired, slot.index)
+
+    @asynccontextmanager
+    async def context(self, **context_options) -> AsyncIterator[BrowserContext]:
+        """Yield a fresh, isolated BrowserContext; it is closed on exit."""
+        if not self._started:
+            raise RuntimeError("Browser pool is not started")
+        async with self._semaphore:
+            slot = await self._checkout()
+            try:
+                assert slot.browser is not None
+                ctx = await slot.browser.new_context(**context_options)
+                try:
+                    yield ctx
+                finally:
+                    await ctx.close()
+            finally:
+                await self._checkin(slot)
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,185 @@
+# filepath: backend_app/common/crawl_cache.py
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from backend_app.common.http_client import get_http_client
+from backend_app.common.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CRAWL_CACHE_TTL = float(os.getenv("CRAWL_CACHE_TTL", "900"))
+CRAWL_CACHE_MAX_ENTRIES = int(os.getenv("CRAWL_CACHE_MAX_ENTRIES", "256"))
+CRAWL_CACHE_DIR = os.getenv("CRAWL_CACHE_DIR")  # unset = memory only
+
+TRACKING_PARAMS = {
+    "gclid", "gbraid", "wbraid", "fbclid", "msclkid", "dclid", "yclid", "twclid", "ttclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_kx", "igshid", "ref", "ref_", "srsltid",
+    "_pos", "_sid", "_ss", "_psq", "_fid",  # Shopify search/recommendation tracking
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for a page URL: lower-cased scheme and host, default
+    port and fragment removed, tracking params dropped and the query sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class CrawlCache:
+    """
+    TTL + LRU cache of crawl results (PageData dicts) keyed by normalized URL.
+
+    Entries past their TTL are revalidated with a conditional GET when the
+    origin gave us an ETag or Last-Modified; a 304 refreshes the entry without
+    re-rendering the page. With a directory configured, entries are also
+    written to disk and survive restarts.
+    """
+
+    def __init__(self, ttl: float = CRAWL_CACHE_TTL, max_entries: int = CRAWL_CACHE_MAX_ENTRIES, directory: str | None = CRAWL_CACHE_DIR):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.flight = SingleFlight()  # shared by concurrent misses, see routes/crawl.py
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        assert self.directory
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _read_disk(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, entry: dict) -> None:
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh)
+        os.replace(tmp, path)
+
+    def _remove_disk(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _revalidate(self, entry: dict) -> bool:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            return False
+        try:
+            resp = await get_http_client().get(entry["data"]["url"], headers=headers)
+        except Exception as e:
+            logger.warning(f"⚠️ Revalidation failed for {entry['data']['url']}: {e}")
+            return False
+        return resp.status_code == 304
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None and self.directory:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if time.time() - entry["stored_at"] < self.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["data"]
+
+        if await self._revalidate(entry):
+            entry["stored_at"] = time.time()
+            self._remember(key, entry)
+            if self.directory:
+                await asyncio.to_thread(self._write_disk, key, entry)
+            self.hits += 1
+            self.revalidated += 1
+            return entry["data"]
+
+        await self.invalidate(key)
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, data: dict, etag: str | None = None, last_modified: str | None = None) -> None:
+        entry = {"data": data, "etag": etag, "last_modified": last_modified, "stored_at": time.time()}
+        self._remember(key, entry)
+        if self.directory:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    async def update(self, key: str, **fields) -> bool:
+        """Patch fields of a cached result in place, keeping its age and validators; False if it is gone."""
+        entry = self._entries.get(key)
+        if entry is None and self.directory:
+            entry = await asyncio.to_thread(self._read_disk, key)
+        if entry is None:
+            return False
+        entry["data"].update(fields)
+        if self.directory:
+            await asyncio.to_thread(self._write_disk, key, entry)
+        return True
+
+    async def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self.directory:
+            await asyncio.to_thread(self._remove_disk, key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "disk": bool(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "coalesced": self.flight.shared,
+            "in_flight": self.flight.stats()["in_flight"],
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+crawl_cache = CrawlCache()
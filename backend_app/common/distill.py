@@ -0,0 +1,247 @@
+# filepath: backend_app/common/distill.py
+from __future__ import annotations
+import os
+from collections import Counter
+from html.parser import HTMLParser
+from pydantic import BaseModel
+
+DISTILL_TOKEN_BUDGET = int(os.getenv("DISTILL_TOKEN_BUDGET", "1500"))
+# Repeated sibling blocks (product cards, menu items) kept before collapsing.
+DISTILL_KEEP_REPEATS = int(os.getenv("DISTILL_KEEP_REPEATS", "3"))
+DISTILL_MAX_LINE_CHARS = 300
+CHARS_PER_TOKEN = 4  # rough average for English text with the GPT tokenizers
+
+DROP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "canvas", "object"}
+# Tags that may appear in the document head; any other start tag ends the
+# head implicitly, since </head> (and <head> itself) are optional.
+HEAD_TAGS = {"html", "head", "title", "meta", "link", "base", "style", "script", "noscript", "template"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+SELF_CLOSING_SIBLINGS = {"li", "p", "option", "tr", "td", "th", "dt", "dd"}
+REPEATABLE_TAGS = {"div", "li", "article", "section", "tr", "a", "figure"}
+LANDMARK_TAGS = {"header", "nav", "main", "footer", "aside"}
+INLINE_TAGS = {"a", "abbr", "b", "code", "em", "i", "label", "mark", "s", "small", "span", "strong", "sub", "sup", "u"}
+
+# Lower number = kept first when the budget is tight.
+PRIORITY = {"title": 0, "meta": 0, "h1": 0, "form": 1, "button": 1, "input": 1, "h2": 1, "cta": 2,
+            "h3": 2, "landmark": 2, "collapsed": 2, "h4": 3, "h5": 3, "h6": 3, "img": 4, "text": 5}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class DistilledPage(BaseModel):
+    text: str
+    original_chars: int
+    distilled_chars: int
+    tokens: int
+    token_budget: int
+    dropped_lines: int = 0
+    collapsed_blocks: int = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        return round(self.original_chars / max(1, self.distilled_chars), 2)
+
+
+class _Frame:
+    __slots__ = ("tag", "children", "skipped", "suppressed")
+
+    def __init__(self, tag: str, suppressed: bool):
+        self.tag = tag
+        self.children: Counter = Counter()
+        self.skipped: Counter = Counter()
+        self.suppressed = suppressed
+
+
+class _DistillParser(HTMLParser):
+    """
+    Streaming pass that turns storefront HTML into compact, prioritised
+    lines: headings, CTAs, forms and visible text, with scripts and styles
+    dropped and runs of look-alike sibling blocks collapsed to a count.
+    """
+
+    def __init__(self, keep_repeats: int):
+        super().__init__(convert_charrefs=True)
+        self.keep_repeats = keep_repeats
+        self.lines: list[tuple[int, str]] = []
+        self.collapsed = 0
+        self._stack: list[_Frame] = [_Frame("#root", False)]
+        self._drop_depth = 0
+        self._in_head = True
+        self._in_title = False
+        self._title = ""
+        self._text: list[str] = []
+        self._text_kind = "text"
+        self._href: str | None = None
+
+    # -- helpers -----------------------------------------------------------
+    @property
+    def _suppressed(self) -> bool:
+        return self._stack[-1].suppressed
+
+    def _emit(self, kind: str, line: str) -> None:
+        line = " ".join(line.split())
+        if not line or self._suppressed:
+            return
+        if len(line) > DISTILL_MAX_LINE_CHARS:
+            line = line[:DISTILL_MAX_LINE_CHARS] + "…"
+        self.lines.append((PRIORITY.get(kind, 5), line))
+
+    def _flush_text(self) -> None:
+        text = " ".join("".join(self._text).split())
+        self._text = []
+        if not text:
+            return
+        kind = self._text_kind
+        if kind in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._emit(kind, "#" * int(kind[1]) + " " + text)
+        elif kind == "button":
+            self._emit("button", f"[button] {text}")
+        elif kind == "cta":
+            self._emit("cta", f"[link {self._href}] {text}" if self._href else f"[link] {text}")
+        else:
+            self._emit("text", text)
+        self._text_kind = "text"
+
+    @staticmethod
+    def _signature(tag: str, attrs: dict) -> str:
+        classes = sorted((attrs.get("class") or "").split())[:2]
+        return ".".join([tag, *classes])
+
+    # -- HTMLParser hooks --------------------------------------------------
+    def handle_starttag(self, tag, attr_list):
+        attrs = dict(attr_list)
+        if self._in_head and tag not in HEAD_TAGS:
+            self._in_head = False
+        if tag == "title" and self._in_head and not self._drop_depth:
+            self._in_title = True
+            return
+        if tag == "meta" and not self._drop_depth:
+            if (attrs.get("name") or "").lower() == "description":
+                self._emit("meta", f"[meta description] {attrs.get('content') or ''}")
+            return
+        # A <title> outside the head (svg icons have them) is not the page title.
+        if self._drop_depth or tag in DROP_TAGS or tag == "title":
+            if tag not in VOID_TAGS:
+                self._drop_depth += 1
+            return
+        if tag in ("html", "head"):
+            return
+
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6", "button", "p", "li") or tag in LANDMARK_TAGS:
+            self._flush_text()
+        elif tag == "a" and self._text_kind == "text":
+            self._flush_text()
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._text_kind = tag
+        elif tag == "button":
+            self._text_kind = "button"
+        elif tag == "a" and self._text_kind == "text":
+            self._text_kind = "cta"
+            self._href = attrs.get("href")
+        elif tag == "form":
+            self._emit("form", f"[form action={attrs.get('action') or ''} method={(attrs.get('method') or 'get').lower()}]")
+        elif tag == "input" and attrs.get("type") not in ("hidden",):
+            label = attrs.get("placeholder") or attrs.get("aria-label") or attrs.get("name") or attrs.get("value") or ""
+            self._emit("input", f"[input {attrs.get('type') or 'text'}] {label}")
+        elif tag == "img" and attrs.get("alt"):
+            self._emit("img", f"[img] {attrs['alt']}")
+        elif tag in LANDMARK_TAGS:
+            self._emit("landmark", f"== {tag} ==")
+
+        if tag in VOID_TAGS:
+            return
+        if tag in SELF_CLOSING_SIBLINGS and self._stack[-1].tag == tag:
+            self._close(tag)
+
+        parent = self._stack[-1]
+        suppressed = parent.suppressed
+        if not suppressed and tag in REPEATABLE_TAGS:
+            sig = self._signature(tag, attrs)
+            parent.children[sig] += 1
+            if parent.children[sig] > self.keep_repeats:
+                parent.skipped[sig] += 1
+                suppressed = True
+        self._stack.append(_Frame(tag, suppressed))
+
+    def _report_skipped(self, frame: _Frame) -> None:
+        for sig, count in frame.skipped.items():
+            self.collapsed += count
+            self._emit("collapsed", f"[+{count} more similar {sig.split('.', 1)[0]} blocks]")
+        frame.skipped.clear()
+
+    def _close(self, tag: str) -> None:
+        if tag not in INLINE_TAGS:
+            self._flush_text()
+        while len(self._stack) > 1:
+            frame = self._stack.pop()
+            self._report_skipped(frame)
+            if frame.tag == tag:
+                break
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            return
+        if tag == "head":
+            self._in_head = False
+            return
+        if self._drop_depth:
+            if tag not in VOID_TAGS:
+                self._drop_depth -= 1
+            return
+        if tag == "a" and self._text_kind == "cta":
+            self._flush_text()
+            self._href = None
+        if any(f.tag == tag for f in self._stack[1:]):
+            self._close(tag)
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title += data
+        elif not self._in_head and not self._drop_depth and not self._suppressed:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._close("#root")
+        self._report_skipped(self._stack[0])
+        title = " ".join(self._title.split())
+        if title:
+            self.lines.insert(0, (PRIORITY["title"], f"[title] {title}"))
+
+
+def distill_html(html: str, token_budget: int = DISTILL_TOKEN_BUDGET, keep_repeats: int = DISTILL_KEEP_REPEATS) -> DistilledPage:
+    """
+    Reduce raw page HTML to the text and structure a CRO model needs, packed
+    to token_budget. When everything does not fit, lower-priority lines (body
+    copy, images, plain links) are dropped first; document order is kept.
+    """
+    parser = _DistillParser(keep_repeats)
+    parser.feed(html)
+    parser.close()
+    lines = parser.lines
+
+    kept = [True] * len(lines)
+    total = sum(estimate_tokens(line) + 1 for _, line in lines)
+    dropped = 0
+    if total > token_budget:
+        # Drop lowest-priority lines, latest first, until the rest fits.
+        for i in sorted(range(len(lines)), key=lambda i: (-lines[i][0], -i)):
+            if total <= token_budget:
+                break
+            kept[i] = False
+            total -= estimate_tokens(lines[i][1]) + 1
+            dropped += 1
+
+    text = "\n".join(line for (_, line), keep in zip(lines, kept) if keep)
+    return DistilledPage(
+        text=text,
+        original_chars=len(html),
+        distilled_chars=len(text),
+        tokens=estimate_tokens(text),
+        token_budget=token_budget,
+        dropped_lines=dropped,
+        collapsed_blocks=parser.collapsed,
+    )
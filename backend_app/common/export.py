@@ -0,0 +1,168 @@
+# filepath: backend_app/common/export.py
+"""
+Columnar exports of campaign_metrics and suggestions.
+
+Rows are read through a server-side cursor EXPORT_BATCH_SIZE at a time and
+each batch is written straight out as an Arrow IPC record batch or a Parquet
+row group, so memory stays bounded by one batch whatever the result size.
+UUIDs, enums and JSONB are cast to text in SQL; JSON columns stay JSON
+strings for the client to parse if it needs them.
+"""
+from __future__ import annotations
+import os
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Callable, Iterator
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Select, String, Text, cast, select
+from sqlalchemy.orm import Session
+
+from backend_app.db_models import DBCampaignMetric, DBSuggestion, SuggestionState
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "10000"))
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+CAMPAIGN_METRICS_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("workspace_id", pa.string()),
+    ("source", pa.string()),
+    ("ts", TIMESTAMP),
+    ("metric", pa.string()),
+    ("value", pa.float64()),
+    ("metadata", pa.string()),
+    ("created_at", TIMESTAMP),
+    ("updated_at", TIMESTAMP),
+])
+
+SUGGESTIONS_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("workspace_id", pa.string()),
+    ("unique_key", pa.string()),
+    ("source", pa.string()),
+    ("title", pa.string()),
+    ("payload", pa.string()),
+    ("state", pa.string()),
+    ("created_at", TIMESTAMP),
+    ("updated_at", TIMESTAMP),
+])
+
+
+def campaign_metrics_query(
+    workspace_id: UUID,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    sources: list[str] | None = None,
+    metrics: list[str] | None = None,
+) -> Select:
+    """Ordered by (source, ts, metric), the unique index's order after workspace_id."""
+    m = DBCampaignMetric
+    stmt = select(
+        cast(m.id, String), cast(m.workspace_id, String), m.source, m.ts, m.metric, m.value,
+        cast(m.metadata, Text), m.created_at, m.updated_at,
+    ).where(m.workspace_id == workspace_id)
+    if start:
+        stmt = stmt.where(m.ts >= start)
+    if end:
+        stmt = stmt.where(m.ts < end)
+    if sources:
+        stmt = stmt.where(m.source.in_(sources))
+    if metrics:
+        stmt = stmt.where(m.metric.in_(metrics))
+    return stmt.order_by(m.source, m.ts, m.metric)
+
+
+def suggestions_query(
+    workspace_id: UUID,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    states: list[SuggestionState] | None = None,
+) -> Select:
+    """start/end filter on created_at."""
+    s = DBSuggestion
+    stmt = select(
+        cast(s.id, String), cast(s.workspace_id, String), s.unique_key, s.source, s.title,
+        cast(s.payload, Text), cast(s.state, String), s.created_at, s.updated_at,
+    ).where(s.workspace_id == workspace_id)
+    if start:
+        stmt = stmt.where(s.created_at >= start)
+    if end:
+        stmt = stmt.where(s.created_at < end)
+    if states:
+        stmt = stmt.where(s.state.in_(states))
+    return stmt.order_by(s.created_at, s.id)
+
+
+class _Sink:
+    """Write-only file object that hands what the writer wrote back to the generator."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _writer(sink: _Sink, schema: pa.Schema, fmt: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    return pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+
+def record_batch(schema: pa.Schema, rows: list) -> pa.RecordBatch:
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.RecordBatch.from_arrays([pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema)
+
+
+def export_stream(
+    session_factory: Callable[[], AbstractContextManager[Session]],
+    stmt: Select,
+    schema: pa.Schema,
+    fmt: str = "arrow",
+    batch_size: int | None = None,
+) -> Iterator[bytes]:
+    """
+    Yield the encoded export piece by piece: the header, one record batch
+    (Arrow) or row group (Parquet) per fetched batch, then the footer. A
+    failure midway ends the stream without its footer, which readers reject
+    rather than mistaking the truncated file for a complete one.
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    sink = _Sink()
+    writer = _writer(sink, schema, fmt)
+    with session_factory() as session:
+        # Core execution on the session's connection: the rows are plain
+        # tuples and the ORM loading layer would only add per-row overhead.
+        result = session.connection().execute(stmt, execution_options={"yield_per": batch_size})
+        for rows in result.partitions():
+            writer.write_batch(record_batch(schema, rows))
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
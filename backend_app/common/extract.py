@@ -0,0 +1,124 @@
+# filepath: backend_app/common/extract.py
+from __future__ import annotations
+from urllib.parse import urlsplit
+
+# Evaluated once per page: collects everything the audit needs in a single
+# Playwright round trip instead of one IPC call per element.
+EXTRACT_FEATURES_JS = r"""
+() => {
+  const vh = window.innerHeight || document.documentElement.clientHeight || 0;
+  const clean = (s, n = 200) => (s || "").replace(/\s+/g, " ").trim().slice(0, n);
+  const box = (el) => {
+    const r = el.getBoundingClientRect();
+    const top = Math.round(r.top + window.scrollY);
+    const shown = r.width > 0 && r.height > 0;
+    return { top, width: Math.round(r.width), height: Math.round(r.height), shown, above_fold: shown && top < vh };
+  };
+
+  const headings = Array.from(document.querySelectorAll("h1, h2, h3"), (el) => ({
+    level: Number(el.tagName[1]),
+    text: clean(el.innerText, 300),
+  }));
+
+  const ctas = Array.from(document.querySelectorAll("a, button, input[type=submit]"), (el) => {
+    const b = box(el);
+    return {
+      tag: el.tagName.toLowerCase(),
+      text: clean(el.innerText || el.value || el.getAttribute("aria-label")),
+      href: el.getAttribute("href"),
+      top: b.top,
+      visible: b.shown,
+      above_fold: b.above_fold,
+    };
+  });
+
+  const forms = Array.from(document.querySelectorAll("form"), (el) => ({
+    action: el.getAttribute("action"),
+    method: (el.getAttribute("method") || "get").toLowerCase(),
+    inputs: Array.from(el.querySelectorAll("input, select, textarea"), (i) => (i.type || i.tagName).toLowerCase()),
+    has_email: !!el.querySelector("input[type=email], input[name*=email i]"),
+    text: clean(el.innerText, 300),
+    above_fold: box(el).above_fold,
+  }));
+
+  const meta = {};
+  for (const el of document.querySelectorAll("meta[name], meta[property]")) {
+    const key = (el.getAttribute("name") || el.getAttribute("property")).toLowerCase();
+    if (!(key in meta)) meta[key] = clean(el.getAttribute("content"), 500);
+  }
+  const canonical = document.querySelector("link[rel=canonical]");
+  if (canonical) meta["canonical"] = canonical.getAttribute("href");
+
+  const images = Array.from(document.images, (el) => {
+    const b = box(el);
+    return {
+      src: el.currentSrc || el.getAttribute("src"),
+      alt: el.getAttribute("alt"),
+      width: el.naturalWidth,
+      height: el.naturalHeight,
+      rendered_width: b.width,
+      rendered_height: b.height,
+      above_fold: b.above_fold,
+    };
+  });
+
+  const PRICE_SELECTORS = "[itemprop=price], .price, .product__price, .price-item, [data-product-price], .money";
+  const prices = Array.from(document.querySelectorAll(PRICE_SELECTORS), (el) => clean(el.innerText, 60))
+    .filter(Boolean)
+    .slice(0, 50);
+
+  const REVIEW_WIDGETS = {
+    schema: "[itemprop=aggregateRating], [itemprop=review]",
+    shopify: ".spr-badge, #shopify-product-reviews",
+    judgeme: ".jdgm-widget, .jdgm-preview-badge",
+    yotpo: ".yotpo, .yotpo-widget-instance",
+    okendo: "[data-oke-widget], .okeReviews",
+    stamped: ".stamped-main-widget, .stamped-product-reviews-badge",
+    loox: "#looxReviews, .loox-rating",
+    trustpilot: ".trustpilot-widget",
+  };
+  const reviews = Object.keys(REVIEW_WIDGETS).filter((name) => document.querySelector(REVIEW_WIDGETS[name]));
+
+  return {
+    headings, ctas, forms, meta, images, prices, reviews,
+    viewport_height: vh,
+    page_height: document.documentElement.scrollHeight,
+  };
+}
+"""
+
+
+def classify_page_type(url: str, features: dict) -> str:
+    """
+    Best-effort Shopify page type from the URL and extracted features:
+    product, collection, cart, checkout, search, article, blog, page, home
+    or unknown.
+    """
+    path = urlsplit(url).path.lower().rstrip("/")
+    meta = features.get("meta") or {}
+    og_type = (meta.get("og:type") or "").lower()
+
+    if "/products/" in path or og_type == "product":
+        return "product"
+    if path.endswith("/cart"):
+        return "cart"
+    if "/checkouts/" in path or path.endswith("/checkout"):
+        return "checkout"
+    if "/collections" in path:
+        return "collection"
+    if path.endswith("/search"):
+        return "search"
+    if "/blogs/" in path:
+        return "article" if len(path.split("/")) > 3 or og_type == "article" else "blog"
+    if "/pages/" in path:
+        return "page"
+    if not path:
+        return "home"
+
+    actions = [(f.get("action") or "") for f in features.get("forms") or []]
+    if any(a.rstrip("/").endswith("/cart/add") for a in actions) and len(features.get("prices") or []) <= 3:
+        return "product"
+    product_links = {c.get("href") for c in features.get("ctas") or [] if "/products/" in (c.get("href") or "")}
+    if len(product_links) >= 8:
+        return "collection"
+    return "unknown"
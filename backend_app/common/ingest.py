@@ -0,0 +1,328 @@
+# filepath: backend_app/common/ingest.py
+from __future__ import annotations
+import asyncio
+import csv
+import hashlib
+import json
+import os
+from contextlib import AbstractContextManager
+from typing import AsyncIterator, Callable, Iterable, Iterator, TypeVar
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend_app.common.models import CampaignMetricRow, SuggestionIn
+from backend_app.common.partitions import ensure_partitions_for
+from backend_app.common.rollups import refresh_rollups
+from backend_app.db_models import DBSuggestion
+
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "1000"))
+METRICS_CHUNK_SIZE = int(os.getenv("METRICS_CHUNK_SIZE", "5000"))
+INGEST_REJECT_SAMPLES = int(os.getenv("INGEST_REJECT_SAMPLES", "20"))
+INGEST_MAX_LINE_BYTES = int(os.getenv("INGEST_MAX_LINE_BYTES", str(64 * 1024)))
+
+T = TypeVar("T")
+
+# (xmax = 0) is true only for rows this statement inserted; rows taken by
+# ON CONFLICT DO UPDATE carry the updating transaction's id in xmax.
+INSERTED = literal_column("(xmax = 0)").label("inserted")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    chunk: list[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def suggestion_unique_key(item: SuggestionIn) -> str:
+    """Caller's uniqueKey, or a stable key derived from the title."""
+    return item.uniqueKey or f"auto:{hashlib.sha1(item.title.encode()).hexdigest()[:16]}"
+
+
+def suggestion_row(workspace_id: UUID, item: SuggestionIn) -> dict:
+    return {
+        "workspace_id": workspace_id,
+        "unique_key": suggestion_unique_key(item),
+        "source": (item.meta or {}).get("source"),
+        "title": item.title,
+        "payload": item.model_dump(exclude={"title", "uniqueKey"}),
+        "state": "NEW",
+    }
+
+
+def suggestions_upsert_statement():
+    """
+    Executed with a list of row dicts: SQLAlchemy's insertmanyvalues batching
+    sends them as multi-row INSERTs while the statement itself is compiled
+    once and cached.
+    """
+    stmt = pg_insert(DBSuggestion.__table__)
+    return stmt.on_conflict_do_update(
+        constraint="uq_suggestions_workspace_uniquekey",
+        set_={
+            "title": stmt.excluded.title,
+            "payload": stmt.excluded.payload,
+            "updated_at": func.now(),
+        },
+    ).returning(INSERTED, sort_by_parameter_order=True)
+
+
+def upsert_suggestions(session: Session, workspace_id: UUID, items: Iterable[SuggestionIn], chunk_size: int = INGEST_CHUNK_SIZE) -> dict:
+    """
+    Upsert suggestions with multi-row INSERT ... ON CONFLICT statements, one
+    round trip per chunk.
+
+    Items repeating a unique key within a chunk are collapsed to the last
+    one (Postgres refuses to update the same row twice in one statement)
+    and reported as "duplicates". Returns created/updated/duplicates counts.
+    """
+    created = updated = duplicates = 0
+    for chunk in chunked(items, chunk_size):
+        rows: dict[str, dict] = {}
+        for item in chunk:
+            row = suggestion_row(workspace_id, item)
+            if row["unique_key"] in rows:
+                duplicates += 1
+                del rows[row["unique_key"]]  # keep the last occurrence, in its position
+            rows[row["unique_key"]] = row
+        inserted = session.execute(suggestions_upsert_statement(), list(rows.values()), execution_options={"insertmanyvalues_page_size": chunk_size}).scalars().all()
+        created += sum(1 for flag in inserted if flag)
+        updated += sum(1 for flag in inserted if not flag)
+    return {"created": created, "updated": updated, "duplicates": duplicates}
+
+
+# -- campaign metrics ------------------------------------------------------
+
+STAGING_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS campaign_metrics_staging (
+    seq bigint NOT NULL,
+    source text NOT NULL,
+    ts timestamptz NOT NULL,
+    metric text NOT NULL,
+    value double precision NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+# Last occurrence of a key in the chunk wins, matching the per-row loop.
+# campaign_metrics is partitioned, where RETURNING cannot read xmax, so
+# updates are counted as staged keys that already exist; the CTEs share the
+# statement's snapshot, i.e. the table as it was before the merge.
+MERGE_METRICS_SQL = text("""
+WITH staged AS (
+    SELECT DISTINCT ON (source, ts, metric) source, ts, metric, value
+    FROM campaign_metrics_staging
+    ORDER BY source, ts, metric, seq DESC
+), existing AS (
+    SELECT count(*) AS n FROM staged s
+    JOIN campaign_metrics m ON m.workspace_id = :workspace_id AND m.source = s.source AND m.ts = s.ts AND m.metric = s.metric
+), merged AS (
+    INSERT INTO campaign_metrics (id, workspace_id, source, ts, metric, value)
+    SELECT gen_random_uuid(), :workspace_id, source, ts, metric, value FROM staged
+    ON CONFLICT ON CONSTRAINT uq_campaign_metrics_unique
+    DO UPDATE SET value = EXCLUDED.value, updated_at = now()
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM merged) - n, n FROM existing
+""")
+
+
+COPY_STAGING_SQL = "COPY campaign_metrics_staging (seq, source, ts, metric, value) FROM STDIN"
+
+
+def prepare_partitions(session: Session, rows: list[CampaignMetricRow]) -> list[str]:
+    """
+    Create the monthly partitions rows need and commit straight away, before
+    anything is staged. CREATE TABLE ... PARTITION OF locks campaign_metrics
+    against all access until commit; done here the lock lasts milliseconds
+    instead of the whole merge. Commits nothing when every partition exists.
+    """
+    created = ensure_partitions_for(session, (row.ts for row in rows))
+    if created:
+        session.commit()
+    return created
+
+
+async def prepare_partitions_async(session: AsyncSession, rows: list[CampaignMetricRow]) -> list[str]:
+    created = await session.run_sync(ensure_partitions_for, [row.ts for row in rows])
+    if created:
+        await session.commit()
+    return created
+
+
+def _stage(session: Session, rows: list[CampaignMetricRow]) -> None:
+    ensure_partitions_for(session, (row.ts for row in rows))
+    session.execute(text(STAGING_DDL))
+    session.execute(text("TRUNCATE campaign_metrics_staging"))  # leftovers from a chunk in a still-open transaction
+
+
+def _merge_staged(session: Session, workspace_id: UUID, staged: int) -> dict:
+    created, updated = session.execute(MERGE_METRICS_SQL, {"workspace_id": workspace_id}).one()
+    refresh_rollups(session, workspace_id)
+    return {"created": created, "updated": updated, "duplicates": staged - created - updated}
+
+
+def merge_campaign_metrics(session: Session, workspace_id: UUID, rows: list[CampaignMetricRow]) -> dict:
+    """
+    COPY rows into a session-local staging table and merge them into
+    campaign_metrics with one INSERT ... ON CONFLICT, creating any monthly
+    partitions the rows need first (in the caller's transaction; callers
+    run prepare_partitions beforehand so there is nothing left to create)
+    and refreshing the hourly/daily rollups
+    the rows fall in afterwards. Returns created/updated/duplicates counts.
+    """
+    if not rows:
+        return {"created": 0, "updated": 0, "duplicates": 0}
+    _stage(session, rows)
+    cursor = session.connection().connection.driver_connection.cursor()
+    with cursor.copy(COPY_STAGING_SQL) as copy:
+        for seq, row in enumerate(rows):
+            copy.write_row((seq, row.source, row.ts, row.metric, row.value))
+    return _merge_staged(session, workspace_id, len(rows))
+
+
+async def merge_campaign_metrics_async(session: AsyncSession, workspace_id: UUID, rows: list[CampaignMetricRow]) -> dict:
+    """merge_campaign_metrics for an AsyncSession; the COPY goes through psycopg's async cursor."""
+    if not rows:
+        return {"created": 0, "updated": 0, "duplicates": 0}
+    await session.run_sync(_stage, rows)
+    connection = await (await session.connection()).get_raw_connection()
+    async with connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(COPY_STAGING_SQL) as copy:
+            for seq, row in enumerate(rows):
+                await copy.write_row((seq, row.source, row.ts, row.metric, row.value))
+    return await session.run_sync(_merge_staged, workspace_id, len(rows))
+
+
+async def iter_lines(body: AsyncIterator[bytes], max_line: int | None = None) -> AsyncIterator[bytes | None]:
+    """
+    Split a streamed request body into raw lines, holding one partial line of
+    at most max_line bytes; each chunk is scanned once. Lines stay undecoded
+    so one bad byte rejects its row, not the upload. A longer line (or a body
+    with no newlines at all) is skipped through its newline and yielded as
+    None.
+    """
+    max_line = max_line or INGEST_MAX_LINE_BYTES
+    parts: list[bytes] = []
+    size = 0
+    overlong = False
+    async for data in body:
+        start = 0
+        while (end := data.find(b"\n", start)) >= 0:
+            if overlong or size + end - start > max_line:
+                yield None
+            else:
+                yield (b"".join(parts) + data[start:end]).rstrip(b"\r")
+            parts, size, overlong = [], 0, False
+            start = end + 1
+        rest = data[start:]
+        if overlong or not rest:
+            continue
+        if size + len(rest) > max_line:
+            parts, size, overlong = [], 0, True
+        else:
+            parts.append(rest)
+            size += len(rest)
+    if overlong:
+        yield None
+    elif parts:
+        yield b"".join(parts).rstrip(b"\r")
+
+
+async def iter_metric_rows(lines: AsyncIterator[bytes | None], fmt: str) -> AsyncIterator[tuple[int, CampaignMetricRow | None, str | None]]:
+    """
+    Yield (line_number, row, error) for each non-blank line of an NDJSON or
+    CSV (header row first) body. Exactly one of row and error is set. CSV
+    fields may be quoted but must not contain newlines. A UTF-8 BOM (Excel's
+    default) is dropped from the first line.
+    """
+    header: list[str] | None = None
+    line_no = 0
+    async for raw in lines:
+        line_no += 1
+        try:
+            if raw is None:
+                raise ValueError(f"line longer than {INGEST_MAX_LINE_BYTES} bytes")
+            line = raw.decode("utf-8-sig" if line_no == 1 else "utf-8")
+            if not line.strip():
+                continue
+            if fmt == "csv":
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [name.strip() for name in values]
+                    continue
+                if len(values) != len(header):
+                    raise ValueError(f"expected {len(header)} fields, got {len(values)}")
+                data = dict(zip(header, values))
+            else:
+                data = json.loads(line)
+            yield line_no, CampaignMetricRow.model_validate(data), None
+        except ValidationError as e:
+            yield line_no, None, "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+        except UnicodeDecodeError as e:
+            yield line_no, None, f"not valid UTF-8 at byte {e.start}"
+        except (ValueError, TypeError) as e:
+            yield line_no, None, str(e)
+
+
+async def stream_campaign_metrics(
+    session_factory: Callable[[], AbstractContextManager[Session]],
+    workspace_id: UUID,
+    body: AsyncIterator[bytes],
+    fmt: str = "ndjson",
+    chunk_size: int | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Validate rows as the body streams in and merge every chunk_size valid rows
+    in their own transaction, so memory stays bounded by one chunk whatever
+    the upload size. Yields a progress dict per chunk, then a summary with
+    the rejected rows (the first INGEST_REJECT_SAMPLES are listed with their
+    line numbers). Chunks merged before a failure stay committed; re-sending
+    the upload is safe because every write is an upsert.
+    """
+    chunk_size = chunk_size or METRICS_CHUNK_SIZE
+    totals = {"rows": 0, "created": 0, "updated": 0, "duplicates": 0, "rejected": 0}
+    samples: list[dict] = []
+    chunk: list[CampaignMetricRow] = []
+    chunk_rejected = 0
+    chunk_no = 0
+
+    def merge(session: Session, rows: list[CampaignMetricRow]) -> dict:
+        prepare_partitions(session, rows)
+        counts = merge_campaign_metrics(session, workspace_id, rows)
+        session.commit()
+        return counts
+
+    async def flush(session: Session) -> dict:
+        nonlocal chunk, chunk_rejected, chunk_no
+        counts = await asyncio.to_thread(merge, session, chunk)
+        chunk_no += 1
+        progress = {"chunk": chunk_no, "rows": len(chunk), "rejected": chunk_rejected, **counts}
+        for name in ("rows", "created", "updated", "duplicates"):
+            totals[name] += progress[name]
+        chunk, chunk_rejected = [], 0
+        return progress
+
+    with session_factory() as session:
+        async for line_no, row, error in iter_metric_rows(iter_lines(body), fmt):
+            if error is not None:
+                totals["rejected"] += 1
+                chunk_rejected += 1
+                if len(samples) < INGEST_REJECT_SAMPLES:
+                    samples.append({"line": line_no, "error": error})
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield await flush(session)
+        if chunk or chunk_rejected:
+            yield await flush(session)
+
+    yield {"done": True, **totals, "rejected_samples": samples}
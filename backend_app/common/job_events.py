@@ -0,0 +1,205 @@
+# filepath: backend_app/common/job_events.py
+"""
+Job log events (/v1/jobs/ack|done|fail): inserts into job_logs plus the
+job_status_current upsert, either written per request or, with
+JOB_EVENTS_BUFFERED=1, batched by a write-behind buffer.
+
+The buffer flushes every JOB_EVENTS_FLUSH_INTERVAL seconds or as soon as
+JOB_EVENTS_MAX_BATCH events are waiting, one transaction per batch, and
+drains on shutdown. The trade-off is durability: an event is acknowledged
+before it is written, so a process that dies without shutting down loses
+at most the last interval's events. A failed flush keeps its batch for the
+next attempt; once JOB_EVENTS_MAX_PENDING events are waiting, callers flush
+themselves and see the error, so a database outage turns into 500s rather
+than unbounded memory.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend_app.db import AsyncSessionLocal
+from backend_app.db_models import DBJobLog, DBJobStatusCurrent, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_BUFFERED = os.getenv("JOB_EVENTS_BUFFERED", "0") == "1"
+JOB_EVENTS_FLUSH_INTERVAL = float(os.getenv("JOB_EVENTS_FLUSH_INTERVAL", "0.25"))
+JOB_EVENTS_MAX_BATCH = int(os.getenv("JOB_EVENTS_MAX_BATCH", "500"))
+JOB_EVENTS_MAX_PENDING = int(os.getenv("JOB_EVENTS_MAX_PENDING", "10000"))
+
+
+def job_event(workspace_id: uuid.UUID, body: dict, status: JobStatus) -> dict:
+    """A job_logs row. id and created_at are set here so they survive buffering and order the events."""
+    return {
+        "id": uuid.uuid4(),
+        "workspace_id": workspace_id,
+        "job_id": str(body.get("jobId")),
+        "status": status,
+        "message": body.get("message"),
+        "meta": body.get("meta"),
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def current_status_statement():
+    table = DBJobStatusCurrent.__table__
+    stmt = pg_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.workspace_id, table.c.job_id],
+        set_={
+            "status": stmt.excluded.status,
+            "message": stmt.excluded.message,
+            "meta": stmt.excluded.meta,
+            "log_id": stmt.excluded.log_id,
+            "event_at": stmt.excluded.event_at,
+            "updated_at": func.now(),
+        },
+        where=table.c.event_at <= stmt.excluded.event_at,
+    )
+
+
+def write_job_events(session: Session, events: list[dict]) -> None:
+    """Insert events into job_logs and advance job_status_current: two statements whatever the batch size."""
+    if not events:
+        return
+    session.execute(insert(DBJobLog.__table__), events)
+    latest: dict[tuple, dict] = {}
+    for event in events:
+        key = (event["workspace_id"], event["job_id"])
+        if key not in latest or event["created_at"] >= latest[key]["created_at"]:
+            latest[key] = event
+    session.execute(current_status_statement(), [
+        {
+            "workspace_id": event["workspace_id"],
+            "job_id": event["job_id"],
+            "status": event["status"],
+            "message": event["message"],
+            "meta": event["meta"],
+            "log_id": event["id"],
+            "event_at": event["created_at"],
+        }
+        for event in latest.values()
+    ])
+
+
+class JobEventBuffer:
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        flush_interval: float = JOB_EVENTS_FLUSH_INTERVAL,
+        max_batch: int = JOB_EVENTS_MAX_BATCH,
+        max_pending: int = JOB_EVENTS_MAX_PENDING,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max(self.max_batch, max_pending)
+        self._pending: list[dict] = []
+        self._wake = asyncio.Event()
+        self._flushing = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"🧾 Job event buffer started (every {self.flush_interval}s or {self.max_batch} events)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ Dropping {len(self._pending)} job events on shutdown: {e}")
+            self._pending.clear()
+
+    async def add(self, event: dict) -> None:
+        if len(self._pending) >= self.max_pending:
+            await self.flush()  # backpressure: raises while the database is failing
+        self._pending.append(event)
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    async def record(self, event: dict) -> None:
+        """Buffer the event when the buffer is running, otherwise write it now."""
+        if self.running:
+            await self.add(event)
+            return
+        async with self.session_factory() as session:
+            await session.run_sync(write_job_events, [event])
+            await session.commit()
+
+    async def flush(self) -> int:
+        """Write everything pending, max_batch events per transaction. Returns the number written."""
+        written = 0
+        async with self._flushing:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:len(batch)]
+                try:
+                    async with self.session_factory() as session:
+                        await session.run_sync(write_job_events, batch)
+                        await session.commit()
+                except Exception:
+                    self._pending[:0] = batch  # retried first on the next flush
+                    self.failures += 1
+                    raise
+                written += len(batch)
+                self.flushes += 1
+        self.written += written
+        return written
+
+    def pending_status(self, workspace_id: uuid.UUID, job_id: str) -> dict | None:
+        """The newest not-yet-written event for the job, so status reads see this process's own writes."""
+        for event in reversed(self._pending):
+            if event["workspace_id"] == workspace_id and event["job_id"] == job_id:
+                return event
+        return None
+
+    async def _run(self) -> None:
+        backoff = self.flush_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                backoff = self.flush_interval
+            except Exception as e:
+                logger.error(f"❌ Job event flush failed, {len(self._pending)} pending: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending": len(self._pending),
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+        }
+
+
+job_event_buffer = JobEventBuffer()
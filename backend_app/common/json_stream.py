@@ -0,0 +1,96 @@
+# filepath: backend_app/common/json_stream.py
+from __future__ import annotations
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class SuggestionStreamParser:
+    """
+    Incremental parser for the model's {"rationale": str, "suggestions": [...]}
+    answer. feed() takes text deltas as they stream in and returns the events
+    completed so far: ("rationale", str) once the rationale string closes and
+    ("suggestion", dict) as each object in the suggestions array closes.
+
+    Only a single character scan is done per delta; the buffer is trimmed
+    whenever no value is open, so memory stays proportional to one item.
+    A string or suggestion that is not valid JSON is logged and skipped, so
+    one bad item does not end the stream.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: str | None = None
+        self._key: str | None = None
+        self._expect_value = False
+        self._item_start: int | None = None
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        events: list[tuple[str, Any]] = []
+        self._buf += chunk
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf):
+            c = buf[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        text = _loads(buf[self._string_start:pos + 1])
+                        if self._expect_value:
+                            if self._key == "rationale" and text is not None:
+                                events.append(("rationale", text))
+                            self._expect_value = False
+                        else:
+                            self._last_key = text
+            elif c == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif self._depth == 1 and c == ":":
+                self._key = self._last_key
+                self._expect_value = True
+            elif self._depth == 1 and c == ",":
+                self._expect_value = False
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 2:
+                    self._expect_value = False
+                elif self._depth == 3 and c == "{" and self._key == "suggestions":
+                    self._item_start = pos
+            elif c in "}]":
+                if c == "}" and self._depth == 3 and self._item_start is not None:
+                    item = _loads(buf[self._item_start:pos + 1])
+                    if item is not None:
+                        events.append(("suggestion", item))
+                    self._item_start = None
+                self._depth = max(0, self._depth - 1)
+            pos += 1
+
+        # Keep only the still-open string or suggestion object.
+        open_starts = [s for s in (self._item_start, self._string_start if self._in_string else None) if s is not None]
+        start = min(open_starts) if open_starts else pos
+        self._buf = buf[start:]
+        self._pos = pos - start
+        self._string_start -= start
+        if self._item_start is not None:
+            self._item_start -= start
+        return events
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        logger.warning(f"⚠️ Skipping malformed streamed JSON value: {e}")
+        return None
@@ -0,0 +1,170 @@
+# filepath: backend_app/common/llm_cache.py
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from backend_app.common.singleflight import SingleFlight
+
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")  # sqlite file; unset = memory only
+
+
+class LLMCache:
+    """
+    Content-addressed cache for model responses.
+
+    Keys are a SHA-256 over the request parts (model, temperature, goal and
+    the prompt messages, which carry the distilled page), so identical
+    prompts share one paid call. Values are JSON-serialisable dicts that may
+    carry prompt_tokens/completion_tokens, used to report tokens saved.
+    Memory is bounded by serialized size with LRU eviction; an optional
+    sqlite file keeps entries across restarts. Concurrent misses for the
+    same key wait on a single computation.
+    """
+
+    def __init__(self, ttl: float = LLM_CACHE_TTL, max_bytes: int = LLM_CACHE_MAX_BYTES, path: str | None = LLM_CACHE_PATH):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self.flight = SingleFlight()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.prompt_tokens_saved = 0
+        self.completion_tokens_saved = 0
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    # -- persistent tier ---------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)")
+        return self._db
+
+    def _db_get(self, key: str) -> tuple[float, str] | None:
+        with self._db_lock:
+            row = self._conn().execute("SELECT stored_at, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _db_put(self, key: str, stored_at: float, value: str) -> None:
+        with self._db_lock:
+            conn = self._conn()
+            conn.execute("INSERT OR REPLACE INTO llm_cache (key, stored_at, value) VALUES (?, ?, ?)", (key, stored_at, value))
+            conn.execute("DELETE FROM llm_cache WHERE stored_at < ?", (time.time() - self.ttl,))
+            conn.commit()
+
+    # -- memory tier -------------------------------------------------------
+    def _remember(self, key: str, stored_at: float, value: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = (stored_at, value)
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None and self.path:
+            entry = await asyncio.to_thread(self._db_get, key)
+            if entry is not None:
+                self._remember(key, *entry)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at >= self.ttl:
+            self._bytes -= len(value)
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return json.loads(value)
+
+    async def lookup(self, key: str) -> dict | None:
+        """get() that also counts towards the hit/miss and tokens-saved stats."""
+        value = await self.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._count_saved(value)
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        stored_at = time.time()
+        blob = json.dumps(value)
+        self._remember(key, stored_at, blob)
+        if self.path:
+            await asyncio.to_thread(self._db_put, key, stored_at, blob)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[dict]], bypass: bool = False) -> dict:
+        """
+        Return the cached value for key, or run compute() once and cache it.
+        bypass=True skips the lookup (forcing a fresh call) but still stores
+        the new result.
+        """
+        if bypass:
+            self.misses += 1
+            return await self._compute_and_set(key, compute)
+
+        cached = await self.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._count_saved(cached)
+            return cached
+
+        value, shared = await self.flight.do(key, lambda: self._compute_and_set(key, compute))
+        if shared:
+            self.coalesced += 1
+            self._count_saved(value)
+        else:
+            self.misses += 1
+        return value
+
+    async def _compute_and_set(self, key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+        value = await compute()
+        await self.set(key, value)
+        return value
+
+    def _count_saved(self, value: dict) -> None:
+        self.prompt_tokens_saved += value.get("prompt_tokens", 0)
+        self.completion_tokens_saved += value.get("completion_tokens", 0)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "persistent": bool(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "in_flight": self.flight.stats()["in_flight"],
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "prompt_tokens_saved": self.prompt_tokens_saved,
+            "completion_tokens_saved": self.completion_tokens_saved,
+        }
+
+
+llm_cache = LLMCache()
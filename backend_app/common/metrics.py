@@ -0,0 +1,149 @@
+# filepath: backend_app/common/metrics.py
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Own registry so /metrics only carries what this service records (and tests
+# can read values without the default process/platform collectors).
+registry = CollectorRegistry(auto_describe=True)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+scrape_phase_duration = Histogram(
+    "scrape_phase_duration_seconds",
+    "Time spent in each scrape_page phase (launch = browser context and page, goto, extract; screenshot and encode for the deferred capture).",
+    ["phase"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds",
+    "Chat-completion latency including retries and backoff.",
+    ["model", "mode", "outcome"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+llm_retries = Counter(
+    "llm_retries_total",
+    "Chat-completion attempts that failed with a retryable error.",
+    ["model"],
+    registry=registry,
+)
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the model API.",
+    ["model", "kind"],
+    registry=registry,
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a request waited for a pooled database connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+    registry=registry,
+)
+db_pool_in_use = Gauge(
+    "db_pool_connections_in_use",
+    "Database connections currently checked out of the pool.",
+    registry=registry,
+)
+ingest_rows = Counter(
+    "ingest_rows_total",
+    "Rows written by the /v1 upsert endpoints.",
+    ["endpoint"],
+    registry=registry,
+)
+rule_audits = Counter(
+    "rule_audits_total",
+    "Suggestion requests that ran the rule pre-audit (outcome: rules_only skipped the model, llm still called it).",
+    ["outcome"],
+    registry=registry,
+)
+
+rate_limited = Counter(
+    "rate_limited_total",
+    "/v1 requests answered 429 (reason: workspace bucket or ingest concurrency).",
+    ["reason"],
+    registry=registry,
+)
+ingest_rows_per_second = Histogram(
+    "ingest_rows_per_second",
+    "Per-request write throughput of the /v1 upsert endpoints.",
+    ["endpoint"],
+    buckets=(10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000),
+    registry=registry,
+)
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels) -> Iterator[None]:
+    """Time the block into histogram (with labels, if any)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - start)
+
+
+def record_ingest(endpoint: str, rows: int, seconds: float) -> None:
+    ingest_rows.labels(endpoint=endpoint).inc(rows)
+    if rows and seconds > 0:
+        ingest_rows_per_second.labels(endpoint=endpoint).observe(rows / seconds)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Track connections checked out of engine's pool."""
+    event.listen(engine, "checkout", lambda *_: db_pool_in_use.inc())
+    event.listen(engine, "checkin", lambda *_: db_pool_in_use.dec())
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording http_request_duration_seconds. Requests are
+    labelled with the matched route template (e.g. /crawl/batch) rather than
+    the raw path, so label cardinality stays bounded; unmatched paths are
+    grouped under "unmatched".
+    """
+
+    def __init__(self, app, skip: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip = skip
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status),
+            ).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(registry), CONTENT_TYPE_LATEST
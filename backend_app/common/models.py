@@ -26,6 +26,9 @@ class SuggestionsImport(BaseModel):
     workspaceId: UUID
     items: list[SuggestionIn]
 
+class ShopTokenIn(BaseModel):
+    accessToken: str
+
 class CampaignMetricRow(BaseModel):
     source: str
     ts: datetime
@@ -35,3 +38,104 @@ class CampaignMetricRow(BaseModel):
 class CampaignMetricsUpsert(BaseModel):
     workspaceId: UUID
     rows: list[CampaignMetricRow]
+
+# Backwards-compatible name used by routes/service.py
+CampaignMetricsIn = CampaignMetricsUpsert
+
+CrawlMode = Literal["auto", "static", "browser"]
+
+class CrawlRequest(BaseModel):
+    url: str
+    shop: str | None = None
+    mode: CrawlMode = "auto"
+    include_html: bool = True  # False: answer with the artifact handle only
+
+class CrawlBatchRequest(BaseModel):
+    urls: list[str]
+    shop: str | None = None
+    mode: CrawlMode = "auto"
+    include_html: bool = True
+
+class AuditRequest(BaseModel):
+    url: str
+    goal: str
+    mode: CrawlMode = "auto"
+    bypass_cache: bool = False
+
+class HeadingFeature(BaseModel):
+    level: int
+    text: str
+
+class CtaFeature(BaseModel):
+    tag: str = "a"
+    text: str = ""
+    href: str | None = None
+    top: int | None = None
+    visible: bool = True
+    above_fold: bool = False
+
+class FormFeature(BaseModel):
+    action: str | None = None
+    method: str = "get"
+    inputs: list[str] = []
+    has_email: bool = False
+    text: str = ""
+    above_fold: bool = False
+
+class ImageFeature(BaseModel):
+    src: str | None = None
+    alt: str | None = None
+    width: int = 0
+    height: int = 0
+    rendered_width: int = 0
+    rendered_height: int = 0
+    above_fold: bool = False
+
+class PageFeatures(BaseModel):
+    headings: list[HeadingFeature] = []
+    ctas: list[CtaFeature] = []
+    forms: list[FormFeature] = []
+    meta: dict[str, str | None] = {}
+    images: list[ImageFeature] = []
+    prices: list[str] = []
+    reviews: list[str] = []
+    viewport_height: int = 0
+    page_height: int = 0
+
+class ArtifactRef(BaseModel):
+    """Handle to a stored crawl artifact (common/artifacts.py); id is the SHA-256 of the content."""
+    id: str
+    size: int
+    stored_size: int
+    content_type: str = "text/html"
+
+class ScreenshotSet(BaseModel):
+    """Screenshots of a crawled page (common/screenshots.py); URLs are filled in once status is "ready"."""
+    status: Literal["pending", "ready", "failed"]
+    above_fold: str = ""
+    full_page: str = ""
+
+class PageData(BaseModel):
+    url: str
+    html: str | None = None
+    title: str
+    headings: list[str] = []
+    ctas: list[str] = []
+    forms: list[str] = []
+    page_type: str = "unknown"
+    features: PageFeatures | None = None
+    screenshot_url: str = ""
+    screenshot_full_url: str = ""
+    screenshot_status: Literal["none", "pending", "ready", "failed"] = "none"
+    rendered_by: Literal["static", "browser"] = "browser"
+    artifact: ArtifactRef | None = None
+
+class SuggestionOut(BaseModel):
+    text: str
+    type: str
+    target: str
+    impact: str
+
+class SuggestResponse(BaseModel):
+    rationale: str
+    suggestions: list[SuggestionOut]
@@ -0,0 +1,143 @@
+# filepath: backend_app/common/partitions.py
+"""
+Monthly range partitions for campaign_metrics.
+
+Partitions are named campaign_metrics_pYYYYMM and cover [month, next month)
+in UTC. The ingest path creates partitions for the months it writes to, in
+a short transaction committed before the merge (ingest.prepare_partitions),
+since CREATE TABLE ... PARTITION OF locks the parent table until commit; run
+
+    python -m backend_app.common.partitions
+
+daily (cron) to create CAMPAIGN_METRICS_PARTITIONS_AHEAD months ahead and to
+detach and drop partitions older than CAMPAIGN_METRICS_RETENTION_MONTHS.
+"""
+from __future__ import annotations
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+PARENT = "campaign_metrics"
+CAMPAIGN_METRICS_PARTITIONS_AHEAD = int(os.getenv("CAMPAIGN_METRICS_PARTITIONS_AHEAD", "3"))
+CAMPAIGN_METRICS_RETENTION_MONTHS = int(os.getenv("CAMPAIGN_METRICS_RETENTION_MONTHS", "0"))  # 0 = keep everything
+
+_PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value: datetime | date) -> date:
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def months_between(first: date, last: date) -> list[date]:
+    months = []
+    month = month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def ensure_partitions(conn, months: Iterable[date]) -> list[str]:
+    """
+    Create the partitions for months that do not exist yet, in conn's
+    transaction (conn is a SQLAlchemy Connection or Session). One catalog
+    query when they all exist, which is the common case on the ingest path.
+    Returns the names of partitions created.
+    """
+    names = {partition_name(month): month for month in months}
+    if not names:
+        return []
+    missing = conn.execute(
+        text("SELECT name FROM unnest(CAST(:names AS text[])) AS name WHERE to_regclass(name) IS NULL"),
+        {"names": sorted(names)},
+    ).scalars().all()
+    created = []
+    for name in sorted(missing):
+        month = names[name]
+        try:
+            with conn.begin_nested():
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00+00')"
+                ))
+        except DBAPIError as e:
+            # Another worker created it between the lookup and our CREATE.
+            if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+                raise
+            logger.info(f"🗂️ Partition {name} was created concurrently: {e.orig}")
+            continue
+        created.append(name)
+        logger.info(f"🗂️ Created partition {name}")
+    return created
+
+
+def ensure_partitions_for(conn, timestamps: Iterable[datetime]) -> list[str]:
+    return ensure_partitions(conn, {month_start(ts) for ts in timestamps})
+
+
+def list_partitions(conn) -> dict[date, str]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {"parent": PARENT}).scalars()
+    partitions = {}
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def apply_retention(conn, keep_months: int, today: date | None = None, drop: bool = True) -> list[str]:
+    """
+    Detach partitions whose whole month is older than keep_months before the
+    current month, and drop them unless drop=False (detached tables can be
+    archived and dropped by hand). Far cheaper than DELETE: no dead tuples,
+    no vacuum, no index churn.
+    """
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc)), -keep_months)
+    removed = []
+    for month, name in sorted(list_partitions(conn).items()):
+        if month >= cutoff:
+            break
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+        logger.info(f"🧹 {'Dropped' if drop else 'Detached'} partition {name}")
+    return removed
+
+
+def maintain(conn, ahead: int = CAMPAIGN_METRICS_PARTITIONS_AHEAD, keep_months: int = CAMPAIGN_METRICS_RETENTION_MONTHS) -> dict:
+    current = month_start(datetime.now(timezone.utc))
+    created = ensure_partitions(conn, [add_months(current, i) for i in range(ahead + 1)])
+    removed = apply_retention(conn, keep_months) if keep_months > 0 else []
+    return {"created": created, "removed": removed}
+
+
+if __name__ == "__main__":
+    from backend_app.db import engine
+
+    logging.basicConfig(level=logging.INFO)
+    with engine.begin() as connection:
+        print(maintain(connection))
@@ -0,0 +1,338 @@
+# filepath: backend_app/common/rate_limit.py
+"""
+Admission control for the /v1 service routes.
+
+Per-workspace token buckets keyed on X-Workspace-ID: a workspace may spend
+RATE_LIMIT_BURST tokens at once, refilled at RATE_LIMIT_RATE per second.
+A request costs one token plus one per RATE_LIMIT_BYTES_PER_TOKEN of body,
+so a replayed bulk upload drains its own workspace's bucket, not everyone's
+pool. Out of tokens means 429 with Retry-After set to when enough will be
+back. The cost is taken from Content-Length up front; streamed uploads
+(chunked, or larger than a burst) are read through metered_body(), which
+charges the bytes as they arrive and slows the read to the refill rate.
+
+Ingestion routes also take a slot from a per-process gate of
+INGEST_MAX_IN_FLIGHT concurrent requests. A request over the cap waits up
+to INGEST_QUEUE_TIMEOUT seconds in a queue of at most INGEST_MAX_QUEUED;
+past either bound it is shed with 429.
+
+Bucket state lives behind a small backend interface: "memory" (one process)
+or "sqlite" (a file at RATE_LIMIT_PATH, shared by the workers on a host).
+The memory check runs inline on the event loop; sqlite does file I/O and may
+wait on other workers' locks, so it runs on a worker thread and admits the
+request when the file stays locked past RATE_LIMIT_SQLITE_TIMEOUT.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Protocol
+
+from fastapi import Depends, Header, HTTPException, Request, status
+
+from backend_app.common.metrics import rate_limited
+from backend_app.common.service_auth import require_service
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "50"))  # tokens/s per workspace; 0 disables
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "100"))
+RATE_LIMIT_BYTES_PER_TOKEN = int(os.getenv("RATE_LIMIT_BYTES_PER_TOKEN", str(256 * 1024)))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", "/tmp/auditai-rate-limit.sqlite")
+RATE_LIMIT_SQLITE_TIMEOUT = float(os.getenv("RATE_LIMIT_SQLITE_TIMEOUT", "0.05"))  # seconds to wait on a locked file
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+INGEST_MAX_IN_FLIGHT = int(os.getenv("INGEST_MAX_IN_FLIGHT", "8"))  # 0 disables
+INGEST_MAX_QUEUED = int(os.getenv("INGEST_MAX_QUEUED", "32"))
+INGEST_QUEUE_TIMEOUT = float(os.getenv("INGEST_QUEUE_TIMEOUT", "2.0"))
+
+
+class BucketBackend(Protocol):
+    blocking: bool  # does take() do I/O, so must stay off the event loop
+
+    def take(self, key: str, cost: float, rate: float, burst: float, now: float) -> float:
+        """Spend cost tokens from key's bucket. 0 if granted, else seconds until cost tokens are available."""
+
+
+def _refill(tokens: float, updated: float, rate: float, burst: float, now: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBuckets:
+    """
+    Buckets in a dict: about two microseconds per check, private to the
+    process. The dict is kept in last-use order and capped at max_keys, since
+    the workspace header is caller-controlled: a new key first drops buckets
+    that have refilled, then, if still full, the least recently used one
+    (which only makes that workspace's limit briefly more lenient).
+    """
+
+    blocking = False
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, key: str, cost: float, rate: float, burst: float, now: float) -> float:
+        bucket = self._buckets.pop(key, None)
+        if bucket is None and len(self._buckets) >= self.max_keys:
+            self._evict(rate, burst, now)
+        tokens = burst if bucket is None else _refill(bucket[0], bucket[1], rate, burst, now)
+        if tokens >= cost:
+            self._buckets[key] = (tokens - cost, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (cost - tokens) / rate
+
+    def _evict(self, rate: float, burst: float, now: float) -> None:
+        # A bucket idle for burst / rate seconds is full again: same as absent.
+        idle = burst / rate
+        while self._buckets:
+            key = next(iter(self._buckets))  # least recently used
+            if len(self._buckets) < self.max_keys and now - self._buckets[key][1] < idle:
+                break
+            del self._buckets[key]
+
+
+class SqliteBuckets:
+    """
+    Buckets in a sqlite file, so every worker process on the host shares
+    them. WAL without fsync: a crash may forget recent spends, which only
+    makes the limiter briefly more lenient. A file still locked after
+    timeout seconds fails open (the request is admitted): a limiter that
+    stalls or errors would hurt more than one unmetered request.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str = RATE_LIMIT_PATH, prune_every: int = 10_000, timeout: float = RATE_LIMIT_SQLITE_TIMEOUT):
+        self.path = path
+        self.prune_every = prune_every
+        self.timeout = timeout
+        self._local = threading.local()
+        self._takes = 0
+        self.errors = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, cost: float, rate: float, burst: float, now: float) -> float:
+        try:
+            return self._take(key, cost, rate, burst, now)
+        except sqlite3.OperationalError as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Rate limit store unavailable, admitting {key}: {e}")
+            return 0.0
+
+    def _take(self, key: str, cost: float, rate: float, burst: float, now: float) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else _refill(row[0], row[1], rate, burst, now)
+            wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+            if not wait:
+                tokens -= cost
+            conn.execute("INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+            self._takes += 1
+            if self._takes % self.prune_every == 0:
+                self._prune(conn, rate, burst, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection, rate: float, burst: float, now: float) -> None:
+        conn.execute("DELETE FROM rate_buckets WHERE updated <= ?", (now - burst / rate,))
+
+
+def make_backend(name: str = RATE_LIMIT_BACKEND) -> BucketBackend:
+    if name == "memory":
+        return MemoryBuckets()
+    if name == "sqlite":
+        return SqliteBuckets()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+
+class WorkspaceLimiter:
+    def __init__(
+        self,
+        backend: BucketBackend | None = None,
+        rate: float = RATE_LIMIT_RATE,
+        burst: float = RATE_LIMIT_BURST,
+        bytes_per_token: int = RATE_LIMIT_BYTES_PER_TOKEN,
+    ):
+        self.backend = backend or make_backend()
+        self.rate = rate
+        self.burst = burst
+        self.bytes_per_token = bytes_per_token
+
+    def cost(self, content_length: int) -> float:
+        # Capped at the burst, or an oversized body could never be admitted.
+        return min(self.burst, 1 + content_length // self.bytes_per_token)
+
+    def check(self, workspace: str, content_length: int = 0) -> float:
+        """0 if the request may proceed, else the Retry-After in seconds."""
+        if self.rate <= 0:
+            return 0.0
+        return self.backend.take(workspace, self.cost(content_length), self.rate, self.burst, time.time())
+
+    async def acheck(self, workspace: str, content_length: int = 0) -> float:
+        """check() for async callers; a blocking backend runs on a worker thread."""
+        return await self.spend(workspace, self.cost(content_length))
+
+    async def spend(self, workspace: str, tokens: float) -> float:
+        """Take tokens (at most a burst) from the bucket; 0 if granted, else the wait in seconds."""
+        if self.rate <= 0:
+            return 0.0
+        args = (workspace, min(self.burst, tokens), self.rate, self.burst, time.time())
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(self.backend.take, *args)
+        return self.backend.take(*args)
+
+    async def meter(self, workspace: str, body: AsyncIterator[bytes], content_length: int = 0) -> AsyncIterator[bytes]:
+        """
+        Pass a streamed body through, spending a token per bytes_per_token
+        beyond what the Content-Length charge already paid for. When the
+        bucket is empty the read waits for the refill, so an upload with no
+        Content-Length costs what its size does and a huge one is throttled
+        to the workspace's rate.
+        """
+        unpaid = -(self.cost(content_length) - 1) * self.bytes_per_token
+        async for data in body:
+            unpaid += len(data)
+            while unpaid >= self.bytes_per_token:
+                tokens = min(self.burst, unpaid // self.bytes_per_token)
+                wait = await self.spend(workspace, tokens)
+                if wait:
+                    await asyncio.sleep(wait)
+                    continue
+                unpaid -= tokens * self.bytes_per_token
+            yield data
+
+
+class ConcurrencyGate:
+    """
+    At most limit holders; up to max_waiting more queue in FIFO order for
+    timeout seconds. A released slot is handed straight to the next waiter.
+    """
+
+    def __init__(self, limit: int = INGEST_MAX_IN_FLIGHT, max_waiting: int = INGEST_MAX_QUEUED, timeout: float = INGEST_QUEUE_TIMEOUT):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_waiting or self.timeout <= 0:
+            self.shed += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done():  # handed a slot just as the wait ran out
+                self.release()
+            else:
+                waiter.cancel()
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes on; in_flight is unchanged
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": len(self._waiters), "shed": self.shed}
+
+
+service_limiter = WorkspaceLimiter()
+ingestion_gate = ConcurrencyGate()
+
+
+def _too_many(detail: str, retry_after: float, reason: str) -> HTTPException:
+    rate_limited.labels(reason=reason).inc()
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def limit_workspace(
+    request: Request,
+    _auth: bool = Depends(require_service),
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+) -> None:
+    """
+    Router-level dependency: spends from the workspace's bucket once the
+    caller is authenticated. async so the memory backend's check runs inline
+    on the event loop rather than paying a threadpool hop; acheck moves the
+    sqlite backend to a thread.
+    """
+    wait = await service_limiter.acheck(_workspace_key(x_workspace_id), _content_length(request))
+    if wait:
+        raise _too_many("Workspace rate limit exceeded", wait, "workspace")
+
+
+def metered_body(request: Request, x_workspace_id: str | None) -> AsyncIterator[bytes]:
+    """request.stream() charged to the workspace's bucket as it is read; see WorkspaceLimiter.meter."""
+    return service_limiter.meter(_workspace_key(x_workspace_id), request.stream(), _content_length(request))
+
+
+def _workspace_key(x_workspace_id: str | None) -> str:
+    return (x_workspace_id or "-")[:64]
+
+
+def _content_length(request: Request) -> int:
+    content_length = request.headers.get("content-length", "")
+    return int(content_length) if content_length.isdigit() else 0
+
+
+async def ingestion_slot():
+    """Holds one of the INGEST_MAX_IN_FLIGHT ingestion slots for the life of the request."""
+    if ingestion_gate.limit <= 0:
+        yield
+        return
+    if not await ingestion_gate.acquire():
+        raise _too_many("Too many concurrent ingestion requests", ingestion_gate.timeout or 1, "ingest")
+    try:
+        yield
+    finally:
+        ingestion_gate.release()
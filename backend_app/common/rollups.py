@@ -0,0 +1,141 @@
+# filepath: backend_app/common/rollups.py
+"""
+Hourly and daily rollups of campaign_metrics.
+
+Buckets are recomputed rather than adjusted: after each merge, every
+(source, metric, hour) touched by the staged rows is re-aggregated from the
+raw table, then the touched days from their hours. A corrected raw value
+therefore fixes sum, min and max too, and the cost scales with the rows in
+the touched buckets, not with the table. Buckets are UTC.
+"""
+from __future__ import annotations
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select, text
+
+from backend_app.db_models import DBCampaignMetricDaily, DBCampaignMetricHourly
+
+GRANULARITIES = {"hour": DBCampaignMetricHourly, "day": DBCampaignMetricDaily}
+
+_UPSERT = """
+ON CONFLICT (workspace_id, source, metric, bucket) DO UPDATE SET
+    value_sum = EXCLUDED.value_sum,
+    value_count = EXCLUDED.value_count,
+    value_min = EXCLUDED.value_min,
+    value_max = EXCLUDED.value_max,
+    last_value = EXCLUDED.last_value,
+    last_ts = EXCLUDED.last_ts,
+    updated_at = now()
+"""
+
+_HOURLY_SELECT = """
+SELECT m.workspace_id, m.source, m.metric, b.bucket,
+       sum(m.value), count(*), min(m.value), max(m.value),
+       (array_agg(m.value ORDER BY m.ts DESC))[1], max(m.ts)
+FROM {buckets} b
+JOIN campaign_metrics m
+  ON m.workspace_id = :workspace_id AND m.source = b.source AND m.metric = b.metric
+ AND m.ts >= b.bucket AND m.ts < b.bucket + interval '1 hour'
+GROUP BY m.workspace_id, m.source, m.metric, b.bucket
+"""
+
+_DAILY_SELECT = """
+SELECT h.workspace_id, h.source, h.metric, b.bucket,
+       sum(h.value_sum), sum(h.value_count), min(h.value_min), max(h.value_max),
+       (array_agg(h.last_value ORDER BY h.last_ts DESC))[1], max(h.last_ts)
+FROM {buckets} b
+JOIN campaign_metrics_hourly h
+  ON h.workspace_id = :workspace_id AND h.source = b.source AND h.metric = b.metric
+ AND h.bucket >= b.bucket AND h.bucket < b.bucket + interval '1 day'
+GROUP BY h.workspace_id, h.source, h.metric, b.bucket
+"""
+
+_COLUMNS = "(workspace_id, source, metric, bucket, value_sum, value_count, value_min, value_max, last_value, last_ts)"
+
+
+def _touched(unit: str) -> str:
+    return (
+        f"(SELECT DISTINCT source, metric, date_trunc('{unit}', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket "
+        "FROM campaign_metrics_staging)"
+    )
+
+
+REFRESH_HOURLY_SQL = text(f"INSERT INTO campaign_metrics_hourly {_COLUMNS} {_HOURLY_SELECT.format(buckets=_touched('hour'))} {_UPSERT}")
+REFRESH_DAILY_SQL = text(f"INSERT INTO campaign_metrics_daily {_COLUMNS} {_DAILY_SELECT.format(buckets=_touched('day'))} {_UPSERT}")
+
+
+def refresh_rollups(session, workspace_id: UUID) -> None:
+    """
+    Recompute the buckets touched by the rows in campaign_metrics_staging.
+    Called by merge_campaign_metrics after the merge, in its transaction.
+
+    The transaction-scoped advisory lock serialises refreshes per workspace:
+    without it two concurrent merges into one bucket could each recompute it
+    without the other's uncommitted rows, and the later write would win.
+    """
+    session.execute(text("SELECT pg_advisory_xact_lock(hashtext(CAST(:workspace_id AS text)))"), {"workspace_id": workspace_id})
+    session.execute(REFRESH_HOURLY_SQL, {"workspace_id": workspace_id})
+    session.execute(REFRESH_DAILY_SQL, {"workspace_id": workspace_id})
+
+
+def _range_buckets(unit: str) -> str:
+    return (
+        "(SELECT DISTINCT source, metric, date_trunc('{unit}', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket "
+        "FROM campaign_metrics WHERE workspace_id = :workspace_id AND ts >= :start AND ts < :end)"
+    ).format(unit=unit)
+
+
+REBUILD_HOURLY_SQL = text(f"INSERT INTO campaign_metrics_hourly {_COLUMNS} {_HOURLY_SELECT.format(buckets=_range_buckets('hour'))} {_UPSERT}")
+REBUILD_DAILY_SQL = text(
+    f"INSERT INTO campaign_metrics_daily {_COLUMNS} "
+    + _DAILY_SELECT.format(buckets=(
+        "(SELECT DISTINCT source, metric, date_trunc('day', bucket AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket "
+        "FROM campaign_metrics_hourly WHERE workspace_id = :workspace_id AND bucket >= :start AND bucket < :end)"
+    ))
+    + _UPSERT
+)
+
+
+def rebuild_rollups(session, workspace_id: UUID, start: datetime, end: datetime) -> None:
+    """
+    Recompute every bucket with raw rows in [start, end) for a workspace:
+    backfills after a migration, or repairs after raw rows were written
+    outside the ingest path. Round start/end to whole days so daily buckets
+    at the edges are complete.
+    """
+    params = {"workspace_id": workspace_id, "start": start, "end": end}
+    session.execute(REBUILD_HOURLY_SQL, params)
+    session.execute(REBUILD_DAILY_SQL, params)
+
+
+def query_rollups(
+    session,
+    workspace_id: UUID,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    source: str | None = None,
+    metric: str | None = None,
+) -> list[dict]:
+    model = GRANULARITIES[granularity]
+    stmt = select(model).where(model.workspace_id == workspace_id, model.bucket >= start, model.bucket < end)
+    if source:
+        stmt = stmt.where(model.source == source)
+    if metric:
+        stmt = stmt.where(model.metric == metric)
+    stmt = stmt.order_by(model.source, model.metric, model.bucket)
+    return [
+        {
+            "source": row.source,
+            "metric": row.metric,
+            "bucket": row.bucket.isoformat(),
+            "sum": row.value_sum,
+            "count": row.value_count,
+            "min": row.value_min,
+            "max": row.value_max,
+            "avg": row.value_sum / row.value_count if row.value_count else None,
+            "last": row.last_value,
+        }
+        for row in session.scalars(stmt)
+    ]
@@ -0,0 +1,298 @@
+# filepath: backend_app/common/rules.py
+"""
+Deterministic pre-audit: CRO checks evaluated over crawl features before
+(or instead of) a model call.
+
+page_columns() turns the extracted PageFeatures of many pages into one
+Arrow table of per-page counts and flags (primary CTAs above the fold,
+review widgets, email forms with incentive copy, ...). Every rule is a
+pyarrow compute expression over those columns, and evaluate() projects all
+rules for a goal in a single Acero pass, so a batch of thousands of pages
+costs one plan rather than one Python loop per rule and page.
+
+RULES_BY_GOAL is keyed like gpt.INSTRUCTIONS_BY_GOAL; rules under "*" run
+for every goal. A report says whether the model is still needed. It is
+skipped only when at least one high-impact check for the goal fired and
+RULES_SKIP_LLM_AT checks fired in all, so a page never gets a rules-only
+answer without a finding for the goal it was audited for. Pages without
+features and goals without a rule set always go to the model. Static
+crawls carry every feature but layout (static_scraper.page_features), so
+they get all checks except the few marked layout=True, which compare
+positions against the fold and need a browser render.
+"""
+from __future__ import annotations
+import logging
+import os
+import re
+from functools import lru_cache
+
+import pyarrow as pa
+import pyarrow.acero as acero
+import pyarrow.compute as pc
+from pydantic import BaseModel
+
+from backend_app.common.models import SuggestionOut
+
+logger = logging.getLogger(__name__)
+
+RULES_ENABLED = os.getenv("RULES_ENABLED", "1") == "1"
+RULES_SKIP_LLM_AT = int(os.getenv("RULES_SKIP_LLM_AT", "3"))
+RULES_MAX_PRIMARY_CTAS = int(os.getenv("RULES_MAX_PRIMARY_CTAS", "3"))
+
+ACTION_WORDS = re.compile(
+    r"\b(add to (cart|bag|basket)|buy( it)? now|shop( now| all| the)?|subscribe|sign up|join|get started|order now|pre-?order|checkout)\b",
+    re.I,
+)
+CART_WORDS = re.compile(r"\b(add to (cart|bag|basket)|buy( it)? now|pre-?order)\b", re.I)
+INCENTIVE_WORDS = re.compile(r"\d+\s?%|\b(off|discount|free shipping|exclusive|early access|gift|reward|coupon|save)\b", re.I)
+TRUST_WORDS = re.compile(
+    r"\b(guarantee[d]?|free returns|money[- ]back|secure (checkout|payment)|warranty|testimonials?|trusted by|verified|reviews?)\b",
+    re.I,
+)
+
+SCHEMA = pa.schema([
+    ("has_features", pa.bool_()),
+    ("rendered", pa.bool_()),
+    ("page_type", pa.string()),
+    ("primary_ctas", pa.int32()),
+    ("primary_ctas_above_fold", pa.int32()),
+    ("cart_cta", pa.bool_()),
+    ("cart_cta_above_fold", pa.bool_()),
+    ("meta_description_len", pa.int32()),
+    ("h1_count", pa.int32()),
+    ("review_widgets", pa.int32()),
+    ("trust_signals", pa.int32()),
+    ("email_forms", pa.int32()),
+    ("email_forms_incentive", pa.int32()),
+    ("email_form_above_fold", pa.bool_()),
+    ("search_form", pa.bool_()),
+    ("product_links", pa.int32()),
+    ("collection_links", pa.int32()),
+    ("prices", pa.int32()),
+    ("images_missing_alt", pa.int32()),
+    ("oversized_images", pa.int32()),
+])
+
+
+@lru_cache(maxsize=4096)
+def _classify(text: str) -> tuple[bool, bool, bool]:
+    """(action, add to cart, trust) for a CTA or heading text; the same few labels repeat on every page."""
+    return bool(ACTION_WORDS.search(text)), bool(CART_WORDS.search(text)), bool(TRUST_WORDS.search(text))
+
+
+def _row(page: dict) -> dict:
+    features = page.get("features") or {}
+    if hasattr(features, "model_dump"):
+        features = features.model_dump()
+    row = {name: 0 for name in SCHEMA.names}
+    row.update(has_features=bool(features), rendered=bool(features.get("viewport_height")), page_type=page.get("page_type") or "unknown")
+    row.update(cart_cta=False, cart_cta_above_fold=False, email_form_above_fold=False, search_form=False)
+    if not features:
+        return row
+
+    trust = sum(_classify(h.get("text") or "")[2] for h in features.get("headings") or [])
+    for cta in features.get("ctas") or []:
+        if not cta.get("visible", True):
+            continue
+        href = cta.get("href") or ""
+        is_action, cart, trusted = _classify(cta.get("text") or "")
+        trust += trusted
+        if is_action or cta.get("tag") in ("button", "input"):
+            row["primary_ctas"] += 1
+            row["primary_ctas_above_fold"] += bool(cta.get("above_fold"))
+        if cart:
+            row["cart_cta"] = True
+            row["cart_cta_above_fold"] |= bool(cta.get("above_fold"))
+        if "/products/" in href:
+            row["product_links"] += 1
+        elif "/collections" in href:
+            row["collection_links"] += 1
+    for form in features.get("forms") or []:
+        action = (form.get("action") or "").rstrip("/")
+        trust += bool(TRUST_WORDS.search(form.get("text") or ""))
+        if action.endswith("/cart/add"):
+            row["cart_cta"] = True
+            row["cart_cta_above_fold"] |= bool(form.get("above_fold"))
+        if action.endswith("/search"):
+            row["search_form"] = True
+        if form.get("has_email"):
+            row["email_forms"] += 1
+            row["email_forms_incentive"] += bool(INCENTIVE_WORDS.search(form.get("text") or ""))
+            row["email_form_above_fold"] |= bool(form.get("above_fold"))
+    for image in features.get("images") or []:
+        if row["rendered"] and not image.get("rendered_width"):
+            continue  # hidden; static crawls cannot tell, so they count every image
+        row["images_missing_alt"] += not (image.get("alt") or "").strip()
+        row["oversized_images"] += bool(image.get("above_fold")) and (image.get("width") or 0) > 2.5 * (image.get("rendered_width") or 0)
+
+    row["meta_description_len"] = len(((features.get("meta") or {}).get("description") or "").strip())
+    row["h1_count"] = sum(1 for h in features.get("headings") or [] if h.get("level") == 1)
+    row["review_widgets"] = len(features.get("reviews") or [])
+    row["trust_signals"] = trust
+    row["prices"] = len(features.get("prices") or [])
+    return row
+
+
+def page_columns(pages: list[dict]) -> pa.Table:
+    """One row of rule inputs per PageData-shaped dict (its "features" and "page_type")."""
+    return pa.Table.from_pylist([_row(page) for page in pages], schema=SCHEMA)
+
+
+class Rule:
+    """
+    A check over page_columns(): `when` is a boolean expression (only pages
+    with features are checked), `text` may use column names as {fields}.
+    layout=True checks use fold positions and only run on rendered pages.
+    """
+
+    __slots__ = ("id", "when", "text", "type", "target", "impact", "_fixed")
+
+    def __init__(self, id: str, when: pc.Expression, text: str, type: str, target: str, impact: str, layout: bool = False):
+        self.id = id
+        self.when = (when & _col("rendered")) if layout else when
+        self.text = text
+        self.type = type
+        self.target = target
+        self.impact = impact
+        self._fixed = None if "{" in text else SuggestionOut(text=text, type=type, target=target, impact=impact)
+
+    def suggestion(self, row: dict) -> SuggestionOut:
+        if self._fixed is not None:
+            return self._fixed
+        return SuggestionOut(text=self.text.format(**row), type=self.type, target=self.target, impact=self.impact)
+
+
+_col = pc.field
+_product = _col("page_type") == "product"
+_landing = _col("page_type").isin(["home", "collection", "page"])
+
+RULES_BY_GOAL: dict[str, list[Rule]] = {
+    "*": [
+        Rule("no-cta-above-fold", (_col("primary_ctas_above_fold") == 0),
+             "There is no call to action above the fold; give visitors one clear next step without scrolling.",
+             "cta", "above the fold", "high", layout=True),
+        Rule("missing-meta-description", (_col("meta_description_len") == 0),
+             "Add a meta description; search results currently show whatever text the engine picks.",
+             "seo", "meta description", "low"),
+        Rule("h1-count", (_col("h1_count") != 1),
+             "Use exactly one H1 that states what the page offers (found {h1_count}).",
+             "copy", "h1", "medium"),
+        Rule("oversized-hero-images", _col("oversized_images") > 0,
+             "{oversized_images} above-the-fold images are served far larger than they render; resize them to speed up first paint.",
+             "performance", "above-the-fold images", "medium", layout=True),
+        Rule("images-missing-alt", _col("images_missing_alt") > 0,
+             "{images_missing_alt} images have no alt text; describe the products for accessibility and image search.",
+             "accessibility", "images", "low"),
+    ],
+    "increase add to cart": [
+        Rule("no-add-to-cart", _product & ~_col("cart_cta"),
+             "The product page has no Add to cart button; add a prominent one next to the price.",
+             "cta", "add to cart button", "high"),
+        Rule("add-to-cart-below-fold", _product & _col("cart_cta") & ~_col("cart_cta_above_fold"),
+             "Move the Add to cart button above the fold, next to the price and variant picker.",
+             "layout", "add to cart button", "high", layout=True),
+        Rule("competing-ctas", _col("primary_ctas_above_fold") > RULES_MAX_PRIMARY_CTAS,
+             "{primary_ctas_above_fold} calls to action compete above the fold; keep one primary action and demote the rest.",
+             "cta", "above the fold", "medium", layout=True),
+        Rule("no-price", _product & (_col("prices") == 0),
+             "No price was found on the product page; show it next to the title.",
+             "copy", "price", "high"),
+        Rule("product-without-reviews", _product & (_col("review_widgets") == 0),
+             "Show review stars near the product title to reassure buyers before they add to cart.",
+             "trust", "product reviews", "medium"),
+    ],
+    "boost email signups": [
+        Rule("no-email-form", (_col("email_forms") == 0),
+             "There is no email signup form on the page; add one to the footer or a timed popup.",
+             "form", "email signup", "high"),
+        Rule("no-signup-incentive", (_col("email_forms") > 0) & (_col("email_forms_incentive") == 0),
+             "The signup form gives no reason to subscribe; offer a discount, free shipping or early access in its copy.",
+             "copy", "email signup", "high"),
+        Rule("signup-below-fold", _landing & (_col("email_forms") > 0) & ~_col("email_form_above_fold"),
+             "The signup form is only reachable by scrolling; surface it higher up or in a popup.",
+             "layout", "email signup", "medium", layout=True),
+    ],
+    "drive product views": [
+        Rule("no-product-links", _landing & (_col("product_links") == 0),
+             "The page links to no products; feature best sellers or new arrivals.",
+             "layout", "product links", "high"),
+        Rule("no-collection-links", (_col("page_type") == "home") & (_col("collection_links") == 0),
+             "Add collection links to the homepage so visitors can browse by category.",
+             "navigation", "collections", "medium"),
+        Rule("no-search", (_col("page_type") == "home") & ~_col("search_form"),
+             "Add a visible search box; visitors who search view more products.",
+             "navigation", "search", "medium"),
+        Rule("competing-ctas", _col("primary_ctas_above_fold") > RULES_MAX_PRIMARY_CTAS,
+             "{primary_ctas_above_fold} calls to action compete above the fold; lead with one that sends visitors to products.",
+             "cta", "above the fold", "medium", layout=True),
+    ],
+    "improve trust / social proof": [
+        Rule("no-review-widget", (_col("review_widgets") == 0),
+             "No review widget was found; show ratings and customer reviews.",
+             "trust", "reviews", "high"),
+        Rule("no-trust-copy", (_col("trust_signals") == 0),
+             "Nothing on the page mentions guarantees, free returns or secure checkout; add them near the main call to action.",
+             "trust", "guarantees", "medium"),
+        Rule("product-without-reviews", _product & (_col("review_widgets") == 0),
+             "Show review stars near the product title.",
+             "trust", "product reviews", "high"),
+    ],
+}
+
+IMPACT_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+class RuleReport(BaseModel):
+    suggestions: list[SuggestionOut]
+    fired: list[str]
+    needs_llm: bool
+    reason: str
+
+    @property
+    def rationale(self) -> str:
+        return f"Automated checks of the page structure found {len(self.suggestions)} issues: {', '.join(self.fired)}."
+
+
+def evaluate_table(table: pa.Table, goal: str) -> list[RuleReport]:
+    """Reports for every row of a page_columns() table, with all of goal's rules projected in one pass."""
+    goal_rules = RULES_BY_GOAL.get(goal.lower(), [])
+    rules = goal_rules + RULES_BY_GOAL["*"]
+    plan = acero.Declaration.from_sequence([
+        acero.Declaration("table_source", acero.TableSourceNodeOptions(table)),
+        acero.Declaration("project", acero.ProjectNodeOptions([_col("has_features") & rule.when for rule in rules], [str(n) for n in range(len(rules))])),
+    ])
+    masks = [column.to_pylist() for column in plan.to_table(use_threads=False).columns]
+    columns = table.to_pydict()
+
+    reports = []
+    for index in range(table.num_rows):
+        fired = [n for n, mask in enumerate(masks) if mask[index]]
+        row = {name: values[index] for name, values in columns.items()} if fired else {}
+        fired.sort(key=lambda n: IMPACT_ORDER.get(rules[n].impact, 3))  # stable: registry order within an impact
+        high = sum(1 for n in fired if n < len(goal_rules) and rules[n].impact == "high")
+        if not columns["has_features"][index]:
+            needs_llm, reason = True, "no page features"
+        elif not goal_rules:
+            needs_llm, reason = True, "no rule set for this goal"
+        elif not high:
+            needs_llm, reason = True, "no high-impact finding for the goal"
+        elif len(fired) < RULES_SKIP_LLM_AT:
+            needs_llm, reason = True, f"{len(fired)} checks fired, fewer than {RULES_SKIP_LLM_AT}"
+        else:
+            needs_llm, reason = False, f"{len(fired)} checks fired, {high} high-impact for the goal"
+        reports.append(RuleReport(
+            suggestions=[rules[n].suggestion(row) for n in fired],
+            fired=[rules[n].id for n in fired],
+            needs_llm=needs_llm,
+            reason=reason,
+        ))
+    return reports
+
+
+def evaluate(pages: list[dict], goal: str) -> list[RuleReport]:
+    return evaluate_table(page_columns(pages), goal) if pages else []
+
+
+def pre_audit(page: dict, goal: str) -> RuleReport:
+    """The rule report for one PageData-shaped dict."""
+    return evaluate([page], goal)[0]
@@ -1,39 +1,84 @@
-from playwright.sync_api import sync_playwright
+from backend_app.common.browser_pool import BrowserPool, browser_pool
+from backend_app.common.static_scraper import fetch_static
+from backend_app.common.extract import EXTRACT_FEATURES_JS, classify_page_type
+from backend_app.common.metrics import observe, scrape_phase_duration
+from backend_app.common.artifacts import artifact_id
+from backend_app.common.screenshots import screenshot_service
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
-def scrape_page(url: str) -> dict:
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+CRAWL_MODES = ("auto", "static", "browser")
+
+async def fetch_page(url: str, mode: str = "auto", pool: BrowserPool | None = None) -> dict:
+    """
+    Crawl a page by the cheapest path that works. "auto" tries a plain HTTP
+    fetch first and only renders in Chromium when the HTML needs JavaScript;
+    "static" never launches a browser; "browser" always does.
+    """
+    if mode != "browser":
+        try:
+            result = await fetch_static(url, force=(mode == "static"))
+        except Exception as e:
+            if mode == "static":
+                raise
+            logger.warning(f"⚠️ Static fetch failed for {url}, falling back to browser: {e}")
+            result = None
+        if result is not None:
+            return result
+        if mode == "static":
+            raise ValueError(f"Static fetch returned no usable HTML for {url}")
+    return await scrape_page(url, pool)
+
+async def scrape_page(url: str, pool: BrowserPool | None = None) -> dict:
+    pool = pool or browser_pool
+    start = time.perf_counter()
+    async with pool.context() as context:
+        page = await context.new_page()
+        scrape_phase_duration.labels(phase="launch").observe(time.perf_counter() - start)
 
         try:
             logger.info(f"📸 Crawling: {url}")
-            page.goto(url, timeout=10000)
+            with observe(scrape_phase_duration, phase="goto"):
+                response = await page.goto(url, timeout=10000)
         except Exception as e:
             logger.error(f"❌ Failed to load {url}: {e}")
-            browser.close()
             raise
 
-        html_content = page.content()
-        title = page.title()
-
-        headings = [el.inner_text() for el in page.query_selector_all("h1, h2, h3")]
-        ctas = [el.get_attribute("href") for el in page.query_selector_all("a, button") if el.get_attribute("href")]
-        forms = [el.get_attribute("action") for el in page.query_selector_all("form") if el.get_attribute("action")]
-
-        context.close()
-        browser.close()
+        headers = response.headers if response else {}
+        with observe(scrape_phase_duration, phase="extract"):
+            html_content = await page.content()
+            title = await page.title()
+            features = await page.evaluate(EXTRACT_FEATURES_JS)
+        # Shoot while the page is open rather than navigating to it again
+        # later; screenshot_service only encodes and stores these.
+        pngs = None
+        if screenshot_service.wants(artifact_id(html_content.encode("utf-8"))):
+            try:
+                with observe(scrape_phase_duration, phase="screenshot"):
+                    pngs = await screenshot_service.shoot(page, features.get("page_height"))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not screenshot {url} during the crawl: {e}")
+        headings = [h["text"] for h in features["headings"]]
+        ctas = [c["href"] for c in features["ctas"] if c["href"]]
+        forms = [f["action"] for f in features["forms"] if f["action"]]
 
-        return {
+        result = {
             "url": url,
             "html": html_content,
             "title": title,
             "headings": headings,
             "ctas": ctas,
             "forms": forms,
-            "page_type": "unknown",
-            "screenshot_url": ""  # Optional: implement capture/upload later
+            "page_type": classify_page_type(url, features),
+            "features": features,
+            "screenshot_url": "",  # filled in later by common/screenshots.py
+            "rendered_by": "browser",
+            # Validators for conditional revalidation by the crawl cache
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
         }
+        if pngs is not None:
+            result["screenshot_pngs"] = pngs  # taken off by crawl_url before caching
+        return result
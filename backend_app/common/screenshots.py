@@ -0,0 +1,252 @@
+# filepath: backend_app/common/screenshots.py
+"""
+Screenshot capture as a follow-up stage to the crawl.
+
+Pages rendered by Chromium are shot while the crawl still has them open
+(shoot()): two screenshot calls on a loaded page, instead of a second
+navigation later. Only downscaling, WebP encoding and storage are left to
+the background, and /crawl does not wait for them. Static fast-path results
+have no open page, so capturing one means a full Chromium load, the cost
+the static path exists to avoid; it only happens with SCREENSHOT_STATIC=1.
+Such captures (and retries) open their own context on the shared browser
+pool, load the page and take the same two PNGs: above the fold, and the
+full page clipped to SCREENSHOT_MAX_HEIGHT. Encoding runs on a small thread
+pool, and the images go into their own content-addressed ArtifactStore, so
+identical renders are stored once.
+
+Captures are keyed by the HTML artifact id: a page whose HTML has already
+been captured reuses those images without touching the browser, and
+concurrent crawls of the same HTML share one capture. At most
+SCREENSHOT_CONCURRENCY captures hold a browser context at a time, so
+screenshots never take more than that many pool slots away from crawls.
+When the queue already holds SCREENSHOT_MAX_PENDING captures, new ones are
+dropped, and a later crawl of the page will try again.
+"""
+from __future__ import annotations
+import asyncio
+import io
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable
+
+from PIL import Image
+
+from backend_app.common.artifacts import ArtifactStore, LocalDiskStorage
+from backend_app.common.browser_pool import BrowserPool, browser_pool
+from backend_app.common.metrics import observe, scrape_phase_duration
+from backend_app.common.models import ScreenshotSet
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_ENABLED = os.getenv("SCREENSHOT_ENABLED", "1") == "1"
+SCREENSHOT_STATIC = os.getenv("SCREENSHOT_STATIC", "0") == "1"  # navigate Chromium to capture static crawls
+SCREENSHOT_DIR = os.getenv("SCREENSHOT_DIR", os.path.join(tempfile.gettempdir(), "auditai-screenshots"))
+SCREENSHOT_CONCURRENCY = int(os.getenv("SCREENSHOT_CONCURRENCY", "2"))
+SCREENSHOT_ENCODE_WORKERS = int(os.getenv("SCREENSHOT_ENCODE_WORKERS", "2"))
+SCREENSHOT_MAX_PENDING = int(os.getenv("SCREENSHOT_MAX_PENDING", "64"))
+SCREENSHOT_MAX_ENTRIES = int(os.getenv("SCREENSHOT_MAX_ENTRIES", "10000"))
+SCREENSHOT_VIEWPORT = (1280, 800)
+SCREENSHOT_MAX_HEIGHT = int(os.getenv("SCREENSHOT_MAX_HEIGHT", "8000"))  # CSS px of the full-page shot
+SCREENSHOT_WIDTH = int(os.getenv("SCREENSHOT_WIDTH", "640"))  # px of the stored WebP
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "75"))
+SCREENSHOT_TIMEOUT_MS = int(os.getenv("SCREENSHOT_TIMEOUT_MS", "15000"))
+# Where images are served. A path (the default) is made absolute against the
+# API's own origin when a response is built (absolute_url); set a full URL
+# when the images sit behind a CDN or a different public origin.
+SCREENSHOT_URL_PREFIX = os.getenv("SCREENSHOT_URL_PREFIX", "/screenshots")
+
+
+def encode_webp(png: bytes, width: int = SCREENSHOT_WIDTH, quality: int = SCREENSHOT_QUALITY) -> bytes:
+    """Downscale a PNG screenshot to at most `width` px wide and encode it as WebP."""
+    with Image.open(io.BytesIO(png)) as img:
+        img = img.convert("RGB")
+        if img.width > width:
+            # WebP caps a side at 16383 px; the height clip keeps us well under it.
+            img.thumbnail((width, img.height), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        out = io.BytesIO()
+        # method 2 is about twice as fast as the default 4 for ~3% larger files.
+        img.save(out, "WEBP", quality=quality, method=2)
+        return out.getvalue()
+
+
+def absolute_url(url: str, base_url: str) -> str:
+    """Resolve a stored "/screenshots/..." path against the API origin; the SPA runs on another one."""
+    if url.startswith("/") and base_url:
+        return base_url.rstrip("/") + url
+    return url
+
+
+class ScreenshotService:
+    def __init__(
+        self,
+        pool: BrowserPool | None = None,
+        store: ArtifactStore | None = None,
+        concurrency: int = SCREENSHOT_CONCURRENCY,
+        encode_workers: int = SCREENSHOT_ENCODE_WORKERS,
+        max_pending: int = SCREENSHOT_MAX_PENDING,
+        max_entries: int = SCREENSHOT_MAX_ENTRIES,
+        enabled: bool = SCREENSHOT_ENABLED,
+        capture_static: bool = SCREENSHOT_STATIC,
+    ):
+        self.pool = pool or browser_pool
+        self.store = store or ArtifactStore(LocalDiskStorage(SCREENSHOT_DIR))
+        self.encode_workers = max(1, encode_workers)
+        self.max_pending = max_pending
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.capture_static = capture_static
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._executor: ThreadPoolExecutor | None = None
+        self._results: OrderedDict[str, ScreenshotSet] = OrderedDict()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._on_done: dict[str, list[Callable[[ScreenshotSet], Awaitable[None]]]] = {}
+        self.captured = 0
+        self.reused = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def image_url(self, image_id: str) -> str:
+        return f"{SCREENSHOT_URL_PREFIX}/{image_id}"
+
+    def capturing(self, key: str) -> bool:
+        return key in self._tasks
+
+    def wants(self, key: str) -> bool:
+        """Whether a crawl that has this HTML open should shoot it: never captured, or the last try failed."""
+        current = self.get(key)
+        return self.enabled and (current is None or current.status == "failed")
+
+    def get(self, key: str) -> ScreenshotSet | None:
+        """Screenshots for an HTML artifact id: pending, ready or failed; None if never scheduled."""
+        if key in self._tasks:
+            return ScreenshotSet(status="pending")
+        return self._results.get(key)
+
+    def _remember(self, key: str, shots: ScreenshotSet) -> None:
+        self._results[key] = shots
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def schedule(
+        self,
+        url: str,
+        key: str,
+        on_done: Callable[[ScreenshotSet], Awaitable[None]] | None = None,
+        pngs: tuple[bytes, bytes] | None = None,
+    ) -> ScreenshotSet | None:
+        """
+        Start capturing url in the background, keyed by its HTML artifact id;
+        with pngs (from shoot() during the crawl) only encode and store them.
+        Returns the current state without waiting (ready when the same HTML was
+        captured before), or None when capture is disabled or the queue is full.
+        Unless it returned "ready", on_done is awaited with the final set once
+        the capture (new or already running) finishes.
+        """
+        if not self.enabled or (pngs is None and not self.pool.started):
+            return None
+        current = self.get(key)
+        if current is not None and current.status == "ready":
+            self.reused += 1
+            return current
+        if current is None or current.status == "failed":
+            if len(self._tasks) >= self.max_pending:
+                self.dropped += 1
+                logger.warning(f"⚠️ Screenshot queue full ({self.max_pending}), skipping {url}")
+                return None
+            task = asyncio.create_task(self._run(url, key, pngs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        if on_done is not None:
+            self._on_done.setdefault(key, []).append(on_done)
+        return ScreenshotSet(status="pending")
+
+    async def _run(self, url: str, key: str, pngs: tuple[bytes, bytes] | None = None) -> None:
+        try:
+            shots = await (self.capture(url) if pngs is None else self._encode(*pngs))
+            self.captured += 1
+            logger.info(f"🖼️ Screenshots ready for {url}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"⚠️ Screenshot capture failed for {url}: {e}")
+            shots = ScreenshotSet(status="failed")
+        self._remember(key, shots)
+        for on_done in self._on_done.pop(key, []):
+            try:
+                await on_done(shots)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not record screenshots for {url}: {e}")
+
+    async def capture(self, url: str) -> ScreenshotSet:
+        """Render url in a pooled context and store both shots; returns the ready set."""
+        width, height = SCREENSHOT_VIEWPORT
+        async with self._semaphore:
+            async with self.pool.context(viewport={"width": width, "height": height}) as context:
+                page = await context.new_page()
+                with observe(scrape_phase_duration, phase="screenshot"):
+                    await page.goto(url, timeout=SCREENSHOT_TIMEOUT_MS)
+                    above, full = await self.shoot(page)
+        # The browser context is released before encoding, so slow encodes
+        # never hold a pool slot.
+        return await self._encode(above, full)
+
+    @staticmethod
+    async def shoot(page, page_height: int | None = None) -> tuple[bytes, bytes]:
+        """Above-the-fold and clipped full-page PNGs of a loaded page, at its own viewport."""
+        viewport = page.viewport_size or {}
+        width, height = viewport.get("width") or SCREENSHOT_VIEWPORT[0], viewport.get("height") or SCREENSHOT_VIEWPORT[1]
+        above = await page.screenshot(type="png")
+        if page_height is None:
+            page_height = await page.evaluate("document.documentElement.scrollHeight")
+        full = await page.screenshot(
+            type="png",
+            full_page=True,
+            clip={"x": 0, "y": 0, "width": width, "height": max(height, min(page_height or 0, SCREENSHOT_MAX_HEIGHT))},
+        )
+        return above, full
+
+    async def _encode(self, above: bytes, full: bytes) -> ScreenshotSet:
+        with observe(scrape_phase_duration, phase="encode"):
+            above_ref, full_ref = await asyncio.gather(self._store(above), self._store(full))
+        return ScreenshotSet(
+            status="ready",
+            above_fold=self.image_url(above_ref.id),
+            full_page=self.image_url(full_ref.id),
+        )
+
+    async def _store(self, png: bytes):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix="screenshot")
+        loop = asyncio.get_running_loop()
+        webp = await loop.run_in_executor(self._executor, encode_webp, png)
+        return await loop.run_in_executor(self._executor, self.store.put_bytes, webp, "image/webp")
+
+    async def stop(self) -> None:
+        """Cancel outstanding captures; a later crawl of those pages schedules them again."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._on_done.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._tasks),
+            "captured": self.captured,
+            "reused": self.reused,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "store": self.store.stats(),
+        }
+
+
+screenshot_service = ScreenshotService()
@@ -0,0 +1,116 @@
+# filepath: backend_app/common/singleflight.py
+from __future__ import annotations
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    __slots__ = ("task", "waiters", "items", "changed")
+
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.waiters = 0
+        self.items: list[T] = []
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one computation.
+
+    The first caller for a key (the leader) starts the work as a task; callers
+    arriving while it runs wait on the same task and get the same result or
+    exception. The work is cancelled only when every waiter has gone away, so
+    one client disconnecting does not fail the others. Nothing is kept once
+    the task finishes: caching results is the caller's job.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._streams: dict[str, _Call] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def _start(self, calls: dict[str, _Call], key: str, work: Callable[[_Call], Awaitable]) -> _Call:
+        call = calls[key] = _Call()
+        call.task = asyncio.ensure_future(work(call))
+        call.task.add_done_callback(lambda task: self._forget(calls, key, call))
+        self.leaders += 1
+        return call
+
+    @staticmethod
+    def _forget(calls: dict[str, _Call], key: str, call: _Call) -> None:
+        if calls.get(key) is call:
+            del calls[key]
+        if not call.task.cancelled():
+            call.task.exception()  # mark retrieved when nobody is left waiting
+
+    @staticmethod
+    def _leave(calls: dict[str, _Call], key: str, call: _Call) -> None:
+        call.waiters -= 1
+        if call.waiters == 0 and not call.task.done():
+            # Nobody wants the result any more; let the next caller start fresh.
+            call.task.cancel()
+            if calls.get(key) is call:
+                del calls[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Run fn() once per key at a time. Returns (result, shared)."""
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.shared += 1
+        else:
+            call = self._start(self._calls, key, lambda _: fn())
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        finally:
+            self._leave(self._calls, key, call)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Streaming variant of do(): fn() is iterated once and every concurrent
+        subscriber receives all of its items, late joiners starting from the
+        first one. An error raised by fn() is raised to every subscriber.
+        """
+        call = self._streams.get(key)
+        if call is not None:
+            self.shared += 1
+        else:
+            call = self._start(self._streams, key, lambda c: self._pump(c, fn()))
+        call.waiters += 1
+        index = 0
+        try:
+            while True:
+                while index < len(call.items):
+                    yield call.items[index]
+                    index += 1
+                if call.task.done():
+                    call.task.result()  # re-raise the producer's error, if any
+                    return
+                await call.changed.wait()
+        finally:
+            self._leave(self._streams, key, call)
+
+    @staticmethod
+    async def _pump(call: _Call, items: AsyncIterator) -> None:
+        try:
+            async for item in items:
+                call.items.append(item)
+                call.notify()
+        finally:
+            call.notify()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "leaders": self.leaders,
+            "shared": self.shared,
+        }
@@ -0,0 +1,296 @@
+# filepath: backend_app/common/static_scraper.py
+from __future__ import annotations
+import logging
+import os
+import re
+from html.parser import HTMLParser
+
+from backend_app.common.http_client import get_http_client
+from backend_app.common.extract import classify_page_type
+
+logger = logging.getLogger(__name__)
+
+# Below this much visible body text we assume the page is rendered client-side.
+STATIC_MIN_TEXT_CHARS = int(os.getenv("STATIC_MIN_TEXT_CHARS", "200"))
+
+SPA_ROOT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte"}
+SPA_ROOT_ATTRS = {"data-reactroot", "ng-app", "data-v-app", "data-server-rendered"}
+NOSCRIPT_JS_RE = re.compile(r"enable javascript|requires javascript|javascript (is )?(disabled|required)", re.I)
+
+_SKIP_TEXT_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Tags that may appear in the document head; any other start tag ends the
+# head implicitly, since </head> is optional.
+_HEAD_TAGS = {"html", "head", "title", "meta", "link", "base", "style", "script", "noscript", "template"}
+_HEADING_TAGS = {"h1", "h2", "h3"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# The same price and review-widget markers extract.py's EXTRACT_FEATURES_JS
+# queries, as classes, ids, attributes and itemprops (lower case).
+_PRICE_CLASSES = {"price", "product__price", "price-item", "money"}
+_REVIEW_WIDGETS = {
+    "schema": {"itemprop": {"aggregaterating", "review"}},
+    "shopify": {"class": {"spr-badge"}, "id": {"shopify-product-reviews"}},
+    "judgeme": {"class": {"jdgm-widget", "jdgm-preview-badge"}},
+    "yotpo": {"class": {"yotpo", "yotpo-widget-instance"}},
+    "okendo": {"class": {"okereviews"}, "attr": {"data-oke-widget"}},
+    "stamped": {"class": {"stamped-main-widget", "stamped-product-reviews-badge"}},
+    "loox": {"class": {"loox-rating"}, "id": {"looxreviews"}},
+    "trustpilot": {"class": {"trustpilot-widget"}},
+}
+MAX_PRICES = 50
+
+
+def _clean(text: str, limit: int = 200) -> str:
+    return " ".join(text.split())[:limit]
+
+
+def _int(value: str | None) -> int:
+    value = (value or "").strip().removesuffix("px")
+    return int(value) if value.isdigit() else 0
+
+
+class PageFeatureParser(HTMLParser):
+    """
+    Single pass over raw HTML collecting the same fields scrape_page reads
+    from the DOM (title, h1-h3, CTA hrefs, form actions) plus the signals
+    needs_javascript() uses to decide whether a real browser is required.
+    page_features() returns the PageFeatures subset that needs no layout:
+    everything but positions, visibility and rendered image sizes.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.headings: list[str] = []
+        self.ctas: list[str] = []
+        self.forms: list[str] = []
+        self.meta: dict[str, str] = {}
+        self.heading_items: list[dict] = []
+        self.cta_items: list[dict] = []
+        self.form_items: list[dict] = []
+        self.images: list[dict] = []
+        self.prices: list[str] = []
+        self.reviews: set[str] = set()
+        self.text_chars = 0
+        self.spa_root = False
+        self.noscript_requires_js = False
+        self._in_head = True
+        self._in_title = False
+        self._heading: list[str] | None = None
+        self._heading_depth = 0
+        self._heading_level = 0
+        self._skip_depth = 0
+        self._noscript = False
+        # Elements whose text is being collected: [tag, depth, parts, item, key, limit, chars].
+        self._captures: list[list] = []
+        self._form: dict | None = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._in_head and tag not in _HEAD_TAGS:
+            self._in_head = False
+        if tag in _SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+            self._noscript = self._noscript or tag == "noscript"
+        for capture in self._captures:
+            if capture[0] == tag:
+                capture[1] += 1
+        if tag == "title":
+            # Only the document's own title; svg icons carry <title>s too.
+            self._in_title = self._in_head and not self._skip_depth
+        elif tag in _HEADING_TAGS:
+            if self._heading is None:
+                self._heading = []
+                self._heading_level = int(tag[1])
+            self._heading_depth += 1
+        elif tag in ("a", "button"):
+            if attrs.get("href"):
+                self.ctas.append(attrs["href"])
+            if tag == "a":
+                self._close_captures("a")  # <a> does not nest; a new one closes the last
+            item = {"tag": tag, "text": "", "href": attrs.get("href"), "aria_label": attrs.get("aria-label") or ""}
+            self.cta_items.append(item)
+            self._captures.append([tag, 1, [], item, "text", 200, 0])
+        elif tag == "form":
+            if attrs.get("action"):
+                self.forms.append(attrs["action"])
+            self._close_captures("form")
+            self._form = {"action": attrs.get("action"), "method": (attrs.get("method") or "get").lower(), "inputs": [], "has_email": False, "text": ""}
+            self.form_items.append(self._form)
+            self._captures.append([tag, 1, [], self._form, "text", 300, 0])
+        elif tag in ("input", "select", "textarea"):
+            kind = (attrs.get("type") or "text").lower() if tag == "input" else tag
+            if self._form is not None:
+                self._form["inputs"].append(kind)
+                self._form["has_email"] |= kind == "email" or "email" in (attrs.get("name") or "").lower()
+            if kind == "submit":
+                self.cta_items.append({"tag": tag, "text": _clean(attrs.get("value") or attrs.get("aria-label") or ""), "href": None})
+        elif tag == "img":
+            self.images.append({
+                "src": attrs.get("src") or attrs.get("data-src"),
+                "alt": attrs.get("alt"),
+                "width": _int(attrs.get("width")),
+                "height": _int(attrs.get("height")),
+            })
+        elif tag == "meta":
+            key = attrs.get("name") or attrs.get("property")
+            if key and attrs.get("content") is not None:
+                self.meta.setdefault(key.lower(), attrs["content"])
+        elif tag == "link" and "canonical" in (attrs.get("rel") or "").lower().split():
+            self.meta["canonical"] = attrs.get("href")
+        if attrs.get("id") in SPA_ROOT_IDS or SPA_ROOT_ATTRS.intersection(attrs):
+            self.spa_root = True
+        if not self._in_head and not self._skip_depth:
+            self._markers(tag, attrs)
+
+    def _markers(self, tag: str, attrs: dict) -> None:
+        classes = set((attrs.get("class") or "").lower().split())
+        element_id = (attrs.get("id") or "").lower()
+        itemprop = (attrs.get("itemprop") or "").lower()
+        for name, markers in _REVIEW_WIDGETS.items():
+            if (
+                classes & markers.get("class", set())
+                or element_id in markers.get("id", ())
+                or itemprop in markers.get("itemprop", ())
+                or attrs.keys() & markers.get("attr", set())
+            ):
+                self.reviews.add(name)
+        if itemprop == "price" or classes & _PRICE_CLASSES or "data-product-price" in attrs:
+            if tag in _VOID_TAGS:
+                if attrs.get("content") and len(self.prices) < MAX_PRICES:
+                    self.prices.append(_clean(attrs["content"], 60))
+            elif not any(capture[4] == "price" for capture in self._captures):
+                self._captures.append([tag, 1, [], None, "price", 60, 0])
+
+    def _close_captures(self, tag: str) -> None:
+        """Finish the innermost open capture of tag and any left open inside it."""
+        for index in range(len(self._captures) - 1, -1, -1):
+            if self._captures[index][0] == tag:
+                for capture in reversed(self._captures[index:]):
+                    self._finish(capture)
+                del self._captures[index:]
+                return
+
+    def _finish(self, capture: list) -> None:
+        _, _, parts, item, key, limit, _ = capture
+        text = _clean("".join(parts), limit)
+        if key == "price":
+            if text and len(self.prices) < MAX_PRICES:
+                self.prices.append(text)
+            return
+        item[key] = text or _clean(item.pop("aria_label", ""))
+        item.pop("aria_label", None)
+        if item is self._form:
+            self._form = None
+
+    def handle_endtag(self, tag):
+        for capture in reversed(self._captures):
+            if capture[0] == tag:
+                capture[1] -= 1
+                if capture[1] <= 0:
+                    self._close_captures(tag)
+                break
+        if tag in _SKIP_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+            if tag == "noscript":
+                self._noscript = False
+        if tag == "head":
+            self._in_head = False
+        if tag == "title":
+            self._in_title = False
+        elif tag in _HEADING_TAGS and self._heading is not None:
+            self._heading_depth -= 1
+            if self._heading_depth <= 0:
+                self.headings.append(" ".join("".join(self._heading).split()))
+                self.heading_items.append({"level": self._heading_level, "text": _clean(self.headings[-1], 300)})
+                self._heading = None
+                self._heading_depth = 0
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._noscript and NOSCRIPT_JS_RE.search(data):
+            self.noscript_requires_js = True
+        if self._skip_depth or self._in_head:
+            return
+        if self._heading is not None:
+            self._heading.append(data)
+        for capture in self._captures:
+            if capture[6] < 2 * capture[5]:
+                capture[2].append(data)
+                capture[6] += len(data)
+        self.text_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        for capture in reversed(self._captures):
+            self._finish(capture)
+        self._captures.clear()
+
+    def page_features(self) -> dict:
+        """A PageFeatures-shaped dict; viewport_height stays 0 because nothing was laid out."""
+        return {
+            "headings": self.heading_items,
+            "ctas": self.cta_items,
+            "forms": self.form_items,
+            "meta": self.meta,
+            "images": self.images,
+            "prices": self.prices,
+            "reviews": [name for name in _REVIEW_WIDGETS if name in self.reviews],
+            "viewport_height": 0,
+            "page_height": 0,
+        }
+
+
+def parse_static(html: str) -> PageFeatureParser:
+    parser = PageFeatureParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def needs_javascript(features: PageFeatureParser) -> bool:
+    """Heuristic: escalate to Chromium when the server HTML looks like an empty shell."""
+    if features.text_chars < STATIC_MIN_TEXT_CHARS:
+        return True
+    if features.noscript_requires_js:
+        return True
+    if features.spa_root and not features.headings and not features.ctas:
+        return True
+    return False
+
+
+async def fetch_static(url: str, force: bool = False) -> dict | None:
+    """
+    Fetch and extract a page without a browser. Returns a PageData-shaped
+    dict, or None when the page should be rendered by Chromium instead
+    (force=True skips the JavaScript heuristic).
+    """
+    resp = await get_http_client().get(url)
+    content_type = resp.headers.get("content-type", "")
+    if resp.status_code >= 400 or "html" not in content_type:
+        logger.info(f"↪️ Static fetch unusable for {url} ({resp.status_code}, {content_type or 'no content-type'})")
+        return None
+
+    html = resp.text
+    features = parse_static(html)
+    if not force and needs_javascript(features):
+        logger.info(f"↪️ {url} needs JavaScript; escalating to browser")
+        return None
+
+    page_features = features.page_features()
+    return {
+        "url": url,
+        "html": html,
+        "title": " ".join(features.title.split()),
+        "headings": features.headings,
+        "ctas": features.ctas,
+        "forms": features.forms,
+        "page_type": classify_page_type(url, page_features),
+        "features": page_features,
+        "screenshot_url": "",
+        "rendered_by": "static",
+        "etag": resp.headers.get("etag"),
+        "last_modified": resp.headers.get("last-modified"),
+    }
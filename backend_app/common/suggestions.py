@@ -0,0 +1,99 @@
+# filepath: backend_app/common/suggestions.py
+"""
+Keyset-paginated listing of a workspace's suggestions.
+
+Pages are ordered by (created_at, id) and continue from an opaque cursor
+holding the last row's key rather than an OFFSET, so every page costs the
+same however deep it is. Each equality filter has a matching
+(workspace_id, <filter>, created_at, id) index; impact and effort go
+through the GIN index on payload with containment.
+"""
+from __future__ import annotations
+import base64
+import json
+import os
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import literal_column, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from backend_app.db_models import DBSuggestion
+
+SUGGESTIONS_PAGE_SIZE = int(os.getenv("SUGGESTIONS_PAGE_SIZE", "50"))
+SUGGESTIONS_MAX_PAGE_SIZE = int(os.getenv("SUGGESTIONS_MAX_PAGE_SIZE", "200"))
+
+# Spelled exactly like the index expressions: a bound parameter in place of
+# the key would stop the planner matching them.
+PRIORITY = literal_column("(suggestions.payload ->> 'priority')")
+CATEGORY = literal_column("(suggestions.payload ->> 'category')")
+
+
+def encode_cursor(created_at: datetime, suggestion_id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(suggestion_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Raises ValueError for anything encode_cursor did not produce."""
+    try:
+        created_at, suggestion_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), UUID(suggestion_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+def suggestion_out(row: DBSuggestion) -> dict:
+    return {
+        **row.payload,
+        "id": str(row.id),
+        "uniqueKey": row.unique_key,
+        "title": row.title,
+        "source": row.source,
+        "state": row.state.value,
+        "createdAt": row.created_at.isoformat(),
+        "updatedAt": row.updated_at.isoformat(),
+    }
+
+
+def list_suggestions(
+    session: Session,
+    workspace_id: UUID,
+    *,
+    states: list | None = None,
+    sources: list[str] | None = None,
+    priorities: list[str] | None = None,
+    categories: list[str] | None = None,
+    impacts: list[str] | None = None,
+    efforts: list[str] | None = None,
+    cursor: str | None = None,
+    limit: int = SUGGESTIONS_PAGE_SIZE,
+    order: str = "desc",
+) -> dict:
+    """
+    One page of suggestions, newest first unless order="asc". Within a
+    filter, values are ORed; filters are ANDed. Returns the items and the
+    cursor for the next page, None on the last one.
+    """
+    s = DBSuggestion
+    stmt = select(s).where(s.workspace_id == workspace_id)
+    for column, values in ((s.state, states), (s.source, sources), (PRIORITY, priorities), (CATEGORY, categories)):
+        if values:
+            stmt = stmt.where(column.in_(values))
+    for field, values in (("impact", impacts), ("effort", efforts)):
+        if values:
+            stmt = stmt.where(or_(*(s.payload.contains({field: value}) for value in values)))
+
+    key = tuple_(s.created_at, s.id)
+    if cursor:
+        after = tuple_(*decode_cursor(cursor))
+        stmt = stmt.where(key < after if order == "desc" else key > after)
+    if order == "desc":
+        stmt = stmt.order_by(s.created_at.desc(), s.id.desc())
+    else:
+        stmt = stmt.order_by(s.created_at, s.id)
+
+    rows = session.scalars(stmt.limit(limit + 1)).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return {"items": [suggestion_out(row) for row in page], "nextCursor": next_cursor}
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Enum, text, UniqueConstraint
+from sqlalchemy import BigInteger, String, Enum, Index, text, UniqueConstraint
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
 import enum
@@ -18,7 +18,7 @@ class SuggestionState(str, enum.Enum):
 class DBSuggestion(Base):
     __tablename__ = "suggestions"
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     unique_key: Mapped[str] = mapped_column(String(255), nullable=False)
     source: Mapped[str | None] = mapped_column(String(64), nullable=True)
     title: Mapped[str | None] = mapped_column(String(512), nullable=True)
@@ -26,22 +26,67 @@ class DBSuggestion(Base):
     state: Mapped[SuggestionState] = mapped_column(Enum(SuggestionState, name="suggestion_state"), nullable=False, default=SuggestionState.NEW)
     created_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
     updated_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
-    __table_args__ = (UniqueConstraint("workspace_id", "unique_key", name="uq_suggestions_workspace_uniquekey"),)
+    __table_args__ = (
+        UniqueConstraint("workspace_id", "unique_key", name="uq_suggestions_workspace_uniquekey"),
+        # Keyset pagination on (created_at, id) within a workspace, optionally
+        # narrowed by one filter column (see common/suggestions.py).
+        Index("ix_suggestions_workspace_created", "workspace_id", "created_at", "id"),
+        Index("ix_suggestions_workspace_state_created", "workspace_id", "state", "created_at", "id"),
+        Index("ix_suggestions_workspace_source_created", "workspace_id", "source", "created_at", "id"),
+        Index("ix_suggestions_workspace_priority_created", "workspace_id", text("(payload ->> 'priority')"), "created_at", "id"),
+        Index("ix_suggestions_workspace_category_created", "workspace_id", text("(payload ->> 'category')"), "created_at", "id"),
+        # Containment (@>) filters on any other payload field.
+        Index("ix_suggestions_payload", "payload", postgresql_using="gin", postgresql_ops={"payload": "jsonb_path_ops"}),
+    )
 
 class DBCampaignMetric(Base):
+    """
+    Range-partitioned by month on ts (see common/partitions.py); the primary
+    key and unique constraint include ts as Postgres requires. ts is indexed
+    with BRIN, which stays tiny because rows arrive roughly in time order.
+    """
     __tablename__ = "campaign_metrics"
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     source: Mapped[str] = mapped_column(String(64), nullable=False)
-    ts = mapped_column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    ts = mapped_column(TIMESTAMP(timezone=True), nullable=False, primary_key=True)
     metric: Mapped[str] = mapped_column(String(128), nullable=False)
     value: Mapped[float]
     metadata = mapped_column(JSONB, nullable=True)
     created_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
     updated_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
-    __table_args__ = (UniqueConstraint("workspace_id","source","ts","metric", name="uq_campaign_metrics_unique"),)
+    __table_args__ = (
+        UniqueConstraint("workspace_id","source","ts","metric", name="uq_campaign_metrics_unique"),
+        Index("ix_campaign_metrics_ts_brin", "ts", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (ts)"},
+    )
+
+class _MetricRollup:
+    """
+    Columns shared by the rollup tables: one row per (workspace, source,
+    metric, bucket) with sum/count/min/max and the latest value in the
+    bucket. Maintained by common/rollups.py from the ingest path.
+    """
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    source: Mapped[str] = mapped_column(String(64), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(128), primary_key=True)
+    bucket = mapped_column(TIMESTAMP(timezone=True), primary_key=True)
+    value_sum: Mapped[float]
+    value_count: Mapped[int] = mapped_column(BigInteger)
+    value_min: Mapped[float]
+    value_max: Mapped[float]
+    last_value: Mapped[float]
+    last_ts = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+
+class DBCampaignMetricHourly(_MetricRollup, Base):
+    __tablename__ = "campaign_metrics_hourly"
+
+class DBCampaignMetricDaily(_MetricRollup, Base):
+    __tablename__ = "campaign_metrics_daily"
 
 class JobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
     ACK = "ACK"
     DONE = "DONE"
     FAIL = "FAIL"
@@ -55,3 +100,55 @@ class DBJobLog(Base):
     message: Mapped[str | None] = mapped_column(String(2000), nullable=True)
     meta = mapped_column(JSONB, nullable=True)
     created_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+
+class DBJobStatusCurrent(Base):
+    """
+    Latest event per job, upserted with every job_logs insert (see
+    common/job_events.py) so a status lookup is a primary-key read rather
+    than a sort over the job's log. An older event never overwrites a newer one.
+    """
+    __tablename__ = "job_status_current"
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    job_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus, name="job_status"), nullable=False)
+    message: Mapped[str | None] = mapped_column(String(2000), nullable=True)
+    meta = mapped_column(JSONB, nullable=True)
+    log_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    event_at = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+
+class DBAuditJob(Base):
+    """
+    Queue of audits (crawl, then suggest) run by the common/audit_queue.py
+    workers. status goes QUEUED -> ACK (claimed; visible_at is then the
+    lease expiry) -> DONE or FAIL, and back to QUEUED for a retry. Every
+    transition is also a job_logs event with job_id = str(id).
+    """
+    __tablename__ = "audit_jobs"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    shop: Mapped[str] = mapped_column(String(255), nullable=False)
+    payload = mapped_column(JSONB, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus, name="job_status"), nullable=False, default=JobStatus.QUEUED)
+    stage: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(nullable=False)
+    visible_at = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    worker: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    result = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(String(2000), nullable=True)
+    created_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+    updated_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+    finished_at = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    __table_args__ = (
+        # Only claimable rows are indexed, so the index stays small however many audits finish.
+        Index("ix_audit_jobs_claimable", "visible_at", postgresql_where=text("status IN ('QUEUED', 'ACK')")),
+    )
+
+class DBShopToken(Base):
+    """Shop access tokens pushed by the Remix app, for services/shop_data.py when SHOP_TOKEN_SOURCE=postgres."""
+    __tablename__ = "shop_tokens"
+    shop_domain: Mapped[str] = mapped_column(String(255), primary_key=True)
+    access_token: Mapped[str] = mapped_column(String(512), nullable=False)
+    created_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+    updated_at = mapped_column(TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
@@ -1,49 +1,284 @@
 import os
+import json
 import time
+import random
+import asyncio
 import logging
-from typing import List
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import AsyncIterator, List
+import httpx
 import openai
+from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
+from pydantic import BaseModel, ValidationError
+from backend_app.common.distill import distill_html, DISTILL_TOKEN_BUDGET
+from backend_app.common.models import SuggestResponse, SuggestionOut
+from backend_app.common.llm_cache import llm_cache
+from backend_app.common.json_stream import SuggestionStreamParser
+from backend_app.common.metrics import llm_request_duration, llm_retries, llm_tokens, rule_audits
+from backend_app.common.rules import RULES_ENABLED, RuleReport, pre_audit
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
-
-# Set up OpenAI client using environment variable
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
 
 # Logger setup
 logger = logging.getLogger(__name__)
 
-def call_gpt(messages: List[ChatCompletionMessageParam], model="gpt-3.5-turbo", temperature=0.7, retries=3) -> str:
-    for attempt in range(retries):
+# Errors worth another attempt; anything else (bad request, auth) fails fast.
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+    ValueError,
+)
+
+class LLMResponse(BaseModel):
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: int = 1
+
+def _retry_after(error: Exception) -> float | None:
+    """Seconds the server asked us to wait (Retry-After / retry-after-ms), if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
         try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+def backoff_delay(attempt: int, error: Exception | None = None, base: float = LLM_BACKOFF_BASE, cap: float = LLM_BACKOFF_MAX) -> float:
+    """Full-jitter exponential backoff, overridden by an explicit Retry-After."""
+    retry_after = _retry_after(error) if error is not None else None
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class LLMClient:
+    """
+    Async chat-completions client shared by every route and worker.
+
+    One AsyncOpenAI instance (and so one HTTP connection pool) is reused for
+    all calls, a semaphore caps in-flight requests, and retries back off
+    with asyncio.sleep so no thread is held while waiting. The semaphore is
+    released during backoff so a retrying call does not block others.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        timeout: float = LLM_TIMEOUT,
+        retries: int = LLM_MAX_RETRIES,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self._http_client = http_client
+        self._client: AsyncOpenAI | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+                base_url=self.base_url or os.getenv("OPENAI_BASE_URL"),
+                max_retries=0,  # retries are handled here, with jitter
+                http_client=self._http_client or httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                ),
             )
-            content = response.choices[0].message.content
-            if not content:
-                raise ValueError("No content returned from GPT")
-            return content
-        except Exception as e:
-            logger.warning(f"GPT call failed on attempt {attempt + 1}: {repr(e)}")
-            time.sleep(2 * (attempt + 1))
-    raise RuntimeError("GPT call failed after retries.")
-
-def build_prompt(html: str, goal: str) -> List[ChatCompletionMessageParam]:
-    instructions_by_goal = {
-        "increase add to cart": "Suggest changes that would encourage more users to add products to their cart.",
-        "boost email signups": "Suggest changes that would make users more likely to sign up for email newsletters.",
-        "drive product views": "Suggest changes that help users discover and explore products more easily.",
-        "improve trust / social proof": "Suggest changes that build trust and credibility, such as trust badges, reviews, or testimonials."
-    }
-
-    instructions = instructions_by_goal.get(goal.lower(), "Suggest general improvements to increase user conversion.")
-
-    return [
+        return self._client
+
+    async def complete(
+        self,
+        messages: List[ChatCompletionMessageParam],
+        model: str = OPENAI_MODEL,
+        temperature: float = 0.7,
+        retries: int | None = None,
+        timeout: float | None = None,
+        **kwargs,
+    ) -> LLMResponse:
+        retries = self.retries if retries is None else retries
+        timeout = self.timeout if timeout is None else timeout
+        last_error: Exception | None = None
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            for attempt in range(retries):
+                try:
+                    async with self._semaphore:
+                        response = await asyncio.wait_for(
+                            self.client.chat.completions.create(
+                                model=model,
+                                messages=messages,
+                                temperature=temperature,
+                                timeout=timeout,
+                                **kwargs,
+                            ),
+                            timeout=timeout,
+                        )
+                    content = response.choices[0].message.content
+                    if not content:
+                        raise ValueError("No content returned from GPT")
+                    usage = response.usage
+                    result = LLMResponse(
+                        content=content,
+                        model=response.model or model,
+                        prompt_tokens=usage.prompt_tokens if usage else 0,
+                        completion_tokens=usage.completion_tokens if usage else 0,
+                        attempts=attempt + 1,
+                    )
+                    _count_tokens(model, result.prompt_tokens, result.completion_tokens)
+                    outcome = "ok"
+                    return result
+                except RETRYABLE_ERRORS as e:
+                    logger.warning(f"GPT call failed on attempt {attempt + 1}: {repr(e)}")
+                    if attempt + 1 < retries:
+                        llm_retries.labels(model=model).inc()
+                        await asyncio.sleep(backoff_delay(attempt, e))
+                    last_error = e
+            raise RuntimeError("GPT call failed after retries.") from last_error
+        finally:
+            llm_request_duration.labels(model=model, mode="complete", outcome=outcome).observe(time.perf_counter() - start)
+
+    async def stream(
+        self,
+        messages: List[ChatCompletionMessageParam],
+        model: str = OPENAI_MODEL,
+        temperature: float = 0.7,
+        retries: int | None = None,
+        timeout: float | None = None,
+        usage: dict | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield content deltas from a streamed completion. Opening the stream is
+        retried like complete(); once tokens flow, errors propagate. Token
+        counts are written into `usage` when the server reports them.
+        """
+        retries = self.retries if retries is None else retries
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        outcome = "error"
+        seen: dict = {}
+        try:
+            async for delta in self._stream(messages, model, temperature, retries, timeout, seen):
+                yield delta
+            outcome = "ok"
+        finally:
+            llm_request_duration.labels(model=model, mode="stream", outcome=outcome).observe(time.perf_counter() - start)
+            _count_tokens(model, seen.get("prompt_tokens", 0), seen.get("completion_tokens", 0))
+            if usage is not None:
+                usage.update(seen)
+
+    async def _stream(self, messages, model, temperature, retries, timeout, usage: dict) -> AsyncIterator[str]:
+        # A slot per attempt, as in complete(): it is given back before the
+        # backoff sleep, then held from a successful open until the stream ends.
+        for attempt in range(retries):
+            await self._semaphore.acquire()
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        timeout=timeout,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    ),
+                    timeout=timeout,
+                )
+                break
+            except RETRYABLE_ERRORS as e:
+                self._semaphore.release()
+                logger.warning(f"GPT stream failed to open on attempt {attempt + 1}: {repr(e)}")
+                if attempt + 1 >= retries:
+                    raise RuntimeError("GPT call failed after retries.") from e
+                llm_retries.labels(model=model).inc()
+                await asyncio.sleep(backoff_delay(attempt, e))
+            except BaseException:
+                self._semaphore.release()
+                raise
+        else:
+            raise RuntimeError("GPT call failed after retries.")
+
+        try:
+            async with response:
+                async for chunk in response:
+                    if chunk.usage is not None:
+                        usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                        usage["completion_tokens"] = chunk.usage.completion_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        finally:
+            self._semaphore.release()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+def _count_tokens(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    if prompt_tokens:
+        llm_tokens.labels(model=model, kind="prompt").inc(prompt_tokens)
+    if completion_tokens:
+        llm_tokens.labels(model=model, kind="completion").inc(completion_tokens)
+
+llm_client = LLMClient()
+
+async def call_gpt(messages: List[ChatCompletionMessageParam], model=OPENAI_MODEL, temperature=0.7, retries=LLM_MAX_RETRIES) -> str:
+    response = await llm_client.complete(messages, model=model, temperature=temperature, retries=retries)
+    return response.content
+
+# Goals the frontend offers; common/rules.py keys RULES_BY_GOAL the same way.
+INSTRUCTIONS_BY_GOAL = {
+    "increase add to cart": "Suggest changes that would encourage more users to add products to their cart.",
+    "boost email signups": "Suggest changes that would make users more likely to sign up for email newsletters.",
+    "drive product views": "Suggest changes that help users discover and explore products more easily.",
+    "improve trust / social proof": "Suggest changes that build trust and credibility, such as trust badges, reviews, or testimonials."
+}
+
+def build_prompt(html: str, goal: str, token_budget: int = DISTILL_TOKEN_BUDGET, known: list[SuggestionOut] | None = None) -> List[ChatCompletionMessageParam]:
+    instructions = INSTRUCTIONS_BY_GOAL.get(goal.lower(), "Suggest general improvements to increase user conversion.")
+
+    page = distill_html(html, token_budget=token_budget)
+    logger.info(
+        f"🧪 Distilled page {page.original_chars} -> {page.distilled_chars} chars "
+        f"(~{page.tokens} tokens, {page.compression_ratio}x, {page.collapsed_blocks} repeated blocks collapsed)"
+    )
+
+    messages: List[ChatCompletionMessageParam] = [
         {"role": "system", "content": f"You are a CRO expert. {instructions}"},
-        {"role": "user", "content": f"Here is the HTML of the page:\n{html[:5000]}"},
+        {"role": "user", "content": (
+            "Here is a distilled outline of the page: headings (#), links and buttons, "
+            "forms and inputs, and visible text, with repeated blocks collapsed:\n"
+            f"{page.text}"
+        )},
         {"role": "system", "content": (
             "ONLY respond in valid JSON. Do not use markdown or commentary. "
             "Wrap your response like this:\n"
@@ -53,3 +288,142 @@ def build_prompt(html: str, goal: str) -> List[ChatCompletionMessageParam]:
             "Fill in realistic suggestion values for the page above."
         )}
     ]
+    if known:
+        # Findings the rule pre-audit already made; the model adds to them.
+        listed = "\n".join(f"- {item.text} ({item.target})" for item in known)
+        messages.append({"role": "system", "content": f"These issues are already reported; do not repeat them:\n{listed}"})
+    return messages
+
+def run_rules(page: dict | None, goal: str) -> RuleReport | None:
+    """The rule pre-audit for a crawled page (PageData-shaped dict), or None without one."""
+    if page is None or not RULES_ENABLED:
+        return None
+    report = pre_audit(page, goal)
+    rule_audits.labels(outcome="llm" if report.needs_llm else "rules_only").inc()
+    logger.info(f"🧮 Rule pre-audit fired {len(report.fired)} checks; model {'needed' if report.needs_llm else 'skipped'} ({report.reason})")
+    return report
+
+def parse_suggestions(content: str) -> dict:
+    """Parse the model's {"rationale", "suggestions"} JSON, tolerating code fences."""
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    data = json.loads(text)
+    return SuggestResponse(**data).model_dump()
+
+def _suggestion_cache_key(messages: List[ChatCompletionMessageParam], goal: str, model: str, temperature: float) -> str:
+    return llm_cache.make_key(model=model, temperature=temperature, goal=goal.lower(), messages=messages)
+
+async def generate_suggestions(html: str, goal: str, model: str = OPENAI_MODEL, temperature: float = 0.7, bypass_cache: bool = False, page: dict | None = None) -> dict:
+    """
+    Suggestions for a page and goal. Identical prompts (same model,
+    temperature, goal and distilled page) are answered from llm_cache.
+    With the crawled page, the rule pre-audit runs first: its findings lead
+    the list, and the model is not called at all when they are enough.
+    """
+    report = run_rules(page, goal)
+    if report is not None and not report.needs_llm:
+        return {"rationale": report.rationale, "suggestions": [item.model_dump() for item in report.suggestions]}
+    known = report.suggestions if report else None
+    messages = build_prompt(html, goal, known=known)
+    key = _suggestion_cache_key(messages, goal, model, temperature)
+
+    async def compute() -> dict:
+        response = await llm_client.complete(messages, model=model, temperature=temperature)
+        parse_suggestions(response.content)  # never cache an unparseable answer
+        return response.model_dump()
+
+    response = await llm_cache.get_or_compute(key, compute, bypass=bypass_cache)
+    result = parse_suggestions(response["content"])
+    if known:
+        result["suggestions"] = [item.model_dump() for item in known] + result["suggestions"]
+    return result
+
+async def stream_suggestions(html: str, goal: str, model: str = OPENAI_MODEL, temperature: float = 0.7, bypass_cache: bool = False, page: dict | None = None) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Yield ("rationale", {...}), then one ("suggestion", {...}) per item as soon
+    as its JSON object closes in the model stream, then ("done", {...}).
+    Cache hits are replayed; concurrent identical requests share one model
+    stream, and a completed stream is stored in llm_cache so the
+    non-streaming route benefits too. Rule pre-audit findings (with the
+    crawled page) follow the rationale ahead of the model's, as in
+    generate_suggestions.
+    """
+    report = run_rules(page, goal)
+    if report is not None and not report.needs_llm:
+        yield "rationale", {"rationale": report.rationale}
+        for item in report.suggestions:
+            yield "suggestion", item.model_dump()
+        yield "done", {"count": len(report.suggestions), "cached": False, "rules_only": True}
+        return
+    known = report.suggestions if report else []
+    async for event, data in _model_suggestions(html, goal, model, temperature, bypass_cache, known):
+        if event == "done":
+            data = {**data, "count": data["count"] + len(known)}
+        yield event, data
+        if event == "rationale":
+            for item in known:
+                yield "suggestion", item.model_dump()
+
+async def _model_suggestions(html: str, goal: str, model: str, temperature: float, bypass_cache: bool, known: list[SuggestionOut]) -> AsyncIterator[tuple[str, dict]]:
+    messages = build_prompt(html, goal, known=known)
+    key = _suggestion_cache_key(messages, goal, model, temperature)
+
+    cached = None if bypass_cache else await llm_cache.lookup(key)
+    if cached is not None:
+        result = parse_suggestions(cached["content"])
+        yield "rationale", {"rationale": result["rationale"]}
+        for item in result["suggestions"]:
+            yield "suggestion", item
+        yield "done", {"count": len(result["suggestions"]), "cached": True}
+        return
+
+    if bypass_cache:
+        events = _stream_from_model(messages, key, model, temperature)
+    else:
+        events = llm_cache.flight.stream(key, lambda: _stream_from_model(messages, key, model, temperature))
+    async for event in events:
+        yield event
+
+async def _stream_from_model(messages: List[ChatCompletionMessageParam], key: str, model: str, temperature: float) -> AsyncIterator[tuple[str, dict]]:
+    parser = SuggestionStreamParser()
+    usage: dict = {}
+    parts: list[str] = []
+    held: list[dict] = []  # suggestions that closed before the rationale
+    rationale_sent = False
+    count = 0
+
+    async for delta in llm_client.stream(messages, model=model, temperature=temperature, usage=usage):
+        parts.append(delta)
+        for kind, value in parser.feed(delta):
+            if kind == "rationale" and not rationale_sent:
+                rationale_sent = True
+                yield "rationale", {"rationale": value}
+                for item in held:
+                    yield "suggestion", item
+                held.clear()
+            elif kind == "suggestion":
+                try:
+                    item = SuggestionOut(**value).model_dump()
+                except ValidationError as e:
+                    logger.warning(f"Skipping malformed streamed suggestion: {e}")
+                    continue
+                count += 1
+                if rationale_sent:
+                    yield "suggestion", item
+                else:
+                    held.append(item)
+
+    if not rationale_sent:
+        yield "rationale", {"rationale": ""}
+        for item in held:
+            yield "suggestion", item
+
+    content = "".join(parts)
+    try:
+        parse_suggestions(content)
+        await llm_cache.set(key, LLMResponse(content=content, model=model, **usage).model_dump())
+    except (ValueError, ValidationError):
+        logger.warning("Streamed answer was not valid JSON; not caching it")
+    yield "done", {"count": count, "cached": False, **usage}
@@ -1,14 +1,48 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend_app.routes import service  # ✅ stable
+from backend_app.common.audit_queue import AUDIT_WORKERS
+from backend_app.common.browser_pool import browser_pool
+from backend_app.common.http_client import close_http_client
+from backend_app.common.job_events import JOB_EVENTS_BUFFERED, job_event_buffer
+from backend_app.common.metrics import MetricsMiddleware, render_metrics
+from backend_app.common.screenshots import screenshot_service
+from backend_app.db import async_engine
+from backend_app.gpt import llm_client
+from backend_app.routes import service, crawl, suggest, audits, artifacts, screenshots  # ✅ stable
 # (Leave the others commented until fixed)
-# from backend_app.routes import crawl, debug_suggest, test_gpt, plan
+# from backend_app.routes import debug_suggest, test_gpt, plan
+
+# Serve the /v1 import, upsert and job routes from the async engine; set to 0
+# to fall back to the threadpool-bound sync handlers.
+SERVICE_ASYNC_DB = os.getenv("SERVICE_ASYNC_DB", "1") == "1"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await browser_pool.start()
+    if JOB_EVENTS_BUFFERED:
+        await job_event_buffer.start()
+    if AUDIT_WORKERS > 0:  # AUDIT_WORKERS=0 leaves /audits to backend_app.worker processes
+        await audits.audit_workers.start()
+    try:
+        yield
+    finally:
+        await audits.audit_workers.stop()  # unfinished audits go back to the queue
+        await job_event_buffer.stop()  # drains what is still buffered
+        await screenshot_service.stop()  # before the browsers it captures on
+        await browser_pool.stop()
+        await close_http_client()
+        await llm_client.aclose()
+        await async_engine.dispose()
 
 app = FastAPI(
     title="AuditAI Insight Engine",
     version="1.0.0",
     description="Backend API for CRO suggestion and crawling",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -25,13 +59,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+if SERVICE_ASYNC_DB:
+    app.include_router(service.async_router)  # first, so it shadows the sync twins
 app.include_router(service.router)
-# app.include_router(crawl.router)
+app.include_router(crawl.router)
+app.include_router(suggest.router)
+app.include_router(audits.router)
+app.include_router(artifacts.router)
+app.include_router(screenshots.router)
 # app.include_router(debug_suggest.router)
 # app.include_router(test_gpt.router)
 # app.include_router(plan.router)
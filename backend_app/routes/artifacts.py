@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, Response
+from backend_app.common.artifacts import ArtifactNotFound, artifact_store
+import asyncio
+import logging
+import re
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """[start, stop) for a single "bytes=a-b", "bytes=a-" or "bytes=-n" range; None if unsatisfiable."""
+    match = BYTE_RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, stop = max(0, size - int(last)), size
+    else:
+        start, stop = int(first), min(size, int(last) + 1) if last else size
+    return (start, stop) if start < stop else None
+
+@router.get("/artifacts/stats")
+async def artifact_stats():
+    return artifact_store.stats()
+
+@router.get("/artifacts/{artifact_id}")
+async def get_artifact(
+    artifact_id: str,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+    range_header: str | None = Header(None, alias="Range"),
+):
+    """
+    The stored HTML for a crawl artifact handle, for clients that want the
+    page after all. Supports a single byte Range (206), decompressing only
+    the chunks it covers.
+    """
+    try:
+        ref = await asyncio.to_thread(artifact_store.ref, artifact_id)
+        headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=86400, immutable"}
+        if range_header is None:
+            body = await asyncio.to_thread(artifact_store.read_bytes, artifact_id)
+            return Response(body, media_type=ref.content_type, headers=headers)
+        span = parse_range(range_header, ref.size)
+        if span is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{ref.size}"})
+        start, stop = span
+        body = await asyncio.to_thread(artifact_store.read_bytes, artifact_id, start, stop - start)
+        return Response(
+            body,
+            status_code=206,
+            media_type=ref.content_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{stop - 1}/{ref.size}"},
+        )
+    except ArtifactNotFound:
+        return JSONResponse(status_code=404, content={"error": "Unknown or expired artifact"})
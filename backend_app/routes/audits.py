@@ -0,0 +1,134 @@
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import uuid
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend_app.common.audit_queue import AuditWorkerPool, enqueue_audit
+from backend_app.common.models import AuditRequest
+from backend_app.db import get_async_session
+from backend_app.db_models import DBAuditJob, JobStatus
+from backend_app.gpt import generate_suggestions
+from backend_app.routes.crawl import crawl_url, is_valid_url
+from backend_app.routes.suggest import _sse
+
+router = APIRouter(tags=["Audits"])
+logger = logging.getLogger(__name__)
+
+AUDIT_EVENTS_POLL_INTERVAL = float(os.getenv("AUDIT_EVENTS_POLL_INTERVAL", "0.5"))
+
+
+async def run_audit(payload: dict, stage) -> dict:
+    """Crawl the page, then ask for suggestions (rule pre-audit and distillation happen inside generate_suggestions)."""
+    await stage("crawl")
+    page = await crawl_url(payload["url"], payload.get("mode", "auto"))
+    await stage("suggest")
+    result = await generate_suggestions(page["html"], payload["goal"], bypass_cache=payload.get("bypass_cache", False), page=page)
+    return {"url": page["url"], "title": page.get("title"), "page_type": page.get("page_type"), "artifact": page.get("artifact"), **result}
+
+
+audit_workers = AuditWorkerPool(run_audit)
+
+
+def _workspace(x_workspace_id: str | None, shop: str) -> uuid.UUID:
+    if not x_workspace_id:
+        return uuid.uuid5(uuid.NAMESPACE_DNS, shop)
+    try:
+        return uuid.UUID(x_workspace_id)
+    except ValueError:
+        raise HTTPException(400, "X-Workspace-ID must be a UUID")
+
+
+def audit_out(job: DBAuditJob) -> dict:
+    return {
+        "jobId": str(job.id),
+        "status": job.status.value,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "maxAttempts": job.max_attempts,
+        "url": job.payload.get("url"),
+        "goal": job.payload.get("goal"),
+        "result": job.result,
+        "error": job.error,
+        "createdAt": job.created_at.isoformat() if job.created_at else None,
+        "updatedAt": job.updated_at.isoformat() if job.updated_at else None,
+        "finishedAt": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+async def _load(session, job_id: uuid.UUID, shop: str) -> DBAuditJob:
+    job = await session.get(DBAuditJob, job_id, populate_existing=True)
+    if job is None or job.shop != shop:
+        raise HTTPException(404, "Audit not found")
+    return job
+
+
+@router.post("/audits", status_code=status.HTTP_202_ACCEPTED)
+async def submit_audit(
+    body: AuditRequest,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+    session = Depends(get_async_session),
+):
+    """Queue a crawl + suggest audit and answer at once with its job id."""
+    if not is_valid_url(body.url):
+        return JSONResponse(status_code=400, content={"error": "Invalid URL"})
+    ws = _workspace(x_workspace_id, x_shop_domain)
+    job = await session.run_sync(enqueue_audit, ws, x_shop_domain, body.model_dump())
+    await session.commit()
+    audit_workers.wake()
+    logger.info(f"📥 Queued audit {job.id} for shop: {x_shop_domain} | URL: {body.url}")
+    return {
+        "jobId": str(job.id),
+        "status": JobStatus.QUEUED.value,
+        "statusUrl": f"/audits/{job.id}",
+        "eventsUrl": f"/audits/{job.id}/events",
+    }
+
+
+@router.get("/audits/{job_id}")
+async def audit_status(
+    job_id: uuid.UUID,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+    session = Depends(get_async_session),
+):
+    return audit_out(await _load(session, job_id, x_shop_domain))
+
+
+@router.get("/audits/{job_id}/events")
+async def audit_events(
+    job_id: uuid.UUID,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+):
+    """
+    The audit as server-sent events: a "status" event whenever its status,
+    stage or attempt changes, then "result" or "error" and the stream ends.
+    """
+    # A fresh short session per poll: the stream may stay open for minutes
+    # and must not pin a pooled connection meanwhile.
+    async def poll() -> DBAuditJob:
+        async with audit_workers.session_factory() as session:
+            return await _load(session, job_id, x_shop_domain)
+
+    first = await poll()  # 404 before the stream starts
+
+    async def events():
+        job, last = first, None
+        while True:
+            seen = (job.status, job.stage, job.attempts)
+            if seen != last:
+                last = seen
+                yield _sse("status", {"status": job.status.value, "stage": job.stage, "attempts": job.attempts})
+            if job.status == JobStatus.DONE:
+                yield _sse("result", job.result or {})
+                return
+            if job.status == JobStatus.FAIL:
+                yield _sse("error", {"error": job.error})
+                return
+            await asyncio.sleep(AUDIT_EVENTS_POLL_INTERVAL)
+            job = await poll()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
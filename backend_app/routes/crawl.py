@@ -1,27 +1,132 @@
 from fastapi import APIRouter, Request, Header
-from fastapi.responses import JSONResponse
-from backend_app.common.models import CrawlRequest, PageData
-from backend_app.common.scraper import scrape_page
+from fastapi.responses import JSONResponse, StreamingResponse
+from backend_app.common.models import CrawlRequest, CrawlBatchRequest, PageData
+from backend_app.common.scraper import fetch_page
+from backend_app.common.crawl_cache import crawl_cache, normalize_url
+from backend_app.common.artifacts import artifact_store
+from backend_app.common.models import ScreenshotSet
+from backend_app.common.screenshots import absolute_url, screenshot_service
 from urllib.parse import urlparse
+from collections import defaultdict
+import asyncio
+import json
 import logging
+import os
 import traceback
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+CRAWL_BATCH_MAX_URLS = int(os.getenv("CRAWL_BATCH_MAX_URLS", "100"))
+CRAWL_BATCH_CONCURRENCY = int(os.getenv("CRAWL_BATCH_CONCURRENCY", "8"))
+CRAWL_BATCH_PER_HOST = int(os.getenv("CRAWL_BATCH_PER_HOST", "2"))
+
 def is_valid_url(url: str) -> bool:
     parsed = urlparse(url)
     return all([parsed.scheme, parsed.netloc])
 
+async def crawl_url(url: str, mode: str = "auto") -> dict:
+    """
+    Crawl one URL through the result cache; returns a PageData-shaped dict
+    whose "artifact" is the handle of the stored HTML.
+    """
+    cache_key = normalize_url(url)
+    if mode != "auto":
+        cache_key = f"{mode}:{cache_key}"
+    cached = await crawl_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"⚡ Crawl cache hit: {cache_key}")
+        await keep_artifact(cache_key, cached)
+        if cached.get("artifact") and screenshots_stale(cached):
+            # Dropped (queue full), failed, or cancelled at shutdown: try again.
+            shots = schedule_screenshots(url, cache_key, cached)
+            if shots is not None:
+                await crawl_cache.update(cache_key, **screenshot_fields(shots))
+        return cached
+
+    async def crawl() -> dict:
+        result = await fetch_page(url, mode)
+        pngs = result.pop("screenshot_pngs", None)
+        try:
+            result["artifact"] = (await artifact_store.put_text(result["html"])).model_dump()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store the crawl artifact for {url}: {e}")
+        if result.get("artifact"):
+            schedule_screenshots(url, cache_key, result, pngs)
+        etag = result.pop("etag", None)
+        last_modified = result.pop("last_modified", None)
+        await crawl_cache.set(cache_key, result, etag=etag, last_modified=last_modified)
+        return result
+
+    # Concurrent misses for the same page (two dashboard tabs, proxy retries)
+    # share one fetch and its result or error.
+    result, shared = await crawl_cache.flight.do(cache_key, crawl)
+    if shared:
+        logger.info(f"🔗 Joined in-flight crawl: {cache_key}")
+    return result
+
+def screenshot_fields(shots: ScreenshotSet) -> dict:
+    return {
+        "screenshot_url": shots.above_fold,
+        "screenshot_full_url": shots.full_page,
+        "screenshot_status": shots.status,
+    }
+
+def screenshots_stale(result: dict) -> bool:
+    """True when nothing will fill in this result's screenshots: none, failed, or pending with no capture running."""
+    status = result.get("screenshot_status", "none")
+    if status == "ready":
+        return False
+    return status != "pending" or not screenshot_service.capturing(result["artifact"]["id"])
+
+def schedule_screenshots(url: str, cache_key: str, result: dict, pngs: tuple[bytes, bytes] | None = None) -> ScreenshotSet | None:
+    """
+    Queue screenshot capture without waiting for it. The response goes out
+    with status "pending" (or "ready" when this HTML was captured before);
+    the cached result gets the image URLs once the capture finishes. pngs
+    are the shots scrape_page took; static results are only captured (by a
+    fresh Chromium load) when screenshot_service.capture_static is set.
+    """
+    if pngs is None and result.get("rendered_by") == "static" and not screenshot_service.capture_static:
+        return None
+
+    async def fill(shots: ScreenshotSet) -> None:
+        await crawl_cache.update(cache_key, **screenshot_fields(shots))
+
+    shots = screenshot_service.schedule(url, result["artifact"]["id"], on_done=fill, pngs=pngs)
+    if shots is not None:
+        result.update(screenshot_fields(shots))
+    return shots
+
+async def keep_artifact(cache_key: str, result: dict) -> None:
+    """
+    A cached result can outlive its blob (artifact GC, or a disk crawl cache
+    surviving a wiped ARTIFACT_DIR): touch the blob, or store the cached HTML
+    again so the handle we return resolves.
+    """
+    handle = (result.get("artifact") or {}).get("id")
+    if not handle or not result.get("html"):
+        return
+    try:
+        if await asyncio.to_thread(artifact_store.touch, handle):
+            return
+        ref = await artifact_store.put_text(result["html"])
+        await crawl_cache.update(cache_key, artifact=ref.model_dump())
+        logger.info(f"♻️ Re-stored expired crawl artifact for {cache_key}")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not re-store the crawl artifact for {cache_key}: {e}")
+
+def page_data(result: dict, include_html: bool, base_url: str = "") -> PageData:
+    shots = {name: absolute_url(result.get(name) or "", base_url) for name in ("screenshot_url", "screenshot_full_url")}
+    # Without the HTML only when there is a handle to fetch it by.
+    if include_html or not result.get("artifact"):
+        return PageData(**{**result, **shots})
+    return PageData(**{**result, **shots, "html": None})
+
 @router.post("/crawl", response_model=PageData)
 async def crawl_page(
     request: Request,
-    from backend_app.common.models import ShopSession
-...
-x_shop_domain: str = Header(..., alias="X-Shop-Domain")
-shop_session = ShopSession(shop_domain=x_shop_domain)
-...
-crawl_request.shop = shop_session.shop_domain
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
 ):
     try:
         body = await request.json()
@@ -33,10 +138,10 @@ crawl_request.shop = shop_session.shop_domain
 
         logger.info(f"🔍 Crawling for shop: {crawl_request.shop} | URL: {crawl_request.url}")
 
-        result = scrape_page(crawl_request.url)
+        result = await crawl_url(crawl_request.url, crawl_request.mode)
 
         logger.info(f"✅ Crawl completed for shop: {crawl_request.shop} | URL: {crawl_request.url}")
-        return PageData(**result)
+        return page_data(result, crawl_request.include_html, str(request.base_url))
 
     except Exception as e:
         logger.error(f"❌ Crawl failed for shop {x_shop_domain}: {e}")
@@ -45,3 +150,53 @@ crawl_request.shop = shop_session.shop_domain
             status_code=500,
             content={"error": f"Crawl failed: {str(e)}"}
         )
+
+@router.post("/crawl/batch")
+async def crawl_batch(
+    batch: CrawlBatchRequest,
+    request: Request,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+):
+    """
+    Crawl many URLs concurrently and stream one NDJSON line per URL as soon
+    as it finishes: {"index", "url", "status": "ok", "data": PageData} or
+    {"index", "url", "status": "error", "error": str}. Lines arrive in
+    completion order; use "index" to map back to the request.
+    """
+    if not batch.urls:
+        return JSONResponse(status_code=400, content={"error": "No URLs provided"})
+    if len(batch.urls) > CRAWL_BATCH_MAX_URLS:
+        return JSONResponse(status_code=400, content={"error": f"At most {CRAWL_BATCH_MAX_URLS} URLs per batch"})
+
+    logger.info(f"🔍 Batch crawl for shop: {x_shop_domain} | {len(batch.urls)} URLs")
+
+    global_limit = asyncio.Semaphore(CRAWL_BATCH_CONCURRENCY)
+    host_limits: dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(CRAWL_BATCH_PER_HOST))
+
+    async def crawl_one(index: int, url: str) -> dict:
+        if not is_valid_url(url):
+            return {"index": index, "url": url, "status": "error", "error": "Invalid URL"}
+        try:
+            async with host_limits[urlparse(url).netloc.lower()], global_limit:
+                result = await crawl_url(url, batch.mode)
+            return {"index": index, "url": url, "status": "ok", "data": page_data(result, batch.include_html, str(request.base_url)).model_dump()}
+        except Exception as e:
+            logger.error(f"❌ Batch crawl failed for {url}: {e}")
+            return {"index": index, "url": url, "status": "error", "error": f"Crawl failed: {str(e)}"}
+
+    async def stream():
+        tasks = [asyncio.create_task(crawl_one(i, url)) for i, url in enumerate(batch.urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client went away: stop crawling pages nobody will read.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/crawl/cache/stats")
+async def crawl_cache_stats():
+    return crawl_cache.stats()
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import JSONResponse, Response
+from backend_app.common.artifacts import ArtifactNotFound
+from backend_app.common.screenshots import absolute_url, screenshot_service
+import asyncio
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/screenshots/stats")
+async def screenshot_stats():
+    return screenshot_service.stats()
+
+@router.get("/screenshots/pages/{artifact_id}")
+async def page_screenshots(
+    artifact_id: str,
+    request: Request,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+):
+    """
+    Screenshot status for a crawl, by its artifact id. Poll this while
+    /crawl reported screenshot_status "pending".
+    """
+    shots = screenshot_service.get(artifact_id)
+    if shots is None:
+        return JSONResponse(status_code=404, content={"error": "No screenshots scheduled for this artifact"})
+    base_url = str(request.base_url)
+    return shots.model_copy(update={
+        "above_fold": absolute_url(shots.above_fold, base_url),
+        "full_page": absolute_url(shots.full_page, base_url),
+    })
+
+@router.get("/screenshots/{image_id}")
+async def get_screenshot(image_id: str):
+    # Content-addressed, so the URL is an unguessable capability and the
+    # image never changes; <img> tags can't send X-Shop-Domain.
+    try:
+        body = await asyncio.to_thread(screenshot_service.store.read_bytes, image_id)
+    except ArtifactNotFound:
+        return JSONResponse(status_code=404, content={"error": "Unknown or expired screenshot"})
+    return Response(body, media_type="image/webp", headers={"Cache-Control": "private, max-age=86400, immutable"})
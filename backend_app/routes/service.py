@@ -1,16 +1,35 @@
 from __future__ import annotations
-from uuid import UUID
+import logging
+import time
 from datetime import datetime
-from typing import Dict
-from fastapi import APIRouter, Depends, Header, HTTPException, status
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from uuid import UUID
+from typing import Dict, Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from backend_app.common.models import SuggestionsImport, CampaignMetricsIn
+from backend_app.common.models import SuggestionsImport, CampaignMetricsIn, ShopTokenIn
 from backend_app.common.service_auth import require_service
-from backend_app.db import get_session
-from backend_app.db_models import DBSuggestion, DBCampaignMetric, DBJobLog, JobStatus
+from backend_app.common.metrics import record_ingest
+from backend_app.common.export import (
+    CAMPAIGN_METRICS_SCHEMA, MEDIA_TYPES, SUGGESTIONS_SCHEMA, campaign_metrics_query, export_stream, suggestions_query,
+)
+from backend_app.common.ingest import (
+    METRICS_CHUNK_SIZE, chunked, merge_campaign_metrics, merge_campaign_metrics_async, prepare_partitions, prepare_partitions_async,
+    stream_campaign_metrics, upsert_suggestions,
+)
+from backend_app.common.job_events import job_event, job_event_buffer, write_job_events
+from backend_app.common.rate_limit import ingestion_slot, limit_workspace, metered_body
+from backend_app.common.rollups import query_rollups
+from backend_app.common.suggestions import SUGGESTIONS_MAX_PAGE_SIZE, SUGGESTIONS_PAGE_SIZE, list_suggestions
+from backend_app.services.shop_data import ReadOnlyTokenSource, shop_tokens
+from backend_app.db import SessionLocal, get_async_session, get_session
+from backend_app.db_models import DBJobStatusCurrent, JobStatus, SuggestionState
 
-router = APIRouter(prefix="/v1", tags=["Service"])
+router = APIRouter(prefix="/v1", tags=["Service"], dependencies=[Depends(limit_workspace)])
+# async def twins of the write routes on the async engine. main.py mounts this
+# ahead of router (SERVICE_ASYNC_DB), so its routes answer those paths.
+async_router = APIRouter(prefix="/v1", tags=["Service"], dependencies=[Depends(limit_workspace)])
+logger = logging.getLogger(__name__)
 
 def _parse_ws(x_workspace_id: str | None) -> UUID:
     if not x_workspace_id:
@@ -20,96 +39,156 @@ def _parse_ws(x_workspace_id: str | None) -> UUID:
     except Exception:
         raise HTTPException(400, "X-Workspace-ID must be a UUID")
 
-@router.post("/suggestions/import", dependencies=[Depends(require_service)])
+@router.post("/suggestions/import", dependencies=[Depends(require_service), Depends(ingestion_slot)])
 def import_suggestions(
     payload: SuggestionsImport,
     x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
     session = Depends(get_session),
 ):
     ws = _parse_ws(x_workspace_id)
-    created = updated = 0
-
-    for it in payload.items:
-        unique_key = it.uniqueKey or f"auto:{hash(it.title)}"
-        stmt = pg_insert(DBSuggestion).values(
-            workspace_id=ws,
-            unique_key=unique_key,
-            source=(it.meta or {}).get("source"),
-            title=it.title,
-            payload={
-                "summary": it.summary,
-                "priority": it.priority,
-                "category": it.category,
-                "impact": it.impact,
-                "effort": it.effort,
-                "what": it.what,
-                "why": it.why,
-                "how": it.how,
-                "dataUsed": it.dataUsed,
-                "risks": it.risks,
-                "actions": it.actions,
-                "sources": it.sources,
-                "meta": it.meta,
-            },
-            state="NEW",
-        ).on_conflict_do_update(
-            index_elements=[DBSuggestion.__table__.c.workspace_id, DBSuggestion.__table__.c.unique_key],
-            set_={
-                "title": it.title,
-                "payload": {
-                    "summary": it.summary,
-                    "priority": it.priority,
-                    "category": it.category,
-                    "impact": it.impact,
-                    "effort": it.effort,
-                    "what": it.what,
-                    "why": it.why,
-                    "how": it.how,
-                    "dataUsed": it.dataUsed,
-                    "risks": it.risks,
-                    "actions": it.actions,
-                    "sources": it.sources,
-                    "meta": it.meta,
-                },
-                "updated_at": datetime.utcnow(),
-            },
-        ).returning(DBSuggestion.id, DBSuggestion.created_at, DBSuggestion.updated_at)
-
-        row = session.execute(stmt).one()
-        # If created_at == updated_at we can treat as created; but we set updated_at on every update,
-        # so a simple heuristic:
-        updated += 1  # treat as upsert; counts are informational only
-
-    return {"upserts": len(payload.items)}
-
-@router.post("/data/upsert/campaign_metrics", dependencies=[Depends(require_service)])
+    start = time.perf_counter()
+    counts = upsert_suggestions(session, ws, payload.items)
+    record_ingest("suggestions_import", len(payload.items), time.perf_counter() - start)
+    return {"upserts": len(payload.items), **counts}
+
+@router.get("/suggestions", dependencies=[Depends(require_service)])
+def list_workspace_suggestions(
+    state: list[SuggestionState] | None = Query(None),
+    source: list[str] | None = Query(None),
+    priority: list[Literal["High", "Medium", "Low"]] | None = Query(None),
+    category: list[Literal["Marketing", "Merchandising", "Operations"]] | None = Query(None),
+    impact: list[Literal["Low", "Medium", "High"]] | None = Query(None),
+    effort: list[Literal["Low", "Medium", "High"]] | None = Query(None),
+    cursor: str | None = None,
+    limit: int = Query(SUGGESTIONS_PAGE_SIZE, ge=1, le=SUGGESTIONS_MAX_PAGE_SIZE),
+    order: Literal["asc", "desc"] = "desc",
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+    session = Depends(get_session),
+):
+    """
+    A page of the workspace's suggestions ordered by creation time. Filters
+    may be repeated (values are ORed); pass nextCursor back as cursor, with
+    the same filters and order, for the following page.
+    """
+    ws = _parse_ws(x_workspace_id)
+    try:
+        return list_suggestions(
+            session, ws,
+            states=state, sources=source, priorities=priority, categories=category, impacts=impact, efforts=effort,
+            cursor=cursor, limit=limit, order=order,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@router.post("/data/upsert/campaign_metrics", dependencies=[Depends(require_service), Depends(ingestion_slot)])
 def upsert_campaign_metrics(
     payload: CampaignMetricsIn,
     x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
     session = Depends(get_session),
 ):
     ws = _parse_ws(x_workspace_id)
-    upserts = 0
-    for r in payload.rows:
-        stmt = pg_insert(DBCampaignMetric).values(
-            workspace_id=ws,
-            source=r.source,
-            ts=r.ts,
-            metric=r.metric,
-            value=r.value,
-            metadata=None,
-        ).on_conflict_do_update(
-            index_elements=[
-                DBCampaignMetric.__table__.c.workspace_id,
-                DBCampaignMetric.__table__.c.source,
-                DBCampaignMetric.__table__.c.ts,
-                DBCampaignMetric.__table__.c.metric,
-            ],
-            set_={"value": r.value, "updated_at": datetime.utcnow()},
-        )
-        session.execute(stmt)
-        upserts += 1
-    return {"upserts": upserts}
+    start = time.perf_counter()
+    prepare_partitions(session, payload.rows)
+    totals = {"created": 0, "updated": 0, "duplicates": 0}
+    for chunk in chunked(payload.rows, METRICS_CHUNK_SIZE):
+        for name, count in merge_campaign_metrics(session, ws, chunk).items():
+            totals[name] += count
+    record_ingest("campaign_metrics", len(payload.rows), time.perf_counter() - start)
+    return {"upserts": len(payload.rows), **totals}
+
+@router.post("/data/ingest/campaign_metrics", dependencies=[Depends(require_service), Depends(ingestion_slot)])
+async def ingest_campaign_metrics(
+    request: Request,
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+):
+    """
+    Streaming alternative to /data/upsert/campaign_metrics for large uploads.
+    The body is NDJSON (one CampaignMetricRow per line) or, with
+    Content-Type: text/csv, CSV with a source,ts,metric,value header. It is
+    validated and merged chunk by chunk as it arrives, never held whole; a
+    line over INGEST_MAX_LINE_BYTES is rejected like an invalid row.
+    Returns per-chunk progress plus totals and the rejected rows; on a
+    failure, the chunks already committed are listed with the error.
+    """
+    ws = _parse_ws(x_workspace_id)
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    start = time.perf_counter()
+    chunks = []
+    try:
+        async for update in stream_campaign_metrics(SessionLocal, ws, metered_body(request, x_workspace_id), fmt):
+            if not update.get("done"):
+                chunks.append(update)
+                continue
+            record_ingest("campaign_metrics_stream", update["rows"], time.perf_counter() - start)
+            logger.info(f"📥 Ingested {update['rows']} metric rows for {ws} ({update['rejected']} rejected)")
+            return {**update, "chunks": chunks}
+    except Exception as e:
+        logger.error(f"❌ Metric ingestion failed for {ws}: {e}")
+        return JSONResponse(status_code=500, content={"error": f"Ingestion failed: {str(e)}", "chunks": chunks})
+
+@router.get("/metrics/rollups", dependencies=[Depends(require_service)])
+def campaign_metric_rollups(
+    start: datetime,
+    end: datetime,
+    granularity: Literal["hour", "day"] = "day",
+    source: str | None = None,
+    metric: str | None = None,
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+    session = Depends(get_session),
+):
+    """
+    Hourly or daily sum/count/min/max/avg/last per source and metric for
+    buckets starting in [start, end), read from the rollup tables rather
+    than the raw rows.
+    """
+    ws = _parse_ws(x_workspace_id)
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(400, "start and end must include a timezone")
+    if end <= start:
+        raise HTTPException(400, "end must be after start")
+    return {"granularity": granularity, "buckets": query_rollups(session, ws, granularity, start, end, source, metric)}
+
+def _export_response(name: str, ws: UUID, stmt, schema, fmt: str) -> StreamingResponse:
+    extension = "arrows" if fmt == "arrow" else "parquet"
+    return StreamingResponse(
+        export_stream(SessionLocal, stmt, schema, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}-{ws}.{extension}"'},
+    )
+
+@router.get("/export/campaign_metrics", dependencies=[Depends(require_service)])
+def export_campaign_metrics(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    source: list[str] | None = Query(None),
+    metric: list[str] | None = Query(None),
+    format: Literal["arrow", "parquet"] = "arrow",
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+):
+    """
+    Stream the workspace's raw metric rows with ts in [start, end) as an
+    Arrow IPC stream (pyarrow.ipc.open_stream) or a Parquet file.
+    source and metric may be repeated.
+    """
+    ws = _parse_ws(x_workspace_id)
+    return _export_response("campaign_metrics", ws, campaign_metrics_query(ws, start, end, source, metric), CAMPAIGN_METRICS_SCHEMA, format)
+
+@router.get("/export/suggestions", dependencies=[Depends(require_service)])
+def export_suggestions(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    state: list[SuggestionState] | None = Query(None),
+    format: Literal["arrow", "parquet"] = "arrow",
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+):
+    """Like /export/campaign_metrics for suggestions, filtered on created_at and state."""
+    ws = _parse_ws(x_workspace_id)
+    return _export_response("suggestions", ws, suggestions_query(ws, start, end, state), SUGGESTIONS_SCHEMA, format)
+
+def _log_job(session, x_workspace_id: str | None, body: Dict, job_status: JobStatus) -> dict:
+    event = job_event(_parse_ws(x_workspace_id), body, job_status)
+    write_job_events(session, [event])
+    return {"id": str(event["id"]), "status": job_status}
 
 @router.post("/jobs/ack", dependencies=[Depends(require_service)])
 def job_ack(
@@ -117,24 +196,105 @@ def job_ack(
     x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
     session = Depends(get_session),
 ):
-    ws = _parse_ws(x_workspace_id)
-    log = DBJobLog(workspace_id=ws, job_id=str(body.get("jobId")), status=JobStatus.ACK, message=body.get("message"), meta=body.get("meta"))
-    session.add(log)
-    session.flush()
-    return {"id": str(log.id), "status": log.status}
+    return _log_job(session, x_workspace_id, body, JobStatus.ACK)
 
 @router.post("/jobs/done", dependencies=[Depends(require_service)])
 def job_done(body: Dict, x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"), session = Depends(get_session)):
-    ws = _parse_ws(x_workspace_id)
-    log = DBJobLog(workspace_id=ws, job_id=str(body.get("jobId")), status=JobStatus.DONE, message=body.get("message"), meta=body.get("meta"))
-    session.add(log)
-    session.flush()
-    return {"id": str(log.id), "status": log.status}
+    return _log_job(session, x_workspace_id, body, JobStatus.DONE)
 
 @router.post("/jobs/fail", dependencies=[Depends(require_service)])
 def job_fail(body: Dict, x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"), session = Depends(get_session)):
+    return _log_job(session, x_workspace_id, body, JobStatus.FAIL)
+
+@router.get("/jobs/{job_id}", dependencies=[Depends(require_service)])
+async def job_status(
+    job_id: str,
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+    session = Depends(get_async_session),
+):
+    """
+    Current status of a job: its latest event, from job_status_current, or
+    from this process's write-behind buffer when that holds a newer one
+    ("pending": true).
+    """
+    ws = _parse_ws(x_workspace_id)
+    pending = job_event_buffer.pending_status(ws, job_id)
+    if pending:
+        status_, message, meta, log_id, event_at = pending["status"], pending["message"], pending["meta"], pending["id"], pending["created_at"]
+    else:
+        row = await session.get(DBJobStatusCurrent, (ws, job_id))
+        if row is None:
+            raise HTTPException(404, f"No events for job {job_id}")
+        status_, message, meta, log_id, event_at = row.status, row.message, row.meta, row.log_id, row.event_at
+    return {
+        "jobId": job_id,
+        "status": status_,
+        "message": message,
+        "meta": meta,
+        "logId": str(log_id),
+        "updatedAt": event_at.isoformat(),
+        "pending": pending is not None,
+    }
+
+@router.put("/shops/{shop}/token", dependencies=[Depends(require_service)])
+def put_shop_token(shop: str, body: ShopTokenIn):
+    """Called by the Remix app after OAuth; needs SHOP_TOKEN_SOURCE=postgres."""
+    try:
+        shop_tokens.put(shop, body.accessToken)
+    except ReadOnlyTokenSource as e:
+        raise HTTPException(409, str(e))
+    return {"shop": shop, "stored": True}
+
+@router.delete("/shops/{shop}/token", dependencies=[Depends(require_service)])
+def delete_shop_token(shop: str):
+    """Called from the app.uninstalled webhook: drops the stored token and this process's cached copy."""
+    shop_tokens.invalidate(shop, remove=True)
+    logger.info(f"🔒 Revoked access token for shop: {shop}")
+    return {"shop": shop, "revoked": True}
+
+@async_router.post("/suggestions/import", dependencies=[Depends(require_service), Depends(ingestion_slot)])
+async def import_suggestions_async(
+    payload: SuggestionsImport,
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+    session = Depends(get_async_session),
+):
     ws = _parse_ws(x_workspace_id)
-    log = DBJobLog(workspace_id=ws, job_id=str(body.get("jobId")), status=JobStatus.FAIL, message=body.get("message"), meta=body.get("meta"))
-    session.add(log)
-    session.flush()
-    return {"id": str(log.id), "status": log.status}
+    start = time.perf_counter()
+    counts = await session.run_sync(upsert_suggestions, ws, payload.items)
+    record_ingest("suggestions_import", len(payload.items), time.perf_counter() - start)
+    return {"upserts": len(payload.items), **counts}
+
+@async_router.post("/data/upsert/campaign_metrics", dependencies=[Depends(require_service), Depends(ingestion_slot)])
+async def upsert_campaign_metrics_async(
+    payload: CampaignMetricsIn,
+    x_workspace_id: str | None = Header(None, alias="X-Workspace-ID"),
+    session = Depends(get_async_session),
+):
+    ws = _parse_ws(x_workspace_id)
+    start = time.perf_counter()
+    await prepare_partitions_async(session, payload.rows)
+    totals = {"created": 0, "updated": 0, "duplicates": 0}
+    for chunk in chunked(payload.rows, METRICS_CHUNK_SIZE):
+        for name, count in (await merge_campaign_metrics_async(session, ws, chunk)).items():
+            totals[name] += count
+    record_ingest("campaign_metrics", len(payload.rows), time.perf_counter() - start)
+    return {"upserts": len(payload.rows), **totals}
+
+async def _log_job_async(x_workspace_id: str | None, body: Dict, job_status: JobStatus) -> dict:
+    event = job_event(_parse_ws(x_workspace_id), body, job_status)
+    await job_event_buffer.record(event)
+    return {"id": str(event["id"]), "status": job_status}
+
+# No session dependency: with JOB_EVENTS_BUFFERED the event never touches the
+# pool on the request path, and without it record() opens its own session.
+@async_router.post("/jobs/ack", dependencies=[Depends(require_service)])
+async def job_ack_async(body: Dict, x_workspace_id: str | None = Header(None, alias="X-Workspace-ID")):
+    return await _log_job_async(x_workspace_id, body, JobStatus.ACK)
+
+@async_router.post("/jobs/done", dependencies=[Depends(require_service)])
+async def job_done_async(body: Dict, x_workspace_id: str | None = Header(None, alias="X-Workspace-ID")):
+    return await _log_job_async(x_workspace_id, body, JobStatus.DONE)
+
+@async_router.post("/jobs/fail", dependencies=[Depends(require_service)])
+async def job_fail_async(body: Dict, x_workspace_id: str | None = Header(None, alias="X-Workspace-ID")):
+    return await _log_job_async(x_workspace_id, body, JobStatus.FAIL)
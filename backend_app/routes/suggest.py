@@ -0,0 +1,115 @@
+from fastapi import APIRouter, Request, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from backend_app.common.models import PageFeatures, SuggestResponse
+from backend_app.gpt import generate_suggestions, stream_suggestions
+from backend_app.common.llm_cache import llm_cache
+from backend_app.common.artifacts import ArtifactNotFound, artifact_store
+import json
+import logging
+import traceback
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+async def resolve_html(body: dict) -> str | None:
+    """The page HTML: inline "html", or loaded from the "artifact" handle /crawl returned (its id or the whole object)."""
+    if body.get("html"):
+        return body["html"]
+    if body.get("artifact"):
+        return await artifact_store.get_text(body["artifact"])
+    return None
+
+def crawled_page(body: dict) -> dict | None:
+    """The /crawl fields the rule pre-audit reads ("features", "page_type"), when the client sent them along."""
+    if not body.get("features"):
+        return None
+    try:
+        features = PageFeatures.model_validate(body["features"])
+    except ValidationError as e:
+        logger.warning(f"⚠️ Ignoring malformed features, skipping the rule pre-audit: {e.error_count()} errors")
+        return None
+    page_type = body.get("page_type")
+    return {"features": features.model_dump(), "page_type": page_type if isinstance(page_type, str) else "unknown"}
+
+def _artifact_missing(handle) -> JSONResponse:
+    logger.warning(f"⚠️ Unknown or expired artifact: {handle}")
+    return JSONResponse(status_code=404, content={"error": "Unknown or expired artifact; crawl the page again"})
+
+@router.post("/suggest", response_model=SuggestResponse)
+async def suggest(
+    request: Request,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+):
+    try:
+        body = await request.json()
+        try:
+            html = await resolve_html(body)
+        except ArtifactNotFound:
+            return _artifact_missing(body.get("artifact"))
+        goal = body.get("goal")
+
+        if not html or not goal:
+            return JSONResponse(
+                status_code=400,
+                content={"error": "Missing HTML or goal"}
+            )
+
+        logger.info(f"💡 Suggestion request for shop: {x_shop_domain} | Goal: {goal}")
+
+        return await generate_suggestions(html, goal, bypass_cache=bool(body.get("bypass_cache")), page=crawled_page(body))
+
+    except Exception as e:
+        logger.error(f"❌ Suggest failed for shop {x_shop_domain}: {e}")
+        traceback.print_exc()
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Suggestion generation failed: {str(e)}"}
+        )
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/suggest/stream")
+async def suggest_stream(
+    request: Request,
+    x_shop_domain: str = Header(..., alias="X-Shop-Domain"),
+):
+    """
+    Same input as /suggest (html or artifact, goal, and optionally the
+    crawl's features and page_type for the rule pre-audit), answered as server-sent events: one "rationale"
+    event, then a "suggestion" event per item as soon as the model finishes
+    it, then "done" (or "error").
+    """
+    body = await request.json()
+    try:
+        html = await resolve_html(body)
+    except ArtifactNotFound:
+        return _artifact_missing(body.get("artifact"))
+    goal = body.get("goal")
+
+    if not html or not goal:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Missing HTML or goal"}
+        )
+
+    logger.info(f"💡 Streaming suggestion request for shop: {x_shop_domain} | Goal: {goal}")
+
+    async def events():
+        try:
+            async for event, data in stream_suggestions(html, goal, bypass_cache=bool(body.get("bypass_cache")), page=crawled_page(body)):
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"❌ Streaming suggest failed for shop {x_shop_domain}: {e}")
+            yield _sse("error", {"error": f"Suggestion generation failed: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/suggest/cache/stats")
+async def suggest_cache_stats():
+    return llm_cache.stats()
@@ -1,58 +0,0 @@
-from fastapi import APIRouter, Request, Header
-from fastapi.responses import JSONResponse
-import logging
-import traceback
-
-router = APIRouter()
-logger = logging.getLogger(__name__)
-
-@router.post("/suggest")
-async def suggest(
-    request: Request,
-    from backend_app.common.models import ShopSession
-...
-x_shop_domain: str = Header(..., alias="X-Shop-Domain")
-shop_session = ShopSession(shop_domain=x_shop_domain)
-):
-    try:
-        body = await request.json()
-        html = body.get("html")
-        goal = body.get("goal")
-
-        if not html or not goal:
-            return JSONResponse(
-                status_code=400,
-                content={"error": "Missing HTML or goal"}
-            )
-
-        logger.info(f"💡 Suggestion request for shop: {x_shop_domain} | Goal: {goal}")
-
-        # TODO: Replace with real AI logic
-        suggestions = [
-            {
-                "text": "Improve headline",
-                "type": "copy",
-                "target": "h1",
-                "impact": "high"
-            },
-            {
-                "text": "Add urgency to CTA",
-                "type": "cta",
-                "target": "button",
-                "impact": "medium"
-            }
-        ]
-
-        return {
-            "rationale": f"Based on your goal: '{goal}', here are suggested changes.",
-            "suggestions": suggestions
-        }
-
-    except Exception as e:
-        logger.error(f"❌ Suggest failed for shop {x_shop_domain}: {e}")
-        traceback.print_exc()
-        return JSONResponse(
-            status_code=500,
-            content={"error": f"Suggestion generation failed: {str(e)}"}
-        )
-        
@@ -1,5 +1,4 @@
 from fastapi import APIRouter
-from starlette.concurrency import run_in_threadpool
 from backend_app.gpt import call_gpt  # Assuming correct path now
 import logging
 
@@ -9,7 +8,7 @@ logger = logging.getLogger(__name__)
 @router.get('/test-gpt')
 async def test_gpt():
     try:
-        output = await run_in_threadpool(call_gpt, [
+        output = await call_gpt([
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Say hello in one sentence."}
         ])
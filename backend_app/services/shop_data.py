@@ -1,15 +1,219 @@
+# filepath: backend_app/services/shop_data.py
+"""
+Shop access tokens for calls to Shopify.
+
+ShopTokenStore keeps shop -> token in a TTL cache in front of a token
+source, so per-request lookups are a dict hit. Sources:
+
+- "sqlite": the Remix app's Prisma Shop table (SHOP_DB_PATH), read over one
+  long-lived read-only connection; for the app and backend on one host.
+- "postgres": the shop_tokens table in the backend database, written by the
+  Remix app through PUT /v1/shops/{shop}/token; for separate hosts.
+
+The app.uninstalled webhook calls DELETE /v1/shops/{shop}/token, which drops
+the token (postgres) and invalidates this process's cache entry. Other
+processes drop it on their TTL (SHOP_TOKEN_TTL). Batch jobs should
+prefetch() the shops they will touch: one query for all cache misses.
+"""
+from __future__ import annotations
+import os
 import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Protocol
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from backend_app.db import SessionLocal
+from backend_app.db_models import DBShopToken
+
+SHOP_TOKEN_SOURCE = os.getenv("SHOP_TOKEN_SOURCE", "sqlite")  # sqlite | postgres
+SHOP_DB_PATH = os.getenv("SHOP_DB_PATH", "audit-ai/dev.sqlite")
+SHOP_TOKEN_TTL = float(os.getenv("SHOP_TOKEN_TTL", "300"))
+SHOP_TOKEN_MAX_ENTRIES = int(os.getenv("SHOP_TOKEN_MAX_ENTRIES", "10000"))
+SQLITE_MAX_VARIABLES = 900  # under sqlite's default bound-parameter limit
+
+
+class ReadOnlyTokenSource(Exception):
+    """The configured token source cannot store tokens (SHOP_TOKEN_SOURCE=sqlite)."""
+
+
+class TokenSource(Protocol):
+    def fetch(self, shops: list[str]) -> dict[str, str]:
+        """Tokens for those of shops that have one."""
+
+    def save(self, shop: str, token: str) -> None: ...
+
+    def remove(self, shop: str) -> None: ...
+
+
+class SqliteTokenSource:
+    """The Prisma Shop table. Read only: the Remix app owns the file."""
+
+    def __init__(self, path: str = SHOP_DB_PATH):
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        return self._db
+
+    def fetch(self, shops: list[str]) -> dict[str, str]:
+        tokens = {}
+        with self._lock:
+            conn = self._conn()
+            for i in range(0, len(shops), SQLITE_MAX_VARIABLES):
+                chunk = shops[i:i + SQLITE_MAX_VARIABLES]
+                marks = ",".join("?" * len(chunk))
+                tokens.update(conn.execute(f"SELECT shopDomain, accessToken FROM Shop WHERE shopDomain IN ({marks})", chunk).fetchall())
+        return tokens
+
+    def save(self, shop: str, token: str) -> None:
+        raise ReadOnlyTokenSource("The Remix app writes the sqlite Shop table")
+
+    def remove(self, shop: str) -> None:
+        pass  # the app.uninstalled webhook cleans up its own database
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
 
-def get_access_token(shop_domain: str) -> str:
-conn = sqlite3.connect("audit-ai/dev.sqlite")  # ✅ correct path
-    cursor = conn.cursor()
 
-    cursor.execute("SELECT accessToken FROM Shop WHERE shopDomain = ?", (shop_domain,))
-    result = cursor.fetchone()
+class PostgresTokenSource:
+    """shop_tokens in the backend database, over the shared engine pool."""
 
-    conn.close()
+    def __init__(self, session_factory: Callable = SessionLocal):
+        self.session_factory = session_factory
 
-    if result:
-        return result[0]
-    else:
+    def fetch(self, shops: list[str]) -> dict[str, str]:
+        with self.session_factory() as session:
+            rows = session.execute(select(DBShopToken.shop_domain, DBShopToken.access_token).where(DBShopToken.shop_domain.in_(shops)))
+            return dict(rows.all())
+
+    def save(self, shop: str, token: str) -> None:
+        stmt = pg_insert(DBShopToken).values(shop_domain=shop, access_token=token)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DBShopToken.shop_domain],
+            set_={"access_token": stmt.excluded.access_token, "updated_at": func.now()},
+        )
+        with self.session_factory() as session:
+            session.execute(stmt)
+            session.commit()
+
+    def remove(self, shop: str) -> None:
+        with self.session_factory() as session:
+            session.execute(delete(DBShopToken).where(DBShopToken.shop_domain == shop))
+            session.commit()
+
+
+def make_source(name: str = SHOP_TOKEN_SOURCE) -> TokenSource:
+    if name == "sqlite":
+        return SqliteTokenSource()
+    if name == "postgres":
+        return PostgresTokenSource()
+    raise ValueError(f"Unknown SHOP_TOKEN_SOURCE: {name}")
+
+
+class ShopTokenStore:
+    def __init__(self, source: TokenSource | None = None, ttl: float = SHOP_TOKEN_TTL, max_entries: int = SHOP_TOKEN_MAX_ENTRIES):
+        self._source = source
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a fetch that overlapped one does
+        # not put back the token that was just revoked.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def source(self) -> TokenSource:
+        # Built on first use, so importing this module opens nothing.
+        if self._source is None:
+            self._source = make_source()
+        return self._source
+
+    def _cached(self, shop: str, now: float) -> str | None:
+        entry = self._entries.get(shop)
+        if entry is None or entry[0] <= now:
+            return None
+        return entry[1]
+
+    def _remember(self, tokens: dict[str, str], now: float, generation: int | None = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if len(self._entries) + len(tokens) > self.max_entries:
+                self._entries = {shop: entry for shop, entry in self._entries.items() if entry[0] > now}
+            expires = now + self.ttl
+            for shop, token in tokens.items():
+                self._entries[shop] = (expires, token)
+
+    def get(self, shop: str) -> str | None:
+        now = time.monotonic()
+        token = self._cached(shop, now)
+        if token is not None:
+            self.hits += 1
+            return token
+        self.misses += 1
+        generation = self._generation
+        tokens = self.source.fetch([shop])
+        self._remember(tokens, now, generation)  # misses are not cached: a fresh install must work at once
+        return tokens.get(shop)
+
+    def prefetch(self, shops: Iterable[str]) -> dict[str, str]:
+        """Load every uncached shop in one query; returns the tokens found for all of shops."""
+        now = time.monotonic()
+        shops = list(dict.fromkeys(shops))
+        found = {}
+        missing = []
+        for shop in shops:
+            token = self._cached(shop, now)
+            if token is None:
+                missing.append(shop)
+            else:
+                found[shop] = token
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            generation = self._generation
+            fetched = self.source.fetch(missing)
+            self._remember(fetched, now, generation)
+            found.update(fetched)
+        return found
+
+    def put(self, shop: str, token: str) -> None:
+        self.source.save(shop, token)
+        self._remember({shop: token}, time.monotonic())
+
+    def invalidate(self, shop: str, remove: bool = False) -> None:
+        """Forget the cached token; with remove, also delete it from the source (app uninstalled)."""
+        if remove:
+            self.source.remove(shop)
+        with self._lock:
+            self._entries.pop(shop, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+shop_tokens = ShopTokenStore()
+
+
+def get_access_token(shop_domain: str) -> str:
+    token = shop_tokens.get(shop_domain)
+    if token is None:
         raise ValueError(f"No access token found for {shop_domain}")
+    return token
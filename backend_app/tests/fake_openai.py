@@ -0,0 +1,98 @@
+"""
+Minimal stand-in for the OpenAI chat completions API.
+
+Used in-process by the tests through httpx.ASGITransport, or run locally
+and point the backend at it with OPENAI_BASE_URL:
+
+    uvicorn fake_openai:app --app-dir backend_app/tests --port 8999
+    OPENAI_BASE_URL=http://127.0.0.1:8999/v1 OPENAI_API_KEY=fake uvicorn backend_app.main:app
+"""
+import asyncio
+import json
+import time
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_CONTENT = json.dumps({
+    "rationale": "The primary CTA is below the fold.",
+    "suggestions": [
+        {"text": "Move the Add to cart button above the fold.", "type": "layout", "target": "cta-button", "impact": "high"},
+        {"text": "Show review stars under the product title.", "type": "trust", "target": "product-title", "impact": "medium"},
+    ],
+})
+
+
+def _stream(body: dict, content: str, chunk_chars: int, chunk_delay: float, prompt_tokens: int):
+    base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model", "fake")}
+
+    async def events():
+        for i in range(0, len(content), chunk_chars):
+            if chunk_delay:
+                await asyncio.sleep(chunk_delay)
+            delta = {"content": content[i:i + chunk_chars]}
+            yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]})}\n\n"
+        yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4, "total_tokens": prompt_tokens + len(content) // 4}
+            yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def make_fake_openai(
+    content: str = DEFAULT_CONTENT,
+    failures: list[tuple[int, dict]] | None = None,
+    delay: float = 0.0,
+    chunk_chars: int = 8,
+    chunk_delay: float = 0.0,
+) -> FastAPI:
+    """
+    Build a fake server. `failures` is consumed one entry per request before
+    any success, e.g. [(429, {"retry-after": "0"}), (500, {})]. Requests with
+    "stream": true get `content` back as SSE chunks of chunk_chars.
+    """
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.in_flight = 0
+    app.state.peak_in_flight = 0
+    app.state.requests = []
+    pending = list(failures or [])
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        app.state.requests.append(body)
+        app.state.in_flight += 1
+        app.state.peak_in_flight = max(app.state.peak_in_flight, app.state.in_flight)
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            if pending:
+                status, headers = pending.pop(0)
+                return JSONResponse(status_code=status, headers=headers, content={"error": {"message": "fake failure", "type": "fake"}})
+            prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+            if body.get("stream"):
+                return _stream(body, content, chunk_chars, chunk_delay, prompt_chars // 4)
+            return {
+                "id": f"chatcmpl-fake-{app.state.calls}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(content) // 4, "total_tokens": (prompt_chars + len(content)) // 4},
+            }
+        finally:
+            app.state.in_flight -= 1
+
+    return app
+
+
+def fake_http_client(app: FastAPI) -> httpx.AsyncClient:
+    """httpx client that routes requests straight into the fake app."""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake-openai")
+
+
+app = make_fake_openai()
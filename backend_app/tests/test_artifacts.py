@@ -0,0 +1,128 @@
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fake_openai import make_fake_openai, fake_http_client
+
+from backend_app import gpt
+from backend_app.common.artifacts import ArtifactNotFound, ArtifactStore, LocalDiskStorage
+from backend_app.common.crawl_cache import CrawlCache
+from backend_app.common.llm_cache import LLMCache
+from backend_app.routes import artifacts, crawl, suggest
+
+HEADERS = {"X-Shop-Domain": "s.myshopify.com"}
+PAGE = "<html>" + "".join(f"<p>Product {n} — ünïcode</p>" for n in range(5000)) + "</html>"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ArtifactStore(LocalDiskStorage(str(tmp_path)), chunk_size=4096)
+    for module in (artifacts, crawl, suggest):
+        monkeypatch.setattr(module, "artifact_store", store)
+    return store
+
+
+def test_put_is_content_addressed_compressed_and_deduplicated(store):
+    ref = store.put_bytes(PAGE.encode())
+    assert ref.size == len(PAGE.encode()) and ref.stored_size < ref.size / 4
+    assert store.put_bytes(PAGE.encode()) == ref  # a second shop crawling the same page
+    assert (store.stored, store.deduplicated) == (1, 1)
+    assert len(list(store.storage.scan())) == 1
+    assert store.read_bytes(ref.id).decode() == PAGE
+
+
+@pytest.mark.parametrize("offset,length", [(0, 10), (4090, 20), (8192, 4096), (100, 30000), (len(PAGE.encode()) - 5, 100)])
+def test_range_reads_match_the_original(store, offset, length):
+    data = PAGE.encode()
+    ref = store.put_bytes(data)
+    assert store.read_bytes(ref.id, offset, length) == data[offset:offset + length]
+    assert store.read_bytes(ref.id, len(data) + 10, 5) == b""
+
+
+def test_unknown_handles_raise(store):
+    with pytest.raises(ArtifactNotFound):
+        store.read_bytes("0" * 64)
+    with pytest.raises(ArtifactNotFound):
+        store.read_bytes("../../etc/passwd")
+
+
+def test_gc_drops_old_then_least_recently_used(store):
+    old, mid, new = (store.put_bytes(f"page {n}".encode() * 100) for n in range(3))
+    for ref, age in ((old, 100), (mid, 50), (new, 10)):
+        path = store.storage._path(ref.id)
+        os.utime(path, (1000 - age, 1000 - age))
+    store.ttl, store.max_bytes = 80, new.stored_size
+    assert store.gc(now=1000) == 2  # old by age, mid to fit the size cap
+    assert [key for key, _, _ in store.storage.scan()] == [new.id]
+
+
+def test_crawl_returns_a_handle_and_html_on_request(store, monkeypatch):
+    async def fake_fetch(url, mode):
+        return {"url": url, "html": PAGE, "title": "Shop", "etag": None}
+
+    monkeypatch.setattr(crawl, "fetch_page", fake_fetch)
+    monkeypatch.setattr(crawl, "crawl_cache", CrawlCache(ttl=0, directory=None))  # every request crawls
+    app = FastAPI()
+    app.include_router(crawl.router)
+    app.include_router(artifacts.router)
+    client = TestClient(app)
+
+    slim = client.post("/crawl", json={"url": "https://a.test/p", "include_html": False}, headers=HEADERS).json()
+    assert slim["html"] is None and slim["artifact"]["size"] == len(PAGE.encode())
+    full = client.post("/crawl", json={"url": "https://a.test/p"}, headers=HEADERS).json()
+    assert full["html"] == PAGE and full["artifact"] == slim["artifact"]
+
+    handle = slim["artifact"]["id"]
+    assert client.get(f"/artifacts/{handle}", headers=HEADERS).text == PAGE
+    part = client.get(f"/artifacts/{handle}", headers={**HEADERS, "Range": "bytes=6-15"})
+    assert part.status_code == 206 and part.content == PAGE.encode()[6:16]
+    assert part.headers["Content-Range"] == f"bytes 6-15/{len(PAGE.encode())}"
+    assert client.get(f"/artifacts/{handle}", headers={**HEADERS, "Range": "bytes=-4"}).content == b"tml>"
+    assert client.get(f"/artifacts/{handle}", headers={**HEADERS, "Range": "bytes=99999999-"}).status_code == 416
+    assert client.get(f"/artifacts/{'0' * 64}", headers=HEADERS).status_code == 404
+
+
+def test_cache_hit_restores_a_collected_artifact(store, monkeypatch):
+    calls = []
+
+    async def fake_fetch(url, mode):
+        calls.append(url)
+        return {"url": url, "html": PAGE, "title": "Shop", "etag": None}
+
+    monkeypatch.setattr(crawl, "fetch_page", fake_fetch)
+    monkeypatch.setattr(crawl, "crawl_cache", CrawlCache(ttl=3600, directory=None))
+    app = FastAPI()
+    app.include_router(crawl.router)
+    app.include_router(artifacts.router)
+    client = TestClient(app)
+
+    handle = client.post("/crawl", json={"url": "https://a.test/p", "include_html": False}, headers=HEADERS).json()["artifact"]["id"]
+    store.ttl = 0
+    assert store.gc() == 1 and client.get(f"/artifacts/{handle}", headers=HEADERS).status_code == 404
+
+    again = client.post("/crawl", json={"url": "https://a.test/p", "include_html": False}, headers=HEADERS).json()
+    assert len(calls) == 1  # served from the crawl cache
+    assert again["artifact"]["id"] == handle
+    assert client.get(f"/artifacts/{handle}", headers=HEADERS).text == PAGE
+
+
+def test_suggest_accepts_an_artifact_handle(store, monkeypatch):
+    app = make_fake_openai()
+    monkeypatch.setattr(gpt, "llm_client", gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app)))
+    monkeypatch.setattr(gpt, "llm_cache", LLMCache(path=None))
+    api = FastAPI()
+    api.include_router(suggest.router)
+    client = TestClient(api)
+
+    ref = store.put_bytes(b"<h1>Wool hat</h1><button>Add to cart</button>")
+    by_handle = client.post("/suggest", json={"artifact": ref.id, "goal": "increase add to cart"}, headers=HEADERS)
+    assert by_handle.status_code == 200 and by_handle.json()["suggestions"]
+    by_object = client.post("/suggest", json={"artifact": ref.model_dump(), "goal": "increase add to cart"}, headers=HEADERS)
+    assert by_object.json() == by_handle.json()
+    missing = client.post("/suggest", json={"artifact": "f" * 64, "goal": "g"}, headers=HEADERS)
+    assert missing.status_code == 404
+    stream = client.post("/suggest/stream", json={"artifact": ref.id, "goal": "increase add to cart"}, headers=HEADERS)
+    assert "event: done" in stream.text
+    assert json.loads(stream.text.split("event: rationale\ndata: ")[1].split("\n")[0])
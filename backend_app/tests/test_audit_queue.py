@@ -0,0 +1,197 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+
+from backend_app.common import audit_queue
+from backend_app.common.audit_queue import (
+    AuditWorkerPool, claim_audits, complete_audit, enqueue_audit, fail_audit, release_audit, renew_lease,
+)
+from backend_app.db_models import DBAuditJob, DBJobStatusCurrent, JobStatus
+
+PAYLOAD = {"url": "https://shop.example/products/a", "goal": "conversion", "mode": "auto"}
+
+
+@pytest.fixture
+def empty_queue(pg_engine):
+    """Claims see every committed job, so start and end each test with an empty queue."""
+    with pg_engine.begin() as conn:
+        conn.execute(text("DELETE FROM audit_jobs"))
+    yield
+    with pg_engine.begin() as conn:
+        conn.execute(text("DELETE FROM audit_jobs"))
+
+
+def _make_visible(session, job_id):
+    session.execute(update(DBAuditJob).where(DBAuditJob.id == job_id).values(visible_at=text("now() - interval '1 second'")))
+
+
+def test_concurrent_claims_skip_locked_jobs(pg_engine, empty_queue):
+    ws = uuid.uuid4()
+    with Session(pg_engine) as session:
+        ids = {enqueue_audit(session, ws, "shop.example", PAYLOAD).id for _ in range(2)}
+        session.commit()
+
+    with Session(pg_engine) as first, Session(pg_engine) as second:
+        mine = claim_audits(first, "w1", limit=1)
+        theirs = claim_audits(second, "w2", limit=5)  # the first claim's row is still locked
+        assert len(mine) == 1 and len(theirs) == 1
+        assert {mine[0].id, theirs[0].id} == ids
+        assert claim_audits(second, "w2") == []
+        first.commit()
+        second.commit()
+
+
+def test_failed_attempts_retry_with_backoff_then_fail(pg_session, empty_queue):
+    ws = uuid.uuid4()
+    job = enqueue_audit(pg_session, ws, "shop.example", PAYLOAD, max_attempts=2)
+
+    [claim] = claim_audits(pg_session, "w1")
+    assert claim.attempt == 1 and claim.payload == PAYLOAD
+    assert fail_audit(pg_session, claim, "TimeoutError: crawl") == JobStatus.QUEUED
+    assert claim_audits(pg_session, "w1") == []  # backing off
+
+    _make_visible(pg_session, job.id)
+    [claim] = claim_audits(pg_session, "w1")
+    assert claim.attempt == 2
+    assert fail_audit(pg_session, claim, "TimeoutError: crawl") == JobStatus.FAIL
+
+    pg_session.refresh(job)
+    assert (job.status, job.attempts, job.error) == (JobStatus.FAIL, 2, "TimeoutError: crawl")
+    assert job.finished_at is not None
+    current = pg_session.get(DBJobStatusCurrent, (ws, str(job.id)))
+    assert current.status == JobStatus.FAIL
+    assert [audit_queue.retry_delay(n) for n in (1, 2, 3)] == [5, 10, 20]
+
+
+def test_expired_lease_is_reclaimed_and_the_stale_worker_is_fenced_out(pg_session, empty_queue):
+    job = enqueue_audit(pg_session, uuid.uuid4(), "shop.example", PAYLOAD)
+    [stale] = claim_audits(pg_session, "w1", timeout=0)  # lease runs out at once
+    [fresh] = claim_audits(pg_session, "w2")
+    assert (stale.id, fresh.attempt) == (job.id, 2)
+
+    assert not renew_lease(pg_session, stale)
+    assert not complete_audit(pg_session, stale, {"from": "w1"})
+    assert fail_audit(pg_session, stale, "late") is None
+    assert renew_lease(pg_session, fresh, stage="suggest")
+    assert complete_audit(pg_session, fresh, {"from": "w2"})
+
+    pg_session.refresh(job)
+    assert (job.status, job.result, job.worker) == (JobStatus.DONE, {"from": "w2"}, "w2")
+
+
+def test_released_job_does_not_spend_an_attempt(pg_session, empty_queue):
+    job = enqueue_audit(pg_session, uuid.uuid4(), "shop.example", PAYLOAD)
+    [claim] = claim_audits(pg_session, "w1")
+    assert release_audit(pg_session, claim)
+    [again] = claim_audits(pg_session, "w2")
+    assert again.attempt == 1 and again.id == job.id
+
+
+def test_worker_pool_runs_retries_and_records_results(pg_engine, async_sessions, empty_queue, monkeypatch):
+    monkeypatch.setattr(audit_queue, "AUDIT_RETRY_BACKOFF", 0)
+    ws = uuid.uuid4()
+    with Session(pg_engine) as session:
+        flaky = enqueue_audit(session, ws, "shop.example", {**PAYLOAD, "flaky": True}).id
+        ok = enqueue_audit(session, ws, "shop.example", PAYLOAD).id
+        broken = enqueue_audit(session, ws, "shop.example", {**PAYLOAD, "broken": True}, max_attempts=2).id
+        session.commit()
+
+    calls = []
+
+    async def runner(payload, stage):
+        await stage("crawl")
+        calls.append(payload)
+        if payload.get("broken") or (payload.get("flaky") and len([c for c in calls if c.get("flaky")]) == 1):
+            raise RuntimeError("boom")
+        await stage("suggest")
+        return {"suggestions": [], "url": payload["url"]}
+
+    async def run():
+        pool = AuditWorkerPool(runner, workers=2, session_factory=async_sessions, poll_interval=0.05)
+        await pool.start()
+        for _ in range(200):
+            if pool.completed + pool.failed == 3:
+                break
+            await asyncio.sleep(0.05)
+        await pool.stop()
+        return pool.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["completed"], stats["failed"], stats["retried"]) == (2, 1, 2)
+
+    with Session(pg_engine) as session:
+        jobs = {job.id: job for job in session.query(DBAuditJob).filter(DBAuditJob.workspace_id == ws)}
+    assert (jobs[flaky].status, jobs[flaky].attempts) == (JobStatus.DONE, 2)
+    assert jobs[ok].result == {"suggestions": [], "url": PAYLOAD["url"]}
+    assert (jobs[broken].status, jobs[broken].error) == (JobStatus.FAIL, "RuntimeError: boom")
+
+
+def test_cancelled_audit_goes_back_to_the_queue(pg_engine, async_sessions, empty_queue):
+    with Session(pg_engine) as session:
+        job_id = enqueue_audit(session, uuid.uuid4(), "shop.example", PAYLOAD).id
+        session.commit()
+    started = asyncio.Event()
+
+    async def runner(payload, stage):
+        started.set()
+        await asyncio.sleep(60)
+
+    async def run():
+        pool = AuditWorkerPool(runner, workers=1, session_factory=async_sessions, poll_interval=0.05)
+        await pool.start()
+        await asyncio.wait_for(started.wait(), 5)
+        await pool.stop(grace=0.05)
+
+    asyncio.run(run())
+    with Session(pg_engine) as session:
+        job = session.get(DBAuditJob, job_id)
+        assert (job.status, job.attempts, job.worker) == (JobStatus.QUEUED, 0, None)
+
+
+def test_audit_routes_submit_poll_and_stream(pg_engine, async_sessions, empty_queue, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend_app.db import get_async_session
+    from backend_app.routes import audits
+    from backend_app.tests.conftest import async_session_override
+
+    monkeypatch.setattr(audits.audit_workers, "session_factory", async_sessions)
+    app = FastAPI()
+    app.include_router(audits.router)
+    app.dependency_overrides[get_async_session] = async_session_override(async_sessions)
+    client = TestClient(app)
+    shop = {"X-Shop-Domain": "shop.example"}
+
+    assert client.post("/audits", json={"url": "nope", "goal": "conversion"}, headers=shop).status_code == 400
+    resp = client.post("/audits", json={"url": PAYLOAD["url"], "goal": "conversion"}, headers=shop)
+    assert resp.status_code == 202
+    job_id = resp.json()["jobId"]
+    assert resp.json()["eventsUrl"] == f"/audits/{job_id}/events"
+    assert client.get(f"/audits/{job_id}", headers=shop).json()["status"] == "QUEUED"
+    assert client.get(f"/audits/{job_id}", headers={"X-Shop-Domain": "other.example"}).status_code == 404
+
+    async def runner(payload, stage):
+        await stage("suggest")
+        return {"rationale": "r", "suggestions": [], "url": payload["url"]}
+
+    async def drain():
+        pool = AuditWorkerPool(runner, workers=1, session_factory=async_sessions, poll_interval=0.05)
+        await pool.start()
+        while not pool.completed:
+            await asyncio.sleep(0.05)
+        await pool.stop()
+
+    asyncio.run(asyncio.wait_for(drain(), 10))
+
+    body = client.get(f"/audits/{job_id}", headers=shop).json()
+    assert (body["status"], body["attempts"], body["result"]["rationale"]) == ("DONE", 1, "r")
+    with Session(pg_engine) as session:
+        ws = session.get(DBAuditJob, uuid.UUID(job_id)).workspace_id
+    assert ws == uuid.uuid5(uuid.NAMESPACE_DNS, "shop.example")
+
+    stream = client.get(f"/audits/{job_id}/events", headers=shop).text
+    assert "event: status" in stream and '"status": "DONE"' in stream
+    assert stream.rstrip().split("\n\n")[-1].startswith("event: result")
@@ -0,0 +1,144 @@
+import asyncio
+from backend_app.common import browser_pool as bp
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        ctx = FakeContext()
+        self.contexts.append(ctx)
+        return ctx
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+def _pool(monkeypatch, **kwargs):
+    fake = FakePlaywright()
+    monkeypatch.setattr(bp, "async_playwright", lambda: fake)
+    monkeypatch.setattr(bp, "_process_tree_rss_mb", lambda pid: 0.0)
+    return bp.BrowserPool(**kwargs), fake
+
+
+def test_contexts_are_isolated_and_closed(monkeypatch):
+    pool, fake = _pool(monkeypatch, size=1, max_concurrency=2, max_pages=0)
+
+    async def run():
+        await pool.start()
+        async with pool.context() as a, pool.context() as b:
+            assert a is not b
+        await pool.stop()
+
+    asyncio.run(run())
+    browser = fake.chromium.launched[0]
+    assert len(fake.chromium.launched) == 1
+    assert all(c.closed for c in browser.contexts)
+    assert fake.stopped
+
+
+def test_browser_recycled_after_max_pages(monkeypatch):
+    pool, fake = _pool(monkeypatch, size=1, max_concurrency=1, max_pages=2)
+
+    async def run():
+        await pool.start()
+        for _ in range(3):
+            async with pool.context():
+                pass
+        await pool.stop()
+
+    asyncio.run(run())
+    assert len(fake.chromium.launched) == 2
+    assert not fake.chromium.launched[0].connected
+
+
+def test_concurrency_is_capped(monkeypatch):
+    pool, _ = _pool(monkeypatch, size=2, max_concurrency=2, max_pages=0)
+    peak = 0
+    active = 0
+
+    async def crawl():
+        nonlocal peak, active
+        async with pool.context():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        await pool.start()
+        await asyncio.gather(*(crawl() for _ in range(6)))
+        await pool.stop()
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_recycling_does_not_block_checkouts(monkeypatch):
+    pool, fake = _pool(monkeypatch, size=1, max_concurrency=2, max_pages=0, max_rss_mb=100, rss_check_every=2)
+    scans = []
+    monkeypatch.setattr(bp, "_process_tree_rss_mb", lambda pid: scans.append(pid) or 500.0)
+
+    async def crawl():
+        async with pool.context():
+            pass
+
+    async def run():
+        await pool.start()
+        closing = asyncio.Event()
+        old = fake.chromium.launched[0]
+
+        async def slow_close():
+            await closing.wait()
+            old.connected = False
+
+        old.close = slow_close
+        await crawl()
+        recycling = asyncio.create_task(crawl())  # second checkin: over budget, closes the browser
+        while len(scans) < 1:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        assert not recycling.done()  # still waiting on the close...
+        await crawl()  # ...which does not hold the pool lock
+        assert len(fake.chromium.launched) == 2 and len(scans) == 1
+        closing.set()
+        await recycling
+        await pool.stop()
+
+    asyncio.run(asyncio.wait_for(run(), 2))
+    assert not fake.chromium.launched[0].connected
@@ -0,0 +1,60 @@
+import asyncio
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend_app.routes import crawl
+
+
+def _client(monkeypatch, fake_crawl):
+    monkeypatch.setattr(crawl, "crawl_url", fake_crawl)
+    app = FastAPI()
+    app.include_router(crawl.router)
+    return TestClient(app)
+
+
+def test_batch_streams_results_and_inlines_errors(monkeypatch):
+    async def fake_crawl(url, mode="auto"):
+        if "broken" in url:
+            raise RuntimeError("timeout")
+        await asyncio.sleep(0.05 if "slow" in url else 0)
+        return {"url": url, "html": "", "title": url}
+
+    client = _client(monkeypatch, fake_crawl)
+    urls = ["https://a.test/slow", "https://b.test/broken", "not-a-url", "https://c.test/"]
+    resp = client.post("/crawl/batch", json={"urls": urls}, headers={"X-Shop-Domain": "s.myshopify.com"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert len(lines) == 4
+    assert by_index[0]["status"] == "ok" and by_index[0]["data"]["title"] == urls[0]
+    assert by_index[1]["status"] == "error" and "timeout" in by_index[1]["error"]
+    assert by_index[2]["error"] == "Invalid URL"
+    assert lines[-1]["index"] == 0  # the slow page finishes last
+
+
+def test_batch_respects_per_host_limit(monkeypatch):
+    monkeypatch.setattr(crawl, "CRAWL_BATCH_PER_HOST", 1)
+    active = {}
+    peak = {}
+
+    async def fake_crawl(url, mode="auto"):
+        host = url.split("/")[2]
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return {"url": url, "html": "", "title": ""}
+
+    client = _client(monkeypatch, fake_crawl)
+    urls = [f"https://{h}.test/{i}" for h in ("a", "b") for i in range(3)]
+    client.post("/crawl/batch", json={"urls": urls}, headers={"X-Shop-Domain": "s.myshopify.com"})
+    assert peak == {"a.test": 1, "b.test": 1}
+
+
+def test_batch_rejects_oversized_request(monkeypatch):
+    monkeypatch.setattr(crawl, "CRAWL_BATCH_MAX_URLS", 2)
+    client = _client(monkeypatch, None)
+    resp = client.post("/crawl/batch", json={"urls": ["https://a.test/"] * 3}, headers={"X-Shop-Domain": "s"})
+    assert resp.status_code == 400
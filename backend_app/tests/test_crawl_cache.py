@@ -0,0 +1,59 @@
+import asyncio
+from backend_app.common.crawl_cache import CrawlCache, normalize_url
+
+
+def _page(url):
+    return {"url": url, "html": "<html></html>", "title": "t"}
+
+
+def test_normalize_url_strips_tracking_and_sorts_query():
+    a = normalize_url("HTTPS://Shop.Example.com:443/products/hat?utm_source=ig&b=2&a=1&fbclid=x#reviews")
+    b = normalize_url("https://shop.example.com/products/hat?a=1&b=2")
+    assert a == b == "https://shop.example.com/products/hat?a=1&b=2"
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/?variant=1") == "http://example.com:8080/?variant=1"
+
+
+def test_lru_eviction_and_counters():
+    cache = CrawlCache(ttl=60, max_entries=2, directory=None)
+
+    async def run():
+        await cache.set("a", _page("a"))
+        await cache.set("b", _page("b"))
+        assert await cache.get("a") is not None  # a is now most recent
+        await cache.set("c", _page("c"))        # evicts b
+        assert await cache.get("b") is None
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["evictions"] == 1
+
+
+def test_expired_entry_revalidates_or_misses(monkeypatch):
+    cache = CrawlCache(ttl=0, max_entries=8, directory=None)
+    answers = iter([True, False])
+
+    async def fake_revalidate(entry):
+        return next(answers)
+
+    monkeypatch.setattr(cache, "_revalidate", fake_revalidate)
+
+    async def run():
+        await cache.set("k", _page("k"), etag='"abc"')
+        assert await cache.get("k") is not None  # 304 -> served from cache
+        assert await cache.get("k") is None      # changed -> dropped
+
+    asyncio.run(run())
+    assert cache.revalidated == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    async def run():
+        first = CrawlCache(ttl=60, max_entries=8, directory=str(tmp_path))
+        await first.set("k", _page("k"))
+        second = CrawlCache(ttl=60, max_entries=8, directory=str(tmp_path))
+        return await second.get("k")
+
+    assert asyncio.run(run())["url"] == "k"
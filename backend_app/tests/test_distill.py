@@ -0,0 +1,61 @@
+from backend_app.common.distill import distill_html, estimate_tokens
+
+CARDS = "".join(
+    f'<li class="grid__item"><div class="card"><h3><a href="/products/p{i}">Product {i}</a></h3>'
+    f'<span class="price">${i}.00</span></div></li>'
+    for i in range(40)
+)
+PAGE = f"""<!doctype html><html><head><title>Winter hats</title>
+<meta name="description" content="Warm hats for cold days">
+<style>.card {{ display: grid }}</style><script>window.theme = {{"a": 1 < 2}};</script></head>
+<body><header><a href="/">Home</a></header>
+<main><h1>Winter hats</h1><p>Warm and <b>cosy</b> hats for everyone.</p>
+<ul class="grid">{CARDS}</ul>
+<form action="/contact" method="post"><input type="hidden" name="form_type" value="customer">
+<input type="email" placeholder="Email address"><button>Subscribe</button></form></main></body></html>"""
+
+
+def test_drops_scripts_and_keeps_structure():
+    page = distill_html(PAGE)
+    assert "window.theme" not in page.text and "display: grid" not in page.text
+    lines = page.text.splitlines()
+    assert lines[0] == "[title] Winter hats"
+    assert "[meta description] Warm hats for cold days" in lines
+    assert "# Winter hats" in lines
+    assert "Warm and cosy hats for everyone." in lines
+    assert "[form action=/contact method=post]" in lines
+    assert "[input email] Email address" in lines
+    assert "[button] Subscribe" in lines
+    assert "form_type" not in page.text
+
+
+def test_collapses_repeated_product_cards():
+    page = distill_html(PAGE, keep_repeats=3)
+    assert "### Product 2" in page.text and "### Product 3" not in page.text
+    assert "[+37 more similar li blocks]" in page.text
+    assert page.collapsed_blocks == 37
+    assert page.compression_ratio > 5
+
+
+def test_packs_to_token_budget_by_priority():
+    page = distill_html(PAGE, token_budget=60)
+    assert page.tokens <= 60
+    assert page.dropped_lines > 0
+    # Headline, offer and form survive; body copy goes first.
+    assert "# Winter hats" in page.text and "[button] Subscribe" in page.text
+    assert "Warm and cosy" not in page.text
+    assert estimate_tokens("abcd") == 1
+
+
+def test_head_ends_at_the_first_body_tag_without_closing_tag():
+    page = distill_html('<html><head><title>Hats</title><meta name="description" content="Warm hats"><body><h1>Winter hats</h1><p>Lined with fleece.</p></body>')
+    lines = page.text.splitlines()
+    assert lines[:2] == ["[title] Hats", "[meta description] Warm hats"]
+    assert "# Winter hats" in lines and "Lined with fleece." in lines
+
+
+def test_svg_titles_are_not_the_page_title():
+    page = distill_html('<title>Hat</title><h1>Hat</h1><button><svg><title>Close</title><path d="M0"/></svg>Close menu</button>')
+    lines = page.text.splitlines()
+    assert lines[0] == "[title] Hat"
+    assert "[button] Close menu" in lines
@@ -0,0 +1,61 @@
+import io
+import uuid
+from contextlib import nullcontext
+import pyarrow as pa
+import pyarrow.parquet as pq
+from backend_app.common import export, ingest
+from backend_app.common.models import SuggestionIn
+from backend_app.routes import service
+
+
+def _metrics(pg_session, ws):
+    rows = [
+        ingest.CampaignMetricRow(source=source, ts=f"2025-11-{day:02d}T00:00:00Z", metric=metric, value=day)
+        for day in range(1, 11) for source in ("meta", "google") for metric in ("spend", "clicks")
+    ]
+    ingest.merge_campaign_metrics(pg_session, ws, rows)
+
+
+def test_export_stream_writes_one_batch_per_fetch(pg_session):
+    ws = uuid.uuid4()
+    _metrics(pg_session, ws)
+    stmt = export.campaign_metrics_query(ws, metrics=["spend"])
+    pieces = list(export.export_stream(lambda: nullcontext(pg_session), stmt, export.CAMPAIGN_METRICS_SCHEMA, batch_size=6))
+    reader = pa.ipc.open_stream(b"".join(pieces))
+    batches = list(reader)
+    assert [b.num_rows for b in batches] == [6, 6, 6, 2]
+    table = pa.Table.from_batches(batches)
+    assert set(table["metric"].to_pylist()) == {"spend"}
+    assert table["source"].to_pylist()[:10] == ["google"] * 10
+    assert table["workspace_id"][0].as_py() == str(ws)
+
+
+def test_empty_export_is_still_a_valid_file(pg_session):
+    stmt = export.suggestions_query(uuid.uuid4())
+    data = b"".join(export.export_stream(lambda: nullcontext(pg_session), stmt, export.SUGGESTIONS_SCHEMA, fmt="parquet"))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 0 and table.schema.names == export.SUGGESTIONS_SCHEMA.names
+
+
+def test_export_routes(service_client, pg_session, monkeypatch):
+    monkeypatch.setattr(service, "SessionLocal", lambda: nullcontext(pg_session))
+    ws = uuid.uuid4()
+    _metrics(pg_session, ws)
+    ingest.upsert_suggestions(pg_session, ws, [SuggestionIn(title=f"Fix {i}") for i in range(3)])
+    headers = {"X-Workspace-ID": str(ws)}
+
+    resp = service_client.get(
+        "/v1/export/campaign_metrics",
+        params={"format": "parquet", "start": "2025-11-05T00:00:00Z", "source": "meta"},
+        headers=headers,
+    )
+    assert resp.headers["content-type"] == "application/vnd.apache.parquet"
+    table = pq.read_table(io.BytesIO(resp.content))
+    assert table.num_rows == 12 and min(table["value"].to_pylist()) == 5
+
+    resp = service_client.get("/v1/export/suggestions", params={"state": "NEW"}, headers=headers)
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert sorted(table["title"].to_pylist()) == ["Fix 0", "Fix 1", "Fix 2"]
+    assert set(table["state"].to_pylist()) == {"NEW"}
+
+    assert service_client.get("/v1/export/suggestions", params={"state": "BOGUS"}, headers=headers).status_code == 422
@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from backend_app.common import scraper
+from backend_app.common.extract import classify_page_type
+from backend_app.common.models import PageData
+
+
+def test_classify_page_type_from_url():
+    assert classify_page_type("https://s.test/", {}) == "home"
+    assert classify_page_type("https://s.test/products/hat", {}) == "product"
+    assert classify_page_type("https://s.test/collections/hats/products/hat", {}) == "product"
+    assert classify_page_type("https://s.test/collections/hats", {}) == "collection"
+    assert classify_page_type("https://s.test/cart", {}) == "cart"
+    assert classify_page_type("https://s.test/blogs/news", {}) == "blog"
+    assert classify_page_type("https://s.test/blogs/news/launch", {}) == "article"
+    assert classify_page_type("https://s.test/pages/about", {}) == "page"
+
+
+def test_classify_page_type_from_features():
+    assert classify_page_type("https://s.test/hat", {"meta": {"og:type": "product"}}) == "product"
+    assert classify_page_type("https://s.test/hat", {"forms": [{"action": "/cart/add"}], "prices": ["$10"]}) == "product"
+    grid = {"ctas": [{"href": f"/products/p{i}"} for i in range(12)]}
+    assert classify_page_type("https://s.test/sale", grid) == "collection"
+    assert classify_page_type("https://s.test/sale", {}) == "unknown"
+
+
+class FakePage:
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.evaluations = 0
+
+    async def goto(self, url, timeout):
+        return None
+
+    async def content(self):
+        return "<html></html>"
+
+    async def title(self):
+        return "Hat"
+
+    async def evaluate(self, script):
+        self.evaluations += 1
+        return self.bundle
+
+
+class FakePool:
+    def __init__(self, page):
+        self.page = page
+
+    @asynccontextmanager
+    async def context(self):
+        page = self.page
+
+        class Ctx:
+            async def new_page(self):
+                return page
+
+        yield Ctx()
+
+
+def test_scrape_page_uses_single_evaluate():
+    bundle = {
+        "headings": [{"level": 1, "text": "Wool hat"}],
+        "ctas": [
+            {"tag": "a", "text": "Cart", "href": "/cart", "top": 10, "visible": True, "above_fold": True},
+            {"tag": "button", "text": "Add to cart", "href": None, "top": 400, "visible": True, "above_fold": True},
+        ],
+        "forms": [{"action": "/cart/add", "method": "post", "inputs": ["hidden", "submit"], "has_email": False, "text": "", "above_fold": True}],
+        "meta": {"og:type": "product"},
+        "images": [],
+        "prices": ["$25.00"],
+        "reviews": ["judgeme"],
+        "viewport_height": 800,
+        "page_height": 2400,
+    }
+    page = FakePage(bundle)
+    result = asyncio.run(scraper.scrape_page("https://s.test/hat", FakePool(page)))
+
+    assert page.evaluations == 1
+    assert result["headings"] == ["Wool hat"]
+    assert result["ctas"] == ["/cart"]
+    assert result["forms"] == ["/cart/add"]
+    assert result["page_type"] == "product"
+    assert PageData(**result).features.reviews == ["judgeme"]
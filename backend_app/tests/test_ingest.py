@@ -0,0 +1,65 @@
+import uuid
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+from backend_app.common import ingest
+from backend_app.common.models import SuggestionIn
+from backend_app.db_models import DBSuggestion
+
+
+def _items(n, prefix="k"):
+    return [SuggestionIn(title=f"Suggestion {i}", uniqueKey=f"{prefix}{i}", meta={"source": "test"}) for i in range(n)]
+
+
+def test_upsert_statement_merges_on_the_unique_constraint():
+    sql = str(ingest.suggestions_upsert_statement().compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_suggestions_workspace_uniquekey DO UPDATE" in sql
+    assert "excluded.payload" in sql and "RETURNING (xmax = 0)" in sql
+
+
+def test_auto_unique_key_is_stable():
+    item = SuggestionIn(title="Add trust badges")
+    assert ingest.suggestion_unique_key(item) == ingest.suggestion_unique_key(SuggestionIn(title="Add trust badges"))
+    assert ingest.suggestion_unique_key(item).startswith("auto:")
+
+
+def test_chunked_splits_with_remainder():
+    assert [len(c) for c in ingest.chunked(range(7), 3)] == [3, 3, 1]
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.batches = []
+
+    def execute(self, stmt, rows, execution_options=None):
+        self.batches.append(rows)
+        return type("R", (), {"scalars": lambda _: type("S", (), {"all": lambda _: [True] * len(rows)})()})()
+
+
+def test_duplicate_keys_in_a_chunk_are_collapsed():
+    items = _items(3) + [SuggestionIn(title="Newer", uniqueKey="k1")]
+    session = _RecordingSession()
+    counts = ingest.upsert_suggestions(session, uuid.uuid4(), items, chunk_size=10)
+    assert counts == {"created": 3, "updated": 0, "duplicates": 1}
+    assert len(session.batches) == 1
+    assert [row["unique_key"] for row in session.batches[0]] == ["k0", "k2", "k1"]
+    assert session.batches[0][-1]["title"] == "Newer"
+
+
+def test_created_and_updated_counts_against_postgres(pg_session):
+    ws = uuid.uuid4()
+    first = ingest.upsert_suggestions(pg_session, ws, _items(5), chunk_size=2)
+    assert first == {"created": 5, "updated": 0, "duplicates": 0}
+
+    second = ingest.upsert_suggestions(pg_session, ws, _items(3) + _items(2, prefix="new"), chunk_size=2)
+    assert second == {"created": 2, "updated": 3, "duplicates": 0}
+    total = pg_session.scalar(select(func.count()).select_from(DBSuggestion).where(DBSuggestion.workspace_id == ws))
+    assert total == 7
+
+
+def test_import_route_reports_real_counts(service_client):
+    ws = str(uuid.uuid4())
+    body = {"workspaceId": ws, "items": [{"title": "Add reviews", "uniqueKey": "a"}, {"title": "Sticky cart"}]}
+    first = service_client.post("/v1/suggestions/import", json=body, headers={"X-Workspace-ID": ws}).json()
+    assert first == {"upserts": 2, "created": 2, "updated": 0, "duplicates": 0}
+    again = service_client.post("/v1/suggestions/import", json=body, headers={"X-Workspace-ID": ws}).json()
+    assert again["created"] == 0 and again["updated"] == 2
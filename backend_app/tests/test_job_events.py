@@ -0,0 +1,110 @@
+import asyncio
+import uuid
+from datetime import timedelta
+import pytest
+from sqlalchemy import func, select
+from backend_app.common.job_events import JobEventBuffer, job_event, write_job_events
+from backend_app.db_models import DBJobLog, DBJobStatusCurrent, JobStatus
+
+
+class _FakeSession:
+    def __init__(self, sink, fail):
+        self.sink, self.fail = sink, fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run_sync(self, fn, batch):
+        if self.fail:
+            raise RuntimeError("database down")
+        self.sink.append(list(batch))
+
+    async def commit(self):
+        pass
+
+
+def _buffer(**kwargs):
+    batches, state = [], {"fail": False}
+    buffer = JobEventBuffer(session_factory=lambda: _FakeSession(batches, state["fail"]), **kwargs)
+    return buffer, batches, state
+
+
+def _event(job="j1", status=JobStatus.ACK, ws=None):
+    return job_event(ws or uuid.UUID(int=1), {"jobId": job}, status)
+
+
+def test_buffer_flushes_on_size_and_on_stop():
+    async def run():
+        buffer, batches, _ = _buffer(flush_interval=60, max_batch=3)
+        await buffer.start()
+        for i in range(3):
+            await buffer.record(_event(f"j{i}"))
+        await asyncio.sleep(0.01)
+        assert [len(b) for b in batches] == [3]  # size threshold woke the flusher
+        await buffer.record(_event("j3"))
+        await buffer.stop()
+        assert [len(b) for b in batches] == [3, 1]
+        assert buffer.stats()["written"] == 4 and not buffer.running
+    asyncio.run(run())
+
+
+def test_buffer_flushes_on_interval():
+    async def run():
+        buffer, batches, _ = _buffer(flush_interval=0.02, max_batch=100)
+        await buffer.start()
+        await buffer.record(_event())
+        await asyncio.sleep(0.1)
+        assert len(batches) == 1
+        await buffer.stop()
+    asyncio.run(run())
+
+
+def test_failed_flush_keeps_events_and_applies_backpressure():
+    async def run():
+        buffer, batches, state = _buffer(flush_interval=60, max_batch=2, max_pending=2)
+        buffer._task = asyncio.create_task(asyncio.sleep(60))  # "running", but no background flusher
+        state["fail"] = True
+        await buffer.add(_event("a"))
+        await buffer.add(_event("b", JobStatus.DONE))
+        assert buffer.pending_status(uuid.UUID(int=1), "b")["status"] == JobStatus.DONE
+        with pytest.raises(RuntimeError):
+            await buffer.add(_event("c"))  # full: the caller flushes and sees the failure
+        assert buffer.stats()["pending"] == 2 and buffer.failures == 1
+
+        state["fail"] = False
+        assert await buffer.flush() == 2
+        assert [e["job_id"] for e in batches[0]] == ["a", "b"]
+        buffer._task.cancel()
+    asyncio.run(run())
+
+
+def test_current_status_never_goes_backwards(pg_session):
+    ws = uuid.uuid4()
+    ack, done = _event("job-1", JobStatus.ACK, ws), _event("job-1", JobStatus.DONE, ws)
+    done["created_at"] = ack["created_at"] + timedelta(seconds=1)
+    write_job_events(pg_session, [done])
+    write_job_events(pg_session, [ack])  # late, out-of-order delivery
+    current = pg_session.get(DBJobStatusCurrent, (ws, "job-1"))
+    assert current.status == JobStatus.DONE and current.log_id == done["id"]
+    assert pg_session.scalar(select(func.count()).select_from(DBJobLog).where(DBJobLog.workspace_id == ws)) == 2
+
+
+def test_job_routes_maintain_current_status(async_service_client):
+    ws = str(uuid.uuid4())
+    headers = {"X-Workspace-ID": ws}
+    assert async_service_client.get("/v1/jobs/job-9", headers=headers).status_code == 404
+    async_service_client.post("/v1/jobs/ack", json={"jobId": "job-9"}, headers=headers)
+    done = async_service_client.post("/v1/jobs/done", json={"jobId": "job-9", "message": "ok"}, headers=headers).json()
+    current = async_service_client.get("/v1/jobs/job-9", headers=headers).json()
+    assert current["status"] == "DONE" and current["message"] == "ok" and current["logId"] == done["id"]
+    assert current["pending"] is False
+
+
+def test_sync_job_route_writes_current_status(service_client, pg_session):
+    ws = uuid.uuid4()
+    resp = service_client.post("/v1/jobs/fail", json={"jobId": "job-3"}, headers={"X-Workspace-ID": str(ws)})
+    assert resp.json()["status"] == "FAIL"
+    assert pg_session.get(DBJobStatusCurrent, (ws, "job-3")).status == JobStatus.FAIL
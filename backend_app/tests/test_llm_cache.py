@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from fake_openai import make_fake_openai, fake_http_client
+from backend_app import gpt
+from backend_app.common.llm_cache import LLMCache
+
+
+def _wire(monkeypatch, app, cache):
+    client = gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app))
+    monkeypatch.setattr(gpt, "llm_client", client)
+    monkeypatch.setattr(gpt, "llm_cache", cache)
+
+
+def test_identical_prompts_hit_cache_and_report_tokens_saved(monkeypatch):
+    app = make_fake_openai()
+    cache = LLMCache(path=None)
+    _wire(monkeypatch, app, cache)
+
+    async def run():
+        first = await gpt.generate_suggestions("<h1>Hat</h1>", "increase add to cart")
+        second = await gpt.generate_suggestions("<h1>Hat</h1>", "Increase Add To Cart")
+        other = await gpt.generate_suggestions("<h1>Scarf</h1>", "increase add to cart")
+        return first, second, other
+
+    first, second, _ = asyncio.run(run())
+    assert first == second
+    assert app.state.calls == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["prompt_tokens_saved"] > 0
+
+
+def test_inflight_duplicates_share_one_call(monkeypatch):
+    app = make_fake_openai(delay=0.05)
+    cache = LLMCache(path=None)
+    _wire(monkeypatch, app, cache)
+
+    async def run():
+        return await asyncio.gather(*(gpt.generate_suggestions("<h1>Hat</h1>", "boost email signups") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert all(r == results[0] for r in results)
+    assert app.state.calls == 1
+    assert cache.coalesced == 4
+
+
+def test_bypass_forces_fresh_call(monkeypatch):
+    app = make_fake_openai()
+    _wire(monkeypatch, app, LLMCache(path=None))
+
+    async def run():
+        await gpt.generate_suggestions("<h1>Hat</h1>", "drive product views")
+        await gpt.generate_suggestions("<h1>Hat</h1>", "drive product views", bypass_cache=True)
+
+    asyncio.run(run())
+    assert app.state.calls == 2
+
+
+def test_errors_propagate_to_waiters_and_are_not_cached():
+    cache = LLMCache(path=None)
+    calls = 0
+
+    async def boom():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("bad json")
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_compute("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        with pytest.raises(ValueError):
+            await cache.get_or_compute("k", boom)
+
+    asyncio.run(run())
+    assert calls == 2
+
+
+def test_size_bound_ttl_and_persistence(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+
+    async def run():
+        small = LLMCache(ttl=60, max_bytes=30, path=None)
+        await small.set("a", {"v": "x" * 10})
+        await small.set("b", {"v": "y" * 10})
+        assert await small.get("a") is None and small.evictions == 1
+
+        expired = LLMCache(ttl=0, path=None)
+        await expired.set("a", {"v": 1})
+        assert await expired.get("a") is None
+
+        await LLMCache(ttl=60, path=path).set("k", {"content": "cached"})
+        return await LLMCache(ttl=60, path=path).get("k")
+
+    assert asyncio.run(run()) == {"content": "cached"}
+
+
+def test_key_is_stable_and_order_independent():
+    assert LLMCache.make_key(model="m", goal="g") == LLMCache.make_key(goal="g", model="m")
+    assert LLMCache.make_key(model="m", goal="g") != LLMCache.make_key(model="m", goal="h")
@@ -0,0 +1,86 @@
+import asyncio
+import httpx
+import pytest
+from fake_openai import make_fake_openai, fake_http_client
+from backend_app import gpt
+from backend_app.common.llm_cache import LLMCache
+
+
+def _client(app, **kwargs):
+    return gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app), **kwargs)
+
+
+def test_complete_returns_content_and_usage():
+    app = make_fake_openai(content="hello")
+    client = _client(app)
+    result = asyncio.run(client.complete([{"role": "user", "content": "x" * 40}]))
+    assert result.content == "hello"
+    assert result.prompt_tokens == 10 and result.attempts == 1
+
+
+def test_retries_rate_limit_with_retry_after(monkeypatch):
+    app = make_fake_openai(content="ok", failures=[(429, {"retry-after": "0.01"}), (500, {})])
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(gpt.asyncio, "sleep", fake_sleep)
+    result = asyncio.run(_client(app).complete([{"role": "user", "content": "hi"}]))
+    assert result.attempts == 3
+    assert sleeps[0] == 0.01  # honoured Retry-After
+    assert 0 <= sleeps[1] <= gpt.LLM_BACKOFF_BASE * 2  # jittered backoff
+
+
+def test_client_errors_fail_fast():
+    app = make_fake_openai(failures=[(400, {})])
+    with pytest.raises(Exception) as exc:
+        asyncio.run(_client(app).complete([{"role": "user", "content": "hi"}]))
+    assert not isinstance(exc.value, RuntimeError)
+    assert app.state.calls == 1
+
+
+def test_concurrency_semaphore_caps_in_flight_calls():
+    app = make_fake_openai(content="ok", delay=0.02)
+    client = _client(app, max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(client.complete([{"role": "user", "content": "hi"}]) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(results) == 10
+    assert app.state.peak_in_flight == 3
+
+
+def test_stream_releases_its_slot_during_backoff(monkeypatch):
+    app = make_fake_openai(content="hello", failures=[(429, {"retry-after": "0"})])
+    client = _client(app, max_concurrency=1)
+    held_while_sleeping = []
+
+    async def fake_sleep(seconds):
+        held_while_sleeping.append(client._semaphore.locked())
+
+    monkeypatch.setattr(gpt.asyncio, "sleep", fake_sleep)
+
+    async def run():
+        return "".join([delta async for delta in client.stream([{"role": "user", "content": "hi"}])])
+
+    assert asyncio.run(run()) == "hello"
+    assert held_while_sleeping == [False] and app.state.calls == 2
+    assert not client._semaphore.locked()
+
+
+def test_backoff_delay_parses_retry_after_variants():
+    response = httpx.Response(429, headers={"retry-after-ms": "250"})
+    error = type("E", (Exception,), {"response": response})()
+    assert gpt.backoff_delay(0, error) == 0.25
+    assert gpt.backoff_delay(5, None, base=1, cap=4) <= 4
+
+
+def test_generate_suggestions_parses_model_json(monkeypatch):
+    app = make_fake_openai()
+    monkeypatch.setattr(gpt, "llm_client", _client(app))
+    monkeypatch.setattr(gpt, "llm_cache", LLMCache(path=None))
+    result = asyncio.run(gpt.generate_suggestions("<h1>Hat</h1>", "increase add to cart"))
+    assert result["suggestions"][0]["target"] == "cta-button"
+    assert "# Hat" in app.state.requests[0]["messages"][1]["content"]
@@ -0,0 +1,82 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from fake_openai import make_fake_openai, fake_http_client
+from backend_app import gpt
+from backend_app.common import metrics
+
+
+def _value(name, **labels):
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    before = _value("http_request_duration_seconds_count", method="GET", route="/items/{item_id}", status="200")
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nope")
+    assert _value("http_request_duration_seconds_count", method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert _value("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") >= 1
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    from backend_app.main import app
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE scrape_phase_duration_seconds histogram" in response.text
+    assert "# TYPE llm_tokens_total counter" in response.text
+
+
+def test_llm_client_records_latency_retries_and_tokens(monkeypatch):
+    app = make_fake_openai(content="hello", failures=[(500, {})])
+    client = gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app))
+
+    async def no_sleep(_):
+        pass
+
+    monkeypatch.setattr(gpt.asyncio, "sleep", no_sleep)
+    retries = _value("llm_retries_total", model="metrics-model")
+    asyncio.run(client.complete([{"role": "user", "content": "x" * 40}], model="metrics-model"))
+    assert _value("llm_retries_total", model="metrics-model") == retries + 1
+    assert _value("llm_tokens_total", model="metrics-model", kind="prompt") >= 10
+    assert _value("llm_request_duration_seconds_count", model="metrics-model", mode="complete", outcome="ok") >= 1
+
+
+def test_streamed_tokens_are_counted_and_passed_through():
+    app = make_fake_openai(content="streamed answer")
+    client = gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app))
+    usage = {}
+
+    async def run():
+        return "".join([d async for d in client.stream([{"role": "user", "content": "hi"}], model="stream-model", usage=usage)])
+
+    assert asyncio.run(run()) == "streamed answer"
+    assert usage["completion_tokens"] == len("streamed answer") // 4
+    assert _value("llm_tokens_total", model="stream-model", kind="completion") == usage["completion_tokens"]
+
+
+def test_pool_in_use_gauge_tracks_checkouts():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    before = _value("db_pool_connections_in_use")
+    with engine.connect() as conn:
+        conn.execute(text("select 1"))
+        assert _value("db_pool_connections_in_use") == before + 1
+    assert _value("db_pool_connections_in_use") == before
+
+
+def test_record_ingest_counts_rows_and_throughput():
+    before = _value("ingest_rows_total", endpoint="test")
+    metrics.record_ingest("test", 500, 0.25)
+    assert _value("ingest_rows_total", endpoint="test") == before + 500
+    assert _value("ingest_rows_per_second_sum", endpoint="test") >= 2000
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import uuid
+from contextlib import nullcontext
+from sqlalchemy import select, text
+from backend_app.common import ingest
+from backend_app.db_models import DBCampaignMetric
+from backend_app.routes import service
+
+
+async def _body(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _collect(agen):
+    async def run():
+        return [item async for item in agen]
+    return asyncio.run(run())
+
+
+def test_iter_lines_reassembles_split_lines():
+    lines = _collect(ingest.iter_lines(_body(b'{"a": 1}\r\n{"b": 2}\n\n{"c": 3}', size=3)))
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b"", b'{"c": 3}']
+
+
+def test_iter_lines_skips_overlong_lines():
+    async def body():
+        yield b'{"a": 1}\n' + b"x" * 50
+        for _ in range(1000):  # 100 kB without a newline
+            yield b"y" * 100
+        yield b'\n{"b": 2}\n' + b"z" * 30
+
+    assert _collect(ingest.iter_lines(body(), max_line=64)) == [b'{"a": 1}', None, b'{"b": 2}', b"z" * 30]
+    assert _collect(ingest.iter_lines(_body(b"w" * 200), max_line=64)) == [None]
+
+    rows = _collect(ingest.iter_metric_rows(ingest.iter_lines(_body(b"w" * 200 + b"\n"), max_line=64), "ndjson"))
+    assert rows[0][1] is None and "longer than" in rows[0][2]
+
+
+def test_ndjson_rows_validate_incrementally():
+    body = "\n".join([
+        json.dumps({"source": "meta", "ts": "2025-11-01T00:00:00Z", "metric": "spend", "value": 12.5}),
+        "not json",
+        json.dumps({"source": "meta", "ts": "2025-11-01T00:00:00Z", "metric": "spend", "value": "lots"}),
+    ]).encode()
+    rows = _collect(ingest.iter_metric_rows(ingest.iter_lines(_body(body)), "ndjson"))
+    assert rows[0][1].value == 12.5 and rows[0][2] is None
+    assert rows[1][0] == 2 and rows[1][1] is None
+    assert rows[2][2].startswith("value:")
+
+
+def test_csv_rows_use_the_header():
+    body = b'source,ts,metric,value\nmeta,2025-11-01T00:00:00Z,"clicks",3\ngoogle,2025-11-01T00:00:00Z,clicks\n'
+    rows = _collect(ingest.iter_metric_rows(ingest.iter_lines(_body(body)), "csv"))
+    assert rows[0][0] == 2 and rows[0][1].metric == "clicks" and rows[0][1].value == 3.0
+    assert "expected 4 fields" in rows[1][2]
+
+
+def test_csv_bom_and_bad_bytes_reject_only_their_line():
+    body = b'\xef\xbb\xbfsource,ts,metric,value\nmeta,2025-11-01T00:00:00Z,clicks,3\nme\xffta,2025-11-01T00:00:00Z,clicks,4\ngoogle,2025-11-01T00:00:00Z,clicks,5\n'
+    rows = _collect(ingest.iter_metric_rows(ingest.iter_lines(_body(body)), "csv"))
+    assert [r[1].source if r[1] else None for r in rows] == ["meta", None, "google"]
+    assert rows[1][0] == 3 and "UTF-8" in rows[1][2]
+
+
+def _ndjson(n, value=1.0):
+    return "".join(
+        json.dumps({"source": "meta", "ts": f"2025-11-01T{i % 24:02d}:{i // 24:02d}:00Z", "metric": "spend", "value": value}) + "\n"
+        for i in range(n)
+    ).encode()
+
+
+def test_stream_merges_in_chunks_against_postgres(pg_session):
+    ws = uuid.uuid4()
+    body = _ndjson(25) + b'{"source": "meta"}\n'
+    updates = _collect(ingest.stream_campaign_metrics(lambda: nullcontext(pg_session), ws, _body(body, 64), chunk_size=10))
+    assert [u["rows"] for u in updates[:-1]] == [10, 10, 5]
+    summary = updates[-1]
+    assert summary["done"] and summary["created"] == 25 and summary["rejected"] == 1
+    assert summary["rejected_samples"][0]["line"] == 26
+
+    again = _collect(ingest.stream_campaign_metrics(lambda: nullcontext(pg_session), ws, _body(_ndjson(5, value=2.0)), chunk_size=10))
+    assert again[-1]["updated"] == 5 and again[-1]["created"] == 0
+    values = pg_session.scalars(select(DBCampaignMetric.value).where(DBCampaignMetric.workspace_id == ws)).all()
+    assert sorted(values) == [1.0] * 20 + [2.0] * 5
+
+
+def test_duplicate_keys_in_a_chunk_keep_the_last_value(pg_session):
+    ws = uuid.uuid4()
+    rows = [ingest.CampaignMetricRow(source="g", ts="2025-11-01T00:00:00Z", metric="clicks", value=v) for v in (1, 2, 3)]
+    assert ingest.merge_campaign_metrics(pg_session, ws, rows) == {"created": 1, "updated": 0, "duplicates": 2}
+    assert pg_session.scalar(select(DBCampaignMetric.value).where(DBCampaignMetric.workspace_id == ws)) == 3
+
+
+def test_ingest_route_reports_chunk_progress(service_client, pg_session, monkeypatch):
+    monkeypatch.setattr(service, "SessionLocal", lambda: nullcontext(pg_session))
+    monkeypatch.setattr(ingest, "METRICS_CHUNK_SIZE", 4)
+    ws = str(uuid.uuid4())
+    csv_body = b"source,ts,metric,value\n" + b"".join(f"meta,2025-11-0{d}T00:00:00Z,spend,{d}\n".encode() for d in range(1, 7))
+    resp = service_client.post(
+        "/v1/data/ingest/campaign_metrics",
+        content=csv_body,
+        headers={"X-Workspace-ID": ws, "Content-Type": "text/csv"},
+    )
+    result = resp.json()
+    assert result["done"] and result["created"] == 6
+    assert [chunk["rows"] for chunk in result["chunks"]] == [4, 2]
+
+
+def test_json_upsert_route_uses_the_merge(service_client):
+    ws = str(uuid.uuid4())
+    rows = [{"source": "meta", "ts": "2025-11-01T00:00:00Z", "metric": m, "value": 1} for m in ("spend", "clicks")]
+    body = {"workspaceId": ws, "rows": rows}
+    assert service_client.post("/v1/data/upsert/campaign_metrics", json=body, headers={"X-Workspace-ID": ws}).json() == {
+        "upserts": 2, "created": 2, "updated": 0, "duplicates": 0,
+    }
+
+
+def test_json_upsert_route_merges_in_chunks(service_client, pg_session, monkeypatch):
+    monkeypatch.setattr(service, "METRICS_CHUNK_SIZE", 2)
+    ws = str(uuid.uuid4())
+    rows = [{"source": "meta", "ts": f"2018-0{m}-01T00:00:00Z", "metric": "spend", "value": m} for m in (1, 2, 3, 1, 4)]
+    assert service_client.post("/v1/data/upsert/campaign_metrics", json={"workspaceId": ws, "rows": rows}, headers={"X-Workspace-ID": ws}).json() == {
+        "upserts": 5, "created": 4, "updated": 1, "duplicates": 0,
+    }
+    assert pg_session.execute(text("SELECT to_regclass('campaign_metrics_p201804')")).scalar() is not None
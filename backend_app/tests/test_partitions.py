@@ -0,0 +1,49 @@
+import uuid
+from datetime import date, datetime, timezone
+from sqlalchemy import text
+from backend_app.common import partitions
+from backend_app.common.ingest import merge_campaign_metrics
+from backend_app.common.models import CampaignMetricRow
+
+
+def test_month_arithmetic():
+    assert partitions.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert partitions.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partitions.month_start(datetime(2025, 3, 31, 23, 30, tzinfo=timezone.utc)) == date(2025, 3, 1)
+    assert partitions.partition_name(date(2025, 3, 1)) == "campaign_metrics_p202503"
+
+
+def test_ensure_partitions_is_idempotent(pg_session):
+    months = [date(2024, 1, 1), date(2024, 2, 1)]
+    assert partitions.ensure_partitions(pg_session, months) == ["campaign_metrics_p202401", "campaign_metrics_p202402"]
+    assert partitions.ensure_partitions(pg_session, months) == []
+    assert set(months) <= set(partitions.list_partitions(pg_session))
+
+
+def test_merge_creates_partitions_and_routes_rows(pg_session):
+    ws = uuid.uuid4()
+    rows = [
+        CampaignMetricRow(source="meta", ts="2023-05-31T23:59:59Z", metric="spend", value=1),
+        CampaignMetricRow(source="meta", ts="2023-06-01T00:00:00Z", metric="spend", value=2),
+    ]
+    assert merge_campaign_metrics(pg_session, ws, rows)["created"] == 2
+    placed = pg_session.execute(
+        text("SELECT tableoid::regclass::text, value FROM campaign_metrics WHERE workspace_id = :ws ORDER BY ts"), {"ws": ws}
+    ).all()
+    assert placed == [("campaign_metrics_p202305", 1.0), ("campaign_metrics_p202306", 2.0)]
+
+
+def test_retention_detaches_and_drops_old_months(pg_session):
+    partitions.ensure_partitions(pg_session, [date(2022, 1, 1), date(2022, 2, 1), date(2022, 3, 1)])
+    removed = partitions.apply_retention(pg_session, keep_months=1, today=date(2022, 3, 15))
+    assert "campaign_metrics_p202201" in removed and "campaign_metrics_p202202" not in removed
+    remaining = partitions.list_partitions(pg_session)
+    assert date(2022, 2, 1) in remaining and date(2022, 1, 1) not in remaining
+    assert pg_session.execute(text("SELECT to_regclass('campaign_metrics_p202201')")).scalar() is None
+
+
+def test_detach_without_drop_keeps_the_table(pg_session):
+    partitions.ensure_partitions(pg_session, [date(2021, 1, 1)])
+    partitions.apply_retention(pg_session, keep_months=0, today=date(2021, 2, 1), drop=False)
+    assert pg_session.execute(text("SELECT to_regclass('campaign_metrics_p202101')")).scalar() is not None
+    assert date(2021, 1, 1) not in partitions.list_partitions(pg_session)
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend_app.common import rate_limit
+from backend_app.common.rate_limit import ConcurrencyGate, MemoryBuckets, SqliteBuckets, WorkspaceLimiter
+
+
+@pytest.mark.parametrize("make", [MemoryBuckets, "sqlite"])
+def test_bucket_spends_burst_then_refills(make, tmp_path):
+    backend = SqliteBuckets(str(tmp_path / "rl.sqlite")) if make == "sqlite" else make()
+    assert [backend.take("ws", 1, rate=2, burst=3, now=100.0) for _ in range(3)] == [0, 0, 0]
+    assert backend.take("ws", 1, rate=2, burst=3, now=100.0) == pytest.approx(0.5)
+    assert backend.take("other", 1, rate=2, burst=3, now=100.0) == 0  # buckets are per key
+    assert backend.take("ws", 1, rate=2, burst=3, now=100.5) == 0
+    assert backend.take("ws", 2, rate=2, burst=3, now=101.0) == pytest.approx(0.5)  # 1 token back, 2 needed
+
+
+def test_sqlite_buckets_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / "rl.sqlite")
+    first, second = SqliteBuckets(path), SqliteBuckets(path)
+    assert first.take("ws", 2, rate=1, burst=2, now=10.0) == 0
+    assert second.take("ws", 1, rate=1, burst=2, now=10.0) == pytest.approx(1.0)
+
+
+def test_locked_sqlite_file_fails_open_off_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "rl.sqlite")
+    backend = SqliteBuckets(path, timeout=0.01)
+    backend.take("ws", 1, rate=1, burst=1, now=10.0)
+    holder = rate_limit.sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")  # another worker stuck mid-write
+    try:
+        assert backend.take("ws", 1, rate=1, burst=1, now=10.0) == 0.0  # admitted, not a 500
+        assert backend.errors == 1
+        threads = []
+        real_to_thread = asyncio.to_thread
+
+        async def to_thread(fn, *args):
+            threads.append(fn)
+            return await real_to_thread(fn, *args)
+
+        monkeypatch.setattr(rate_limit.asyncio, "to_thread", to_thread)
+        limiter = WorkspaceLimiter(backend, rate=1, burst=1)
+        assert asyncio.run(limiter.acheck("ws")) == 0.0 and len(threads) == 1
+        assert asyncio.run(WorkspaceLimiter(MemoryBuckets(), rate=1, burst=1).acheck("ws")) == 0.0 and len(threads) == 1
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+
+def test_memory_buckets_prune_idle_keys():
+    backend = MemoryBuckets(max_keys=2)
+    for n in range(3):
+        backend.take(f"ws{n}", 5, rate=1, burst=4, now=float(n * 10))  # each one refused, each one full again 4 s later
+    assert set(backend._buckets) == {"ws2"}
+
+
+def test_memory_buckets_stay_bounded_when_granted():
+    backend = MemoryBuckets(max_keys=100)
+    for n in range(10_000):
+        assert backend.take(f"ws{n}", 1, rate=1, burst=10, now=n / 1000) == 0.0
+    assert len(backend._buckets) == 100
+    assert "ws9999" in backend._buckets and "ws0" not in backend._buckets
+
+
+def test_request_cost_grows_with_body_size():
+    limiter = WorkspaceLimiter(MemoryBuckets(), rate=1, burst=10, bytes_per_token=1000)
+    assert [limiter.cost(n) for n in (0, 999, 1000, 5500, 10**9)] == [1, 1, 2, 6, 10]
+    assert WorkspaceLimiter(MemoryBuckets(), rate=0).check("ws", 10**9) == 0  # disabled
+
+
+def test_streamed_bodies_pay_for_their_bytes(monkeypatch):
+    clock = {"now": 1000.0}
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr(rate_limit, "time", type("Clock", (), {"time": staticmethod(lambda: clock["now"])}))
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    limiter = WorkspaceLimiter(MemoryBuckets(), rate=1, burst=4, bytes_per_token=10)
+
+    async def body():
+        for _ in range(5):
+            yield b"x" * 20
+
+    async def read(content_length):
+        return b"".join([data async for data in limiter.meter("ws", body(), content_length)])
+
+    assert len(asyncio.run(read(0))) == 100  # chunked: 10 tokens, 4 in the bucket
+    assert sum(sleeps) == pytest.approx(6)
+    assert limiter.check("ws") > 0  # the upload drained its own bucket
+    sleeps.clear()
+    clock["now"] += 100
+    asyncio.run(read(30))  # 3 tokens prepaid from Content-Length, only the rest is metered
+    assert sum(sleeps) == pytest.approx(3)
+
+
+def test_gate_queues_then_sheds():
+    async def run():
+        gate = ConcurrencyGate(limit=1, max_waiting=1, timeout=1)
+        assert await gate.acquire()
+        waiting = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.stats()["waiting"] == 1
+        assert not await gate.acquire()  # queue full
+        gate.release()  # handed to the waiter
+        assert await waiting and gate.in_flight == 1
+        gate.timeout = 0.01
+        assert not await gate.acquire()  # waited, timed out
+        gate.release()
+        assert gate.stats() == {"limit": 1, "in_flight": 0, "waiting": 0, "shed": 2}
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def limited_client(monkeypatch):
+    from backend_app.routes import service
+
+    monkeypatch.setenv("SERVICE_BEARER", "test-token")
+    monkeypatch.setattr(rate_limit, "service_limiter", WorkspaceLimiter(MemoryBuckets(), rate=0.1, burst=2))
+    app = FastAPI()
+    app.include_router(service.async_router)
+    client = TestClient(app)
+    client.headers.update({"Authorization": "Bearer test-token"})
+    return client
+
+
+def test_routes_answer_429_with_retry_after(limited_client):
+    bad = {"X-Workspace-ID": "not-a-uuid"}  # 400 from the route, but only once admitted
+    assert limited_client.post("/v1/jobs/ack", json={}, headers={**bad, "Authorization": ""}).status_code == 401
+    assert [limited_client.post("/v1/jobs/ack", json={}, headers=bad).status_code for _ in range(3)] == [400, 400, 429]
+    resp = limited_client.post("/v1/jobs/ack", json={}, headers=bad)
+    assert resp.headers["Retry-After"] == "10"
+    assert limited_client.post("/v1/jobs/ack", json={}, headers={"X-Workspace-ID": "another"}).status_code == 400
+
+
+def test_ingestion_over_the_cap_is_shed(limited_client, monkeypatch):
+    gate = ConcurrencyGate(limit=1, max_waiting=0, timeout=0)
+    gate.in_flight = 1
+    monkeypatch.setattr(rate_limit, "ingestion_gate", gate)
+    resp = limited_client.post("/v1/suggestions/import", json={"workspaceId": "x", "items": []}, headers={"X-Workspace-ID": "ws"})
+    assert resp.status_code == 429 and resp.headers["Retry-After"] == "1"
+    assert gate.shed == 1
@@ -0,0 +1,73 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import select
+from backend_app.common import ingest, rollups
+from backend_app.db_models import DBCampaignMetricDaily, DBCampaignMetricHourly
+
+
+def _row(ts, value, metric="spend", source="meta"):
+    return ingest.CampaignMetricRow(source=source, ts=ts, metric=metric, value=value)
+
+
+def _hour(pg_session, ws, bucket):
+    return pg_session.scalar(select(DBCampaignMetricHourly).where(
+        DBCampaignMetricHourly.workspace_id == ws, DBCampaignMetricHourly.bucket == bucket,
+    ))
+
+
+def test_merge_maintains_hourly_and_daily_buckets(pg_session):
+    ws = uuid.uuid4()
+    ingest.merge_campaign_metrics(pg_session, ws, [
+        _row("2025-11-01T10:05:00Z", 4),
+        _row("2025-11-01T10:40:00Z", 1),
+        _row("2025-11-01T11:00:00Z", 10),
+        _row("2025-11-02T00:30:00+02:00", 7),  # 2025-11-01T22:30Z
+    ])
+    hour = _hour(pg_session, ws, datetime(2025, 11, 1, 10, tzinfo=timezone.utc))
+    assert (hour.value_sum, hour.value_count, hour.value_min, hour.value_max, hour.last_value) == (5, 2, 1, 4, 1)
+
+    day = pg_session.scalar(select(DBCampaignMetricDaily).where(DBCampaignMetricDaily.workspace_id == ws))
+    assert day.bucket == datetime(2025, 11, 1, tzinfo=timezone.utc)
+    assert (day.value_sum, day.value_count, day.value_min, day.value_max, day.last_value) == (22, 4, 1, 10, 7)
+
+
+def test_corrected_values_recompute_the_bucket(pg_session):
+    ws = uuid.uuid4()
+    ingest.merge_campaign_metrics(pg_session, ws, [_row("2025-11-01T10:05:00Z", 100), _row("2025-11-01T10:10:00Z", 3)])
+    ingest.merge_campaign_metrics(pg_session, ws, [_row("2025-11-01T10:05:00Z", 2)])  # 100 was a bad value
+
+    hour = _hour(pg_session, ws, datetime(2025, 11, 1, 10, tzinfo=timezone.utc))
+    assert (hour.value_sum, hour.value_count, hour.value_min, hour.value_max) == (5, 2, 2, 3)
+    assert pg_session.scalar(select(DBCampaignMetricDaily.value_max).where(DBCampaignMetricDaily.workspace_id == ws)) == 3
+
+
+def test_rebuild_matches_incremental_maintenance(pg_session):
+    ws = uuid.uuid4()
+    ingest.merge_campaign_metrics(pg_session, ws, [_row(f"2025-11-0{d}T0{h}:00:00Z", d * h) for d in (1, 2) for h in range(4)])
+    before = rollups.query_rollups(pg_session, ws, "hour", datetime(2025, 11, 1, tzinfo=timezone.utc), datetime(2025, 12, 1, tzinfo=timezone.utc))
+    pg_session.execute(DBCampaignMetricHourly.__table__.delete().where(DBCampaignMetricHourly.workspace_id == ws))
+
+    rollups.rebuild_rollups(pg_session, ws, datetime(2025, 11, 1, tzinfo=timezone.utc), datetime(2025, 12, 1, tzinfo=timezone.utc))
+    after = rollups.query_rollups(pg_session, ws, "hour", datetime(2025, 11, 1, tzinfo=timezone.utc), datetime(2025, 12, 1, tzinfo=timezone.utc))
+    assert len(after) == 8 and after == before
+
+
+def test_rollups_route(service_client):
+    ws = str(uuid.uuid4())
+    rows = [{"source": "meta", "ts": f"2025-11-{d:02d}T12:00:00Z", "metric": m, "value": d} for d in range(1, 31) for m in ("spend", "clicks")]
+    service_client.post("/v1/data/upsert/campaign_metrics", json={"workspaceId": ws, "rows": rows}, headers={"X-Workspace-ID": ws})
+
+    resp = service_client.get(
+        "/v1/metrics/rollups",
+        params={"start": "2025-11-01T00:00:00Z", "end": "2025-12-01T00:00:00Z", "metric": "spend"},
+        headers={"X-Workspace-ID": ws},
+    )
+    buckets = resp.json()["buckets"]
+    assert len(buckets) == 30 and sum(b["sum"] for b in buckets) == sum(range(1, 31))
+    assert buckets[0] == {
+        "source": "meta", "metric": "spend", "bucket": "2025-11-01T00:00:00+00:00",
+        "sum": 1, "count": 1, "min": 1, "max": 1, "avg": 1, "last": 1,
+    }
+
+    naive = service_client.get("/v1/metrics/rollups", params={"start": "2025-11-01T00:00:00", "end": "2025-12-01T00:00:00"}, headers={"X-Workspace-ID": ws})
+    assert naive.status_code == 400
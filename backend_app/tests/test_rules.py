@@ -0,0 +1,101 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fake_openai import make_fake_openai, fake_http_client
+
+from backend_app import gpt
+from backend_app.common.llm_cache import LLMCache
+from backend_app.common.rules import RULES_BY_GOAL, evaluate, pre_audit
+from backend_app.routes import suggest
+
+HEADERS = {"X-Shop-Domain": "s.myshopify.com"}
+
+
+def cta(text, above_fold=True, tag="button", href=None):
+    return {"tag": tag, "text": text, "href": href, "visible": True, "above_fold": above_fold}
+
+
+def product_page(**overrides):
+    features = {
+        "headings": [{"level": 1, "text": "Merino beanie"}],
+        "ctas": [cta("Add to cart", above_fold=False), cta("Shop now"), cta("Sign up"), cta("Buy it now", above_fold=False), cta("Get started"), cta("Join")],
+        "forms": [{"action": "/cart/add", "has_email": False, "text": "", "above_fold": False}],
+        "meta": {"description": "Warm hat"},
+        "images": [{"src": "/hat.jpg", "alt": "", "width": 4000, "rendered_width": 600, "rendered_height": 600, "above_fold": True}],
+        "prices": [],
+        "reviews": [],
+        "viewport_height": 800,
+    }
+    features.update(overrides)
+    return {"url": "https://a.test/products/hat", "page_type": "product", "features": features}
+
+
+def test_goal_registry_matches_the_prompt_goals():
+    assert set(RULES_BY_GOAL) - {"*"} == set(gpt.INSTRUCTIONS_BY_GOAL)
+
+
+def test_product_page_findings_skip_the_model():
+    report = pre_audit(product_page(), "Increase add to cart")
+    assert report.fired == [
+        "add-to-cart-below-fold", "no-price",  # high, goal rules first
+        "competing-ctas", "product-without-reviews", "oversized-hero-images",
+        "images-missing-alt",
+    ]
+    assert not report.needs_llm
+    assert report.suggestions[2].text.startswith("4 calls to action compete")
+    assert {"text", "type", "target", "impact"} == set(report.suggestions[0].model_dump())
+
+
+def test_email_incentive_and_missing_features():
+    signup = {"page_type": "home", "features": {"headings": [{"level": 1, "text": "Hats"}], "ctas": [cta("Shop now")], "meta": {"description": "x"},
+                                                 "forms": [{"action": "/contact", "has_email": True, "text": "Join our newsletter", "above_fold": False}],
+                                                 "viewport_height": 800}}
+    with_offer = json.loads(json.dumps(signup))
+    with_offer["features"]["forms"][0]["text"] = "Get 10% off your first order"
+    static = {"page_type": "product", "features": None}
+
+    plain, offered, unrendered = evaluate([signup, with_offer, static], "boost email signups")
+    assert plain.fired == ["no-signup-incentive", "signup-below-fold"] and plain.needs_llm
+    assert offered.fired == ["signup-below-fold"]
+    assert unrendered.fired == [] and unrendered.needs_llm and unrendered.reason == "no page features"
+    assert [r.fired for r in evaluate([signup, with_offer], "boost email signups")] == [plain.fired, offered.fired]
+
+
+def test_suggest_uses_rules_and_calls_the_model_only_when_needed(monkeypatch):
+    app = make_fake_openai()
+    monkeypatch.setattr(gpt, "llm_client", gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app)))
+    monkeypatch.setattr(gpt, "llm_cache", LLMCache(path=None))
+    api = FastAPI()
+    api.include_router(suggest.router)
+    client = TestClient(api)
+    page = product_page()
+    body = {"html": "<h1>Merino beanie</h1>", "goal": "increase add to cart", "features": page["features"], "page_type": "product"}
+
+    rules_only = client.post("/suggest", json=body, headers=HEADERS).json()
+    assert app.state.calls == 0
+    assert rules_only["suggestions"][0]["target"] == "add to cart button"
+    stream = client.post("/suggest/stream", json=body, headers=HEADERS).text
+    assert '"rules_only": true' in stream and app.state.calls == 0
+
+    # Cart button and price fixed: one goal finding left, so the model is asked too.
+    fixed = product_page(ctas=[cta("Add to cart")], prices=["$ 20.00"])
+    mixed = client.post("/suggest", json={**body, "features": fixed["features"]}, headers=HEADERS).json()
+    assert app.state.calls == 1
+    assert "already reported" in app.state.requests[0]["messages"][-1]["content"]
+    assert [s["target"] for s in mixed["suggestions"]][:2] == ["product reviews", "above-the-fold images"]
+    assert len(mixed["suggestions"]) == len(pre_audit(fixed, body["goal"]).suggestions) + 2
+
+
+def test_malformed_features_fall_back_to_the_model(monkeypatch):
+    app = make_fake_openai()
+    monkeypatch.setattr(gpt, "llm_client", gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app)))
+    monkeypatch.setattr(gpt, "llm_cache", LLMCache(path=None))
+    api = FastAPI()
+    api.include_router(suggest.router)
+    client = TestClient(api)
+    base = {"html": "<h1>Merino beanie</h1>", "goal": "increase add to cart", "page_type": "product"}
+    for features in ("x", {"headings": [{"level": 1, "text": 5}]}, {"ctas": ["Buy now"]}):
+        response = client.post("/suggest", json={**base, "features": features}, headers=HEADERS)
+        assert response.status_code == 200 and response.json()["suggestions"]
+    assert app.state.calls >= 1
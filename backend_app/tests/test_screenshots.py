@@ -0,0 +1,216 @@
+import asyncio
+import io
+from contextlib import asynccontextmanager
+
+import pytest
+from PIL import Image
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend_app.common.artifacts import ArtifactStore, LocalDiskStorage
+from backend_app.common.crawl_cache import CrawlCache
+from backend_app.common.screenshots import ScreenshotService, encode_webp
+from backend_app.routes import crawl, screenshots
+
+HEADERS = {"X-Shop-Domain": "s.myshopify.com"}
+
+
+def png(width: int, height: int, color=(200, 30, 30)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, "PNG")
+    return out.getvalue()
+
+
+class FakePage:
+    viewport_size = {"width": 1280, "height": 800}
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def goto(self, url, timeout=None):
+        self.pool.visits.append(url)
+        await self.pool.release.wait()
+        if "broken" in url:
+            raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+
+    async def screenshot(self, type="png", full_page=False, clip=None):
+        return png(1280, clip["height"] if full_page else 800)
+
+    async def evaluate(self, script):
+        return 3000
+
+
+class FakeContext:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def new_page(self):
+        return FakePage(self.pool)
+
+
+class FakePool:
+    started = True
+
+    def __init__(self):
+        self.visits = []
+        self.release = asyncio.Event()
+
+    @asynccontextmanager
+    async def context(self, **options):
+        yield FakeContext(self)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = ScreenshotService(pool=FakePool(), store=ArtifactStore(LocalDiskStorage(str(tmp_path))), max_pending=2)
+    for module in (crawl, screenshots):
+        monkeypatch.setattr(module, "screenshot_service", service)
+    return service
+
+
+def test_encode_webp_downscales():
+    webp = encode_webp(png(1280, 3000), width=640)
+    with Image.open(io.BytesIO(webp)) as img:
+        assert img.format == "WEBP" and img.size == (640, 1500)
+
+
+def test_crawl_does_not_wait_and_fills_in_the_urls(service, monkeypatch):
+    async def fake_fetch(url, mode):
+        return {"url": url, "html": "<h1>Hat</h1>", "title": "Hat", "etag": None}
+
+    cache = CrawlCache(ttl=60, directory=None)
+    monkeypatch.setattr(crawl, "fetch_page", fake_fetch)
+    monkeypatch.setattr(crawl, "crawl_cache", cache)
+
+    async def run():
+        service.pool.release = asyncio.Event()  # captures block until released
+        result = await crawl.crawl_url("https://a.test/hat")
+        assert result["screenshot_status"] == "pending" and result["screenshot_url"] == ""
+        assert service.get(result["artifact"]["id"]).status == "pending"
+        joined = await crawl.crawl_url("https://a.test/products/hat")  # same HTML, capture still running
+        assert joined["screenshot_status"] == "pending"
+
+        service.pool.release.set()
+        await asyncio.gather(*service._tasks.values())
+        cached = await cache.get("https://a.test/hat")
+        assert cached["screenshot_status"] == "ready"
+        assert cached["screenshot_url"].startswith("/screenshots/") and cached["screenshot_full_url"]
+        assert (await cache.get("https://a.test/products/hat"))["screenshot_url"] == cached["screenshot_url"]
+
+        # Same HTML once captured: the response has the images straight away.
+        again = await crawl.crawl_url("https://a.test/collections/all/products/hat")
+        assert again["screenshot_status"] == "ready" and again["screenshot_url"] == cached["screenshot_url"]
+        assert service.pool.visits == ["https://a.test/hat"]
+        await service.stop()
+        return cached
+
+    cached = asyncio.run(run())
+    assert (service.captured, service.reused) == (1, 1)
+
+    app = FastAPI()
+    app.include_router(screenshots.router)
+    client = TestClient(app)
+    image = client.get(cached["screenshot_url"])
+    assert image.status_code == 200 and image.headers["content-type"] == "image/webp"
+    assert Image.open(io.BytesIO(image.content)).size == (640, 400)
+    assert client.get(f"/screenshots/{'0' * 64}").status_code == 404
+    # The SPA is served from another origin, so responses carry absolute URLs.
+    shots = client.get(f"/screenshots/pages/{cached['artifact']['id']}", headers=HEADERS).json()
+    assert shots["above_fold"] == "http://testserver" + cached["screenshot_url"]
+    data = crawl.page_data(cached, include_html=False, base_url="http://testserver/")
+    assert data.screenshot_url == "http://testserver" + cached["screenshot_url"]
+    assert client.get(f"/screenshots/pages/{'0' * 64}", headers=HEADERS).status_code == 404
+
+
+def test_cache_hit_retries_dropped_and_cancelled_captures(service, monkeypatch):
+    async def fake_fetch(url, mode):
+        return {"url": url, "html": f"<h1>{url}</h1>", "title": "Hat", "etag": None}
+
+    cache = CrawlCache(ttl=60, directory=None)
+    monkeypatch.setattr(crawl, "fetch_page", fake_fetch)
+    monkeypatch.setattr(crawl, "crawl_cache", cache)
+
+    async def run():
+        service.schedule("https://a.test/x", "x")
+        service.schedule("https://a.test/y", "y")
+        dropped = await crawl.crawl_url("https://a.test/hat")  # queue full
+        assert dropped.get("screenshot_status", "none") == "none"
+        await service.stop()  # cancels x and y
+
+        retried = await crawl.crawl_url("https://a.test/hat")
+        assert retried["screenshot_status"] == "pending"
+        assert (await cache.get("https://a.test/hat"))["screenshot_status"] == "pending"
+        await asyncio.sleep(0)  # let it reach the browser
+        await service.stop()  # cancelled at shutdown, the entry still says pending
+
+        service.pool.release.set()
+        await crawl.crawl_url("https://a.test/hat")
+        await asyncio.gather(*service._tasks.values())
+        assert (await cache.get("https://a.test/hat"))["screenshot_status"] == "ready"
+        await crawl.crawl_url("https://a.test/hat")  # ready: nothing to redo
+        await service.stop()
+
+    asyncio.run(run())
+    assert service.pool.visits.count("https://a.test/hat") == 2
+    assert service.captured == 1
+
+
+def test_browser_renders_are_shot_in_place_and_static_ones_skipped(service, monkeypatch):
+    async def fake_fetch(url, mode):
+        if "static" in url:
+            return {"url": url, "html": "<h1>Static</h1>", "title": "S", "rendered_by": "static"}
+        page = FakePage(service.pool)
+        return {
+            "url": url, "html": "<h1>Rendered</h1>", "title": "R", "rendered_by": "browser",
+            "screenshot_pngs": await service.shoot(page, page_height=1600),
+        }
+
+    cache = CrawlCache(ttl=60, directory=None)
+    monkeypatch.setattr(crawl, "fetch_page", fake_fetch)
+    monkeypatch.setattr(crawl, "crawl_cache", cache)
+
+    async def run():
+        static = await crawl.crawl_url("https://a.test/static")
+        assert static.get("screenshot_status", "none") == "none"
+        assert (await crawl.crawl_url("https://a.test/static")).get("screenshot_status", "none") == "none"  # cache hit: still skipped
+        rendered = await crawl.crawl_url("https://a.test/rendered")
+        assert rendered["screenshot_status"] == "pending" and "screenshot_pngs" not in rendered
+        await asyncio.gather(*service._tasks.values())
+        assert (await cache.get("https://a.test/rendered"))["screenshot_status"] == "ready"
+
+        service.capture_static = True  # opted in: a Chromium load for the static page
+        service.pool.release.set()
+        assert (await crawl.crawl_url("https://a.test/static"))["screenshot_status"] == "pending"
+        await asyncio.gather(*service._tasks.values())
+        await service.stop()
+
+    asyncio.run(run())
+    assert service.pool.visits == ["https://a.test/static"]
+
+
+def test_identical_renders_are_stored_once(service):
+    async def run():
+        service.pool.release.set()
+        await asyncio.gather(service.capture("https://a.test/1"), service.capture("https://a.test/2"))
+
+    asyncio.run(run())
+    # Two pages, two shots each, but only two distinct images.
+    assert (service.store.stored, service.store.deduplicated) == (2, 2)
+
+
+def test_queue_bound_and_failed_captures_retry(service):
+    async def run():
+        assert service.schedule("https://a.test/1", "a").status == "pending"
+        assert service.schedule("https://a.test/1", "a").status == "pending"  # joins the capture
+        service.schedule("https://broken.test/", "b")
+        assert service.schedule("https://a.test/3", "c") is None  # max_pending=2
+        service.pool.release.set()
+        await asyncio.gather(*service._tasks.values())
+        assert service.get("b").status == "failed"
+        assert service.schedule("https://broken.test/", "b").status == "pending"
+        await asyncio.gather(*service._tasks.values())
+        await service.stop()
+
+    asyncio.run(run())
+    assert (service.dropped, service.failed) == (1, 2)
+    assert service.pool.visits == ["https://a.test/1", "https://broken.test/", "https://broken.test/"]
@@ -0,0 +1,38 @@
+import uuid
+from sqlalchemy import select
+from backend_app.db_models import DBCampaignMetric, DBCampaignMetricDaily, DBJobLog, DBSuggestion
+
+
+def test_async_import_matches_the_sync_route(async_service_client, pg_session):
+    ws = str(uuid.uuid4())
+    items = [{"title": "A", "uniqueKey": "a"}, {"title": "B"}, {"title": "A2", "uniqueKey": "a"}]
+    body = {"workspaceId": ws, "items": items}
+    resp = async_service_client.post("/v1/suggestions/import", json=body, headers={"X-Workspace-ID": ws})
+    assert resp.json() == {"upserts": 3, "created": 2, "updated": 0, "duplicates": 1}
+    titles = pg_session.scalars(select(DBSuggestion.title).where(DBSuggestion.workspace_id == uuid.UUID(ws))).all()
+    assert sorted(titles) == ["A2", "B"]
+
+
+def test_async_metric_upsert_copies_merges_and_rolls_up(async_service_client, pg_session):
+    ws = str(uuid.uuid4())
+    rows = [{"source": "meta", "ts": f"2025-11-01T{h:02d}:00:00Z", "metric": "spend", "value": h} for h in range(4)]
+    headers = {"X-Workspace-ID": ws}
+    assert async_service_client.post("/v1/data/upsert/campaign_metrics", json={"workspaceId": ws, "rows": rows}, headers=headers).json() == {
+        "upserts": 4, "created": 4, "updated": 0, "duplicates": 0,
+    }
+    rows[0]["value"] = 10
+    assert async_service_client.post("/v1/data/upsert/campaign_metrics", json={"workspaceId": ws, "rows": rows[:1]}, headers=headers).json()["updated"] == 1
+
+    ws_id = uuid.UUID(ws)
+    assert pg_session.scalar(select(DBCampaignMetric.value).where(DBCampaignMetric.workspace_id == ws_id, DBCampaignMetric.value == 10)) == 10
+    assert pg_session.scalar(select(DBCampaignMetricDaily.value_sum).where(DBCampaignMetricDaily.workspace_id == ws_id)) == 16
+
+
+def test_async_job_routes(async_service_client, pg_session):
+    ws = str(uuid.uuid4())
+    for status in ("ack", "done", "fail"):
+        resp = async_service_client.post(f"/v1/jobs/{status}", json={"jobId": "j1", "message": status}, headers={"X-Workspace-ID": ws})
+        assert resp.json()["status"] == status.upper()
+    statuses = pg_session.scalars(select(DBJobLog.status).where(DBJobLog.workspace_id == uuid.UUID(ws))).all()
+    assert sorted(s.value for s in statuses) == ["ACK", "DONE", "FAIL"]
+    assert async_service_client.post("/v1/jobs/ack", json={}, headers={"X-Workspace-ID": "nope"}).status_code == 400
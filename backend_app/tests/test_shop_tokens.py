@@ -0,0 +1,117 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend_app.services import shop_data
+from backend_app.services.shop_data import PostgresTokenSource, ReadOnlyTokenSource, ShopTokenStore, SqliteTokenSource
+
+
+@pytest.fixture
+def prisma_db(tmp_path):
+    path = str(tmp_path / "dev.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Shop (id TEXT PRIMARY KEY, shopDomain TEXT UNIQUE, accessToken TEXT)")
+    conn.executemany("INSERT INTO Shop VALUES (?, ?, ?)", [(f"id{n}", f"shop{n}.myshopify.com", f"tok{n}") for n in range(1200)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+class CountingSource(SqliteTokenSource):
+    def __init__(self, path):
+        super().__init__(path)
+        self.queries = []
+
+    def fetch(self, shops):
+        self.queries.append(list(shops))
+        return super().fetch(shops)
+
+
+def test_store_caches_tokens_over_one_connection(prisma_db):
+    source = CountingSource(prisma_db)
+    store = ShopTokenStore(source, ttl=60)
+    assert store.get("shop1.myshopify.com") == "tok1"
+    assert store.get("shop1.myshopify.com") == "tok1"
+    assert store.get("missing.myshopify.com") is None
+    assert store.get("missing.myshopify.com") is None  # misses are not cached
+    assert len(source.queries) == 3
+    assert store.stats()["hits"] == 1
+    first = source._db
+    store.get("shop2.myshopify.com")
+    assert source._db is first
+
+
+def test_expired_and_invalidated_entries_are_refetched(prisma_db):
+    source = CountingSource(prisma_db)
+    store = ShopTokenStore(source, ttl=0)
+    store.get("shop1.myshopify.com")
+    store.get("shop1.myshopify.com")
+    assert len(source.queries) == 2
+
+    store.ttl = 60
+    store.get("shop1.myshopify.com")
+    store.invalidate("shop1.myshopify.com", remove=True)  # read-only source: cache only
+    store.get("shop1.myshopify.com")
+    assert len(source.queries) == 4
+
+
+def test_fetch_overlapping_an_invalidation_is_not_cached(prisma_db):
+    class RevokedMidFetch(CountingSource):
+        def fetch(self, shops):
+            tokens = super().fetch(shops)  # read before the uninstall lands
+            if len(self.queries) == 1:
+                store.invalidate("shop1.myshopify.com", remove=True)
+            return tokens
+
+    source = RevokedMidFetch(prisma_db)
+    store = ShopTokenStore(source, ttl=60)
+    assert store.get("shop1.myshopify.com") == "tok1"
+    assert store.stats()["entries"] == 0
+    store.get("shop1.myshopify.com")
+    assert len(source.queries) == 2
+    with pytest.raises(ReadOnlyTokenSource):
+        store.put("shop1.myshopify.com", "t")
+
+
+def test_prefetch_loads_all_misses_in_one_pass(prisma_db):
+    source = CountingSource(prisma_db)
+    store = ShopTokenStore(source, ttl=60)
+    store.get("shop0.myshopify.com")
+    shops = [f"shop{n}.myshopify.com" for n in range(1000)] + ["gone.myshopify.com"]
+    tokens = store.prefetch(shops)
+    assert len(tokens) == 1000 and tokens["shop999.myshopify.com"] == "tok999"
+    assert len(source.queries) == 2 and len(source.queries[1]) == 1000  # shop0 came from the cache
+    assert store.get("shop500.myshopify.com") == "tok500" and len(source.queries) == 2
+
+
+def test_get_access_token_keeps_its_contract(prisma_db, monkeypatch):
+    monkeypatch.setattr(shop_data, "shop_tokens", ShopTokenStore(SqliteTokenSource(prisma_db)))
+    assert shop_data.get_access_token("shop7.myshopify.com") == "tok7"
+    with pytest.raises(ValueError):
+        shop_data.get_access_token("nope.myshopify.com")
+
+
+def test_postgres_source_and_service_routes(pg_engine, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend_app.routes import service
+
+    store = ShopTokenStore(PostgresTokenSource(sessionmaker(pg_engine)), ttl=60)
+    monkeypatch.setattr(service, "shop_tokens", store)
+    monkeypatch.setenv("SERVICE_BEARER", "test-token")
+    app = FastAPI()
+    app.include_router(service.router)
+    client = TestClient(app, headers={"Authorization": "Bearer test-token"})
+
+    assert client.put("/v1/shops/a.myshopify.com/token", json={"accessToken": "t1"}).json() == {"shop": "a.myshopify.com", "stored": True}
+    client.put("/v1/shops/a.myshopify.com/token", json={"accessToken": "t2"})
+    store.clear()
+    assert store.get("a.myshopify.com") == "t2"
+
+    assert client.delete("/v1/shops/a.myshopify.com/token").json()["revoked"] is True
+    assert store.get("a.myshopify.com") is None
+    assert store.source.fetch(["a.myshopify.com"]) == {}
+
+    monkeypatch.setattr(service, "shop_tokens", ShopTokenStore(SqliteTokenSource("/nonexistent")))
+    assert client.put("/v1/shops/a.myshopify.com/token", json={"accessToken": "t"}).status_code == 409
@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from fake_openai import make_fake_openai, fake_http_client
+from backend_app import gpt
+from backend_app.common.crawl_cache import CrawlCache
+from backend_app.common.llm_cache import LLMCache
+from backend_app.common.singleflight import SingleFlight
+from backend_app.routes import crawl
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"n": len(calls)}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(value == {"n": 1} for value, _ in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "shared": 4}
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do("k", work))
+    assert len(attempts) == 2
+
+
+def test_leader_cancellation_does_not_fail_followers():
+    flight = SingleFlight()
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == ("done", True)
+    assert started == [1]
+
+
+def test_work_is_cancelled_when_every_waiter_leaves():
+    flight = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def run():
+        task = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.06)
+
+    asyncio.run(run())
+    assert finished == []
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_stream_fans_out_to_late_joiners():
+    flight = SingleFlight()
+    produced = []
+
+    async def items():
+        for i in range(4):
+            produced.append(i)
+            yield i
+            await asyncio.sleep(0.01)
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        return [i async for i in flight.stream("k", items)]
+
+    async def run():
+        return await asyncio.gather(consume(0), consume(0.015))
+
+    assert asyncio.run(run()) == [[0, 1, 2, 3], [0, 1, 2, 3]]
+    assert produced == [0, 1, 2, 3]
+
+
+def test_crawl_url_coalesces_equivalent_urls(monkeypatch):
+    fetched = []
+
+    async def fake_fetch(url, mode="auto"):
+        fetched.append(url)
+        await asyncio.sleep(0.02)
+        return {"url": url, "html": "<h1>x</h1>", "title": "x", "etag": None, "last_modified": None}
+
+    monkeypatch.setattr(crawl, "fetch_page", fake_fetch)
+    monkeypatch.setattr(crawl, "crawl_cache", CrawlCache(directory=None))
+    urls = ["https://shop.test/p?utm_source=a", "https://shop.test/p?utm_source=b", "https://SHOP.test/p"]
+
+    async def run():
+        return await asyncio.gather(*(crawl.crawl_url(u) for u in urls))
+
+    results = asyncio.run(run())
+    assert len(fetched) == 1
+    assert all(r["title"] == "x" for r in results)
+    assert crawl.crawl_cache.stats()["coalesced"] == 2
+
+
+def test_concurrent_suggestion_streams_share_one_model_call(monkeypatch):
+    app = make_fake_openai(chunk_delay=0.002)
+    client = gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app))
+    monkeypatch.setattr(gpt, "llm_client", client)
+    monkeypatch.setattr(gpt, "llm_cache", LLMCache(path=None))
+
+    async def collect():
+        return [event async for event in gpt.stream_suggestions("<h1>Hat</h1>", "increase add to cart")]
+
+    async def run():
+        return await asyncio.gather(collect(), collect(), collect())
+
+    first, second, third = asyncio.run(run())
+    assert app.state.calls == 1
+    assert first == second == third
+    assert [kind for kind, _ in first].count("suggestion") == 2
@@ -0,0 +1,87 @@
+import asyncio
+import httpx
+from backend_app.common import scraper, static_scraper
+
+SERVER_RENDERED = """<!doctype html><html><head><title> Wool Hat | Shop </title>
+<style>h1 { color: red }</style><script>window.dataLayer = [];</script></head>
+<body><header><a href="/cart">Cart</a></header>
+<h1>Wool <em>Hat</em></h1><h2>Details</h2>
+<p>%s</p>
+<form action="/cart/add"><button href="/checkout">Add to cart</button></form>
+</body></html>""" % ("Soft merino wool, knitted in Scotland. " * 10)
+
+SPA_SHELL = """<html><head><title>Store</title></head>
+<body><div id="root"></div><noscript>You need to enable JavaScript to run this app.</noscript>
+<script src="/bundle.js"></script></body></html>"""
+
+
+def test_parse_static_extracts_scraper_fields():
+    features = static_scraper.parse_static(SERVER_RENDERED)
+    assert features.title.strip() == "Wool Hat | Shop"
+    assert features.headings == ["Wool Hat", "Details"]
+    assert features.ctas == ["/cart", "/checkout"]
+    assert features.forms == ["/cart/add"]
+    assert not static_scraper.needs_javascript(features)
+
+
+def test_head_without_closing_tag_and_svg_titles():
+    html = SERVER_RENDERED.replace("</head>", "").replace("<h2>Details</h2>", "<h2>Details</h2><svg><title>Close</title></svg>")
+    features = static_scraper.parse_static(html)
+    assert features.title.strip() == "Wool Hat | Shop"
+    assert features.headings == ["Wool Hat", "Details"]
+    assert features.text_chars > 300
+    assert not static_scraper.needs_javascript(features)
+
+
+def test_spa_shell_needs_javascript():
+    features = static_scraper.parse_static(SPA_SHELL)
+    assert features.spa_root and features.noscript_requires_js
+    assert static_scraper.needs_javascript(features)
+
+
+def _serve(monkeypatch, body):
+    def handler(request):
+        return httpx.Response(200, text=body, headers={"content-type": "text/html", "etag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(static_scraper, "get_http_client", lambda: client)
+
+
+def test_auto_mode_serves_static_pages_without_browser(monkeypatch):
+    _serve(monkeypatch, SERVER_RENDERED)
+
+    async def no_browser(url, pool=None):
+        raise AssertionError("browser should not be used")
+
+    monkeypatch.setattr(scraper, "scrape_page", no_browser)
+    result = asyncio.run(scraper.fetch_page("https://shop.test/products/hat"))
+    assert result["rendered_by"] == "static"
+    assert result["etag"] == '"v1"'
+
+
+def test_auto_mode_escalates_spa_to_browser(monkeypatch):
+    _serve(monkeypatch, SPA_SHELL)
+
+    async def fake_browser(url, pool=None):
+        return {"url": url, "rendered_by": "browser"}
+
+    monkeypatch.setattr(scraper, "scrape_page", fake_browser)
+    assert asyncio.run(scraper.fetch_page("https://shop.test/"))["rendered_by"] == "browser"
+    assert asyncio.run(scraper.fetch_page("https://shop.test/", mode="static"))["rendered_by"] == "static"
+
+
+def test_static_results_carry_features_for_the_rules(monkeypatch):
+    from backend_app.common.models import PageData
+    from backend_app.common.rules import pre_audit
+
+    page = SERVER_RENDERED.replace("<h2>Details</h2>", '<h2>Details</h2><img src="/hat.jpg"><a href="/products/scarf">Scarf</a>')
+    _serve(monkeypatch, page)
+    result = asyncio.run(static_scraper.fetch_static("https://shop.test/products/hat"))
+    features = PageData(**result).features
+    assert [h.level for h in features.headings] == [1, 2] and features.viewport_height == 0
+    assert features.forms[0].action == "/cart/add" and features.forms[0].text == "Add to cart"
+    assert [c.text for c in features.ctas] == ["Cart", "Scarf", "Add to cart"]
+
+    report = pre_audit({**result, "page_type": "product"}, "increase add to cart")
+    assert report.fired == ["no-price", "product-without-reviews", "missing-meta-description", "images-missing-alt"]
+    assert not report.needs_llm  # no "no page features" fallback on the static path
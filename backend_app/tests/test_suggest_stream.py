@@ -0,0 +1,83 @@
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fake_openai import make_fake_openai, fake_http_client, DEFAULT_CONTENT
+from backend_app import gpt
+from backend_app.common.json_stream import SuggestionStreamParser
+from backend_app.common.llm_cache import LLMCache
+from backend_app.routes import suggest
+
+HEADERS = {"X-Shop-Domain": "s.myshopify.com"}
+BODY = {"html": "<h1>Wool hat</h1><button>Add to cart</button>", "goal": "increase add to cart"}
+
+
+def _events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _client(monkeypatch, app):
+    monkeypatch.setattr(gpt, "llm_client", gpt.LLMClient(api_key="test", base_url="http://fake-openai/v1", http_client=fake_http_client(app)))
+    monkeypatch.setattr(gpt, "llm_cache", LLMCache(path=None))
+    api = FastAPI()
+    api.include_router(suggest.router)
+    return TestClient(api)
+
+
+def test_parser_emits_items_as_their_objects_close():
+    parser = SuggestionStreamParser()
+    doc = json.dumps({"rationale": 'Use "urgency" {now}', "suggestions": [{"text": "a}", "type": "t", "target": "[x]", "impact": "high"}, {"text": "b"}]})
+    events = []
+    for ch in doc[:-2]:  # stream stops before the array closes
+        events += parser.feed(ch)
+    assert events == [("rationale", 'Use "urgency" {now}'), ("suggestion", {"text": "a}", "type": "t", "target": "[x]", "impact": "high"}), ("suggestion", {"text": "b"})]
+
+
+def test_parser_ignores_code_fences_and_nested_values():
+    parser = SuggestionStreamParser()
+    events = parser.feed('```json\n{"suggestions": [{"text": "a", "meta": {"k": [1, {"z": 2}]}}], "rationale": "r"}\n```')
+    assert events == [("suggestion", {"text": "a", "meta": {"k": [1, {"z": 2}]}}), ("rationale", "r")]
+
+
+def test_parser_skips_malformed_items_and_keeps_going():
+    parser = SuggestionStreamParser()
+    doc = '{"rationale": "bad \\q escape", "suggestions": [{"text": "a"}, {"text": "b", oops}, {"text": "c"}], "rationale": "r"}'
+    events = []
+    for ch in doc:
+        events += parser.feed(ch)
+    assert events == [("suggestion", {"text": "a"}), ("suggestion", {"text": "c"}), ("rationale", "r")]
+
+
+def test_stream_endpoint_sends_rationale_first_then_each_suggestion(monkeypatch):
+    app = make_fake_openai(chunk_chars=5)
+    client = _client(monkeypatch, app)
+
+    resp = client.post("/suggest/stream", json=BODY, headers=HEADERS)
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    expected = json.loads(DEFAULT_CONTENT)
+    assert events[0] == ("rationale", {"rationale": expected["rationale"]})
+    assert [d for e, d in events if e == "suggestion"] == expected["suggestions"]
+    assert events[-1][0] == "done" and events[-1][1]["count"] == 2
+    assert app.state.requests[0]["stream"] is True
+
+    # The completed stream is cached and serves the non-streaming route.
+    assert client.post("/suggest", json=BODY, headers=HEADERS).json() == expected
+    assert app.state.calls == 1
+
+
+def test_stream_holds_suggestions_until_rationale(monkeypatch):
+    content = json.dumps({"suggestions": [{"text": "a", "type": "t", "target": "x", "impact": "low"}], "rationale": "late"})
+    client = _client(monkeypatch, make_fake_openai(content=content))
+    events = _events(client.post("/suggest/stream", json=BODY, headers=HEADERS).text)
+    assert [e for e, _ in events] == ["rationale", "suggestion", "done"]
+    assert events[0][1] == {"rationale": "late"}
+
+
+def test_stream_reports_errors_as_events(monkeypatch):
+    client = _client(monkeypatch, make_fake_openai(failures=[(401, {})]))
+    events = _events(client.post("/suggest/stream", json=BODY, headers=HEADERS).text)
+    assert events[-1][0] == "error"
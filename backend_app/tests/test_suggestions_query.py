@@ -0,0 +1,69 @@
+import uuid
+import pytest
+from backend_app.common import suggestions
+from backend_app.common.ingest import upsert_suggestions
+from backend_app.common.models import SuggestionIn
+from backend_app.db_models import DBSuggestion, SuggestionState
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    from datetime import datetime, timezone
+    created, sid = datetime(2025, 11, 1, 12, 30, 0, 123456, tzinfo=timezone.utc), uuid.uuid4()
+    assert suggestions.decode_cursor(suggestions.encode_cursor(created, sid)) == (created, sid)
+    with pytest.raises(ValueError):
+        suggestions.decode_cursor("not-a-cursor")
+
+
+def _seed(pg_session, ws, n=7):
+    # One bulk upsert: every row shares created_at, so pages rely on the id tiebreak.
+    upsert_suggestions(pg_session, ws, [
+        SuggestionIn(title=f"S{i}", priority=("High", "Low")[i % 2], category="Marketing", impact=("High", None)[i % 3 > 0])
+        for i in range(n)
+    ])
+
+
+def _all_pages(pg_session, ws, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = suggestions.list_suggestions(pg_session, ws, cursor=cursor, **kwargs)
+        pages.append([item["title"] for item in page["items"]])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_row_once(pg_session):
+    ws = uuid.uuid4()
+    _seed(pg_session, ws)
+    for order in ("asc", "desc"):
+        pages = _all_pages(pg_session, ws, limit=3, order=order)
+        assert [len(p) for p in pages] == [3, 3, 1]
+        assert sorted(sum(pages, [])) == [f"S{i}" for i in range(7)]
+
+
+def test_filters_combine(pg_session):
+    ws = uuid.uuid4()
+    _seed(pg_session, ws)
+    pg_session.query(DBSuggestion).filter(DBSuggestion.workspace_id == ws, DBSuggestion.title == "S0").update({"state": SuggestionState.ACCEPTED})
+
+    high = suggestions.list_suggestions(pg_session, ws, priorities=["High"], order="asc")["items"]
+    assert {item["title"] for item in high} == {"S0", "S2", "S4", "S6"}
+    assert high[0]["priority"] == "High" and high[0]["category"] == "Marketing"
+
+    titles = {item["title"] for item in suggestions.list_suggestions(pg_session, ws, priorities=["High"], impacts=["High"], states=[SuggestionState.NEW])["items"]}
+    assert titles == {"S6"}
+
+
+def test_route_pages_and_validates(service_client):
+    ws = str(uuid.uuid4())
+    items = [{"title": f"T{i}", "priority": "High" if i < 3 else "Low"} for i in range(5)]
+    service_client.post("/v1/suggestions/import", json={"workspaceId": ws, "items": items}, headers={"X-Workspace-ID": ws})
+
+    headers = {"X-Workspace-ID": ws}
+    first = service_client.get("/v1/suggestions", params={"priority": "High", "limit": 2}, headers=headers).json()
+    second = service_client.get("/v1/suggestions", params={"priority": "High", "limit": 2, "cursor": first["nextCursor"]}, headers=headers).json()
+    assert len(first["items"]) == 2 and len(second["items"]) == 1 and second["nextCursor"] is None
+    assert {i["title"] for i in first["items"] + second["items"]} == {"T0", "T1", "T2"}
+
+    assert service_client.get("/v1/suggestions", params={"cursor": "bogus"}, headers=headers).status_code == 400
+    assert service_client.get("/v1/suggestions", params={"priority": "Urgent"}, headers=headers).status_code == 422
@@ -0,0 +1,48 @@
+"""
+Standalone audit worker: runs the /audits queue without serving HTTP.
+
+    AUDIT_WORKERS=4 python -m backend_app.worker
+
+Run any number of these next to API processes started with AUDIT_WORKERS=0;
+they share the queue through Postgres. SIGTERM/SIGINT stop claiming and hand
+unfinished audits back to the queue.
+"""
+import asyncio
+import logging
+import signal
+
+from backend_app.common.browser_pool import browser_pool
+from backend_app.common.http_client import close_http_client
+from backend_app.common.job_events import JOB_EVENTS_BUFFERED, job_event_buffer
+from backend_app.db import async_engine
+from backend_app.gpt import llm_client
+from backend_app.routes.audits import audit_workers
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await browser_pool.start()
+    if JOB_EVENTS_BUFFERED:
+        await job_event_buffer.start()
+    await audit_workers.start()
+    try:
+        await stop.wait()
+        logger.info("🛑 Stopping audit workers")
+    finally:
+        await audit_workers.stop()
+        await job_event_buffer.stop()
+        await browser_pool.stop()
+        await close_http_client()
+        await llm_client.aclose()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -12,6 +12,7 @@ export interface CrawlResponse {
   headings?: string[];
   ctas?: string[];
   forms?: string[];
+  rendered_by?: "static" | "browser";
 }
 
 /**
@@ -55,3 +56,63 @@ export async function crawlPage(url: string, shopDomain: string | null): Promise
     return { success: false };
   }
 }
+
+export type BatchCrawlResult =
+  | { index: number; url: string; status: "ok"; data: Omit<CrawlResponse, "success"> }
+  | { index: number; url: string; status: "error"; error: string };
+
+/**
+ * Crawls several pages in one request, invoking onResult as each page finishes
+ * @param urls The URLs to crawl
+ * @param shopDomain The shop domain making the request
+ * @param onResult Called once per URL, in completion order
+ * @returns Promise with all results once the stream ends
+ */
+export async function crawlPages(
+  urls: string[],
+  shopDomain: string | null,
+  onResult?: (result: BatchCrawlResult) => void
+): Promise<BatchCrawlResult[]> {
+  const results: BatchCrawlResult[] = [];
+  try {
+    if (!verifyShopDomain(shopDomain)) {
+      return results;
+    }
+
+    const response = await fetch(`${API_BASE_URL}/crawl/batch`, {
+      method: "POST",
+      headers: createApiHeaders(shopDomain),
+      body: JSON.stringify({ urls }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Error: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    const emit = (line: string) => {
+      if (!line.trim()) return;
+      const result = JSON.parse(line) as BatchCrawlResult;
+      results.push(result);
+      onResult?.(result);
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split("\n");
+      buffer = lines.pop() ?? "";
+      lines.forEach(emit);
+    }
+    emit(buffer);
+
+    return results;
+  } catch (error) {
+    handleApiError(error, "Failed to crawl pages");
+    return results;
+  }
+}
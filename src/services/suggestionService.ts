@@ -83,6 +83,87 @@ export async function fetchSuggestions(
   }
 }
 
+export type SuggestionStreamHandlers = {
+  onRationale?: (rationale: string) => void;
+  onSuggestion?: (suggestion: Suggestion) => void;
+};
+
+/**
+ * Streams suggestions over server-sent events so each one can be shown as soon as it is generated
+ * @param data The audit form data
+ * @param html The HTML content to analyze
+ * @param shopDomain The shop domain making the request
+ * @param handlers Callbacks for the rationale and for each suggestion
+ * @returns Promise with the full rationale and suggestions once the stream ends
+ */
+export async function streamSuggestions(
+  data: AuditFormData,
+  html: string | undefined,
+  shopDomain: string | null,
+  handlers: SuggestionStreamHandlers = {}
+): Promise<{ rationale: string; suggestions: Suggestion[] }> {
+  const result = { rationale: "No rationale provided", suggestions: [] as Suggestion[] };
+  try {
+    if (!verifyShopDomain(shopDomain)) {
+      return { rationale: "Store detection failed", suggestions: [] };
+    }
+
+    const response = await fetch(`${API_BASE_URL}/suggest/stream`, {
+      method: "POST",
+      headers: createApiHeaders(shopDomain),
+      body: JSON.stringify({
+        html: html || "",
+        goal: data.goal,
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Error: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    const handleEvent = (block: string) => {
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const payload = block.match(/^data: (.*)$/m)?.[1];
+      if (!event || !payload) return;
+      const body = JSON.parse(payload);
+      if (event === "rationale") {
+        result.rationale = body.rationale || result.rationale;
+        handlers.onRationale?.(result.rationale);
+      } else if (event === "suggestion") {
+        const suggestion: Suggestion = {
+          id: `suggestion-${result.suggestions.length}`,
+          title: body.text || "Suggestion",
+          description: `${body.type} - ${body.target}`,
+          impact: (body.impact || "medium").toLowerCase() as "high" | "medium" | "low",
+        };
+        result.suggestions.push(suggestion);
+        handlers.onSuggestion?.(suggestion);
+      } else if (event === "error") {
+        throw new Error(body.error);
+      }
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const blocks = buffer.split("\n\n");
+      buffer = blocks.pop() ?? "";
+      blocks.forEach(handleEvent);
+    }
+    handleEvent(buffer);
+
+    return result;
+  } catch (error) {
+    handleApiError(error, "Failed to fetch suggestions");
+    return result.suggestions.length ? result : { rationale: "Error fetching suggestions", suggestions: [] };
+  }
+}
+
 /**
  * Fetches variants for a suggestion
  * @param data The variant request data